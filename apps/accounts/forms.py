@@ -72,7 +72,7 @@ class UserAdminForm(forms.ModelForm):
     )
 
     def __init__(self, *args, **kwargs):
-        from rolepermissions.checkers import has_role
+        from .roles import has_role
 
         self.user = kwargs.pop("user", None)
         super(UserAdminForm, self).__init__(*args, **kwargs)
@@ -0,0 +1,44 @@
+from django.contrib.auth.middleware import get_user
+from django.utils.functional import SimpleLazyObject
+
+from apps.core.middleware import AsyncCapableMiddleware
+
+from .roles import bind_session
+
+
+class RoleCacheMiddleware(AsyncCapableMiddleware):
+    """
+    Binds the session to request.user so role checks can reuse the roles
+    cached there. Must come after AuthenticationMiddleware; the user stays
+    lazy, so requests that never touch it don't load it.
+    """
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        self.bind(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self.bind(request)
+        return await self.get_response(request)
+
+    def bind(self, request):
+        if not hasattr(request, "session"):
+            return
+        request.user = SimpleLazyObject(
+            lambda: bind_session(get_user(request), request.session)
+        )
+        load_user = request.auser
+
+        async def auser():
+            # Load once with the async session API and share the result with
+            # request.user, so sync code later in the request reuses it
+            if not hasattr(request, "_bound_user"):
+                request._bound_user = bind_session(
+                    await load_user(), request.session
+                )
+                request.user = request._bound_user
+            return request._bound_user
+
+        request.auser = auser
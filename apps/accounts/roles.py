@@ -0,0 +1,121 @@
+"""
+Request-scoped role resolution.
+
+rolepermissions' `has_role` queries the user's groups on every call, and a
+single page checks roles a dozen times (navbar, views, template tags). Here a
+user's role names are loaded once and memoized on the user object; with
+RoleCacheMiddleware installed they are also kept in the session, so later
+requests resolve roles without touching the database.
+
+Session entries carry a per-user role version stamp held in the cache. Any
+change to a user's groups (assign_role, remove_role, the admin) bumps the
+stamp, so stale session entries are discarded on the next check. The stamp
+lives in the cache, so ROLE_CACHE_IN_SESSION is only on by default when the
+cache is shared between workers.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rolepermissions.roles import RolesManager
+
+ROLE_SESSION_KEY = "_role_names"
+ROLE_VERSION_KEY = "accounts:role_version:{}"
+
+_MEMO_ATTR = "_role_names"
+_SESSION_ATTR = "_role_session"
+
+
+def get_role_version(user_id):
+    key = ROLE_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = bump_role_version(user_id, on_commit=False)
+    return version
+
+
+def bump_role_version(user_id, on_commit=True):
+    """Invalidate every cached copy of the user's roles."""
+    key = ROLE_VERSION_KEY.format(user_id)
+    version = time.time_ns() // 1000
+    cache.set(key, version, None)
+    if on_commit:
+        # Bump again on commit: a concurrent request may have cached the
+        # pre-commit groups under the first stamp
+        transaction.on_commit(lambda: cache.set(key, time.time_ns() // 1000, None))
+    return version
+
+
+def bind_session(user, session):
+    """Let role lookups for `user` read and write the session cache."""
+    if getattr(settings, "ROLE_CACHE_IN_SESSION", False):
+        setattr(user, _SESSION_ATTR, session)
+    return user
+
+
+def clear_role_cache(user):
+    """Drop the memoized roles of this user object and its session."""
+    if hasattr(user, _MEMO_ATTR):
+        delattr(user, _MEMO_ATTR)
+    session = getattr(user, _SESSION_ATTR, None)
+    if session is not None:
+        session.pop(ROLE_SESSION_KEY, None)
+
+
+def _load_role_names(user):
+    role_names = RolesManager.get_roles_names()
+    return frozenset(
+        name
+        for name in user.groups.values_list("name", flat=True)
+        if name in role_names
+    )
+
+
+def get_role_names(user):
+    """Return the frozenset of role names assigned to `user`."""
+    if not user or not user.is_authenticated:
+        return frozenset()
+
+    names = getattr(user, _MEMO_ATTR, None)
+    if names is not None:
+        return names
+
+    session = getattr(user, _SESSION_ATTR, None)
+    version = get_role_version(user.pk) if session is not None else None
+    cached = session.get(ROLE_SESSION_KEY) if session is not None else None
+    if cached and cached.get("user") == user.pk and cached.get("version") == version:
+        names = frozenset(cached["roles"])
+    else:
+        names = _load_role_names(user)
+        if session is not None:
+            session[ROLE_SESSION_KEY] = {
+                "user": user.pk,
+                "version": version,
+                "roles": sorted(names),
+            }
+
+    setattr(user, _MEMO_ATTR, names)
+    return names
+
+
+def _role_name(role):
+    return role if isinstance(role, str) else role.get_name()
+
+
+def has_role(user, roles):
+    """
+    Drop-in replacement for rolepermissions.checkers.has_role backed by the
+    memoized role names. `roles` is a role name, role class or list of either.
+    """
+    if not user or not user.is_authenticated:
+        return False
+    if user.is_superuser and getattr(
+        settings, "ROLEPERMISSIONS_SUPERUSER_SUPERPOWERS", True
+    ):
+        return True
+    if not isinstance(roles, (list, tuple, set, frozenset)):
+        roles = [roles]
+    names = get_role_names(user)
+    return any(_role_name(role) in names for role in roles)
@@ -1,9 +1,12 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from rolepermissions.roles import assign_role
 
+from apps.core.partials import bump_user_partials
+
 from .models import UserProfile
+from .roles import bump_role_version, clear_role_cache
 
 User = get_user_model()
 
@@ -28,3 +31,33 @@ def create_user_profile(sender, instance, created, **kwargs):
     """
     if created:
         UserProfile.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=UserProfile)
+def invalidate_user_partials(sender, instance, **kwargs):
+    """Names and onboarding progress appear in the user's cached partials."""
+    bump_user_partials(instance.pk if sender is User else instance.user_id)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_role_cache(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Roles are groups, so any group change invalidates the cached roles of the
+    affected users (see apps.accounts.roles).
+    """
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            clear_role_cache(instance)
+            bump_role_version(instance.pk)
+        return
+
+    # Changed from the group side: invalidate every member affected
+    if action in ("post_add", "post_remove"):
+        user_ids = pk_set or ()
+    elif action == "pre_clear":
+        user_ids = instance.user_set.values_list("pk", flat=True)
+    else:
+        return
+    for user_id in user_ids:
+        bump_role_version(user_id)
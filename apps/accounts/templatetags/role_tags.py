@@ -1,5 +1,6 @@
 from django import template
-from rolepermissions.checkers import has_role
+
+from apps.accounts.roles import has_role
 
 register = template.Library()
 
@@ -1,6 +1,13 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.contrib.sessions.backends.cache import SessionStore
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from rolepermissions.roles import assign_role, remove_role
+
+from .roles import bind_session, get_role_names, has_role
 
 User = get_user_model()
 
@@ -122,3 +129,106 @@ class ProfileAccountViewTests(TestCase):
         """Test that profile-security view requires authentication"""
         response = self.client.get(reverse("profile-security"))
         self.assertEqual(response.status_code, 302)  # Redirect to login
+
+
+@override_settings(ROLE_CACHE_IN_SESSION=True)
+class RoleCacheTests(TestCase):
+    """Tests for the request-scoped role cache"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="roleuser", password="pass12345")
+        self.session = SessionStore()
+
+    def fresh_user(self):
+        return bind_session(User.objects.get(pk=self.user.pk), self.session)
+
+    def test_repeated_checks_query_once(self):
+        """Test that role checks on one user object share a single query"""
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(has_role(user, "user"))
+            self.assertFalse(has_role(user, ["admin", "super_admin"]))
+            self.assertFalse(has_role(user, "developer"))
+
+    def test_assign_role_invalidates_memo(self):
+        """Test that assigning a role is visible on the same user object"""
+        self.assertFalse(has_role(self.user, "admin"))
+        assign_role(self.user, "admin")
+        self.assertTrue(has_role(self.user, "admin"))
+        remove_role(self.user, "admin")
+        self.assertFalse(has_role(self.user, "admin"))
+
+    def test_session_cache_spans_requests(self):
+        """Test that a later request reads roles from the session"""
+        self.assertEqual(get_role_names(self.fresh_user()), {"user"})
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_role_names(user), {"user"})
+
+    def test_session_cache_off_without_shared_cache(self):
+        """Test that roles aren't kept in the session when it's disabled"""
+        with self.settings(ROLE_CACHE_IN_SESSION=False):
+            get_role_names(self.fresh_user())
+            self.assertNotIn("_role_names", self.session)
+            user = self.fresh_user()
+            with self.assertNumQueries(1):
+                get_role_names(user)
+
+    def test_role_change_invalidates_session_cache(self):
+        """Test that role changes made elsewhere discard the session entry"""
+        get_role_names(self.fresh_user())
+        assign_role(User.objects.get(pk=self.user.pk), "developer")
+        self.assertTrue(has_role(self.fresh_user(), "developer"))
+
+        get_role_names(self.fresh_user())
+        Group.objects.get(name="developer").user_set.remove(self.user)
+        self.assertFalse(has_role(self.fresh_user(), "developer"))
+
+    def test_superuser_has_every_role(self):
+        """Test that superusers pass every role check without a query"""
+        admin = User.objects.create_superuser(username="root", password="pass12345")
+        with self.assertNumQueries(0):
+            self.assertTrue(has_role(admin, "content_manager"))
+
+    def test_navbar_roles_resolved_once(self):
+        """Test that a page render queries the user's groups only once"""
+        self.client.login(username="roleuser", password="pass12345")
+        self.client.get(reverse("profile-account"))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("profile-account"))
+        group_queries = [q for q in queries if "auth_user_groups" in q["sql"]]
+        self.assertEqual(group_queries, [])
+
+
+class ProfilePartialCacheTests(TestCase):
+    """Tests for caching the profile tab partials"""
+
+    def setUp(self):
+        from apps.candidates.models import CandidateProfile
+
+        self.user = User.objects.create_user(username="cached", password="testpass123")
+        self.candidate = CandidateProfile.objects.create(user=self.user)
+        self.client.login(username="cached", password="testpass123")
+
+    def test_education_tab_cached_until_records_change(self):
+        """Test that the education tab is reused until an education record changes"""
+        from apps.candidates.models import EducationHistory
+
+        url = reverse("profile-education")
+        headers = {"HX-Request": "true"}
+        # The first response issues the CSRF cookie its form is bound to
+        self.client.get(url, headers=headers)
+        self.client.get(url, headers=headers)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, headers=headers)
+        self.assertFalse(
+            [q for q in queries if "candidates_educationhistory" in q["sql"]]
+        )
+
+        EducationHistory.objects.create(
+            candidate=self.candidate,
+            institution="Wits University",
+            field_of_study="Computer Science",
+            year_completed=2015,
+        )
+        self.assertContains(self.client.get(url, headers=headers), "Wits University")
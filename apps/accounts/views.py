@@ -1,9 +1,12 @@
-from django.shortcuts import render, redirect
-from django.contrib.auth.decorators import login_required
-from django.contrib.auth import get_user_model
 from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import redirect, render
 
+from apps.content.versioning import get_catalog_version
 from apps.core.context_processors import navbar_context
+from apps.core.partials import cache_partial
+
 from .forms import ProfileForm
 
 
@@ -24,6 +27,7 @@ def profile(request):
 
 
 @login_required
+@cache_partial("profile_account", per_user=True)
 def profile_account(request):
     """HTMX partial view for account information tab"""
     if request.method == "POST":
@@ -40,6 +44,7 @@ def profile_account(request):
 
 
 @login_required
+@cache_partial("profile_security", per_user=True)
 def profile_security(request):
     """HTMX partial view for security tab"""
     context = navbar_context(request)
@@ -49,7 +54,7 @@ def profile_security(request):
 @login_required
 def profile_onboarding(request):
     """HTMX partial view for onboarding tab"""
-    from rolepermissions.checkers import has_role
+    from .roles import has_role
 
     # Prevent privileged users from accessing this view
     if (
@@ -68,9 +73,11 @@ def profile_onboarding(request):
 
 
 @login_required
+@cache_partial("profile_education", per_user=True)
 def profile_education(request):
     """HTMX partial view for education history tab"""
     from django.http import HttpResponseForbidden
+
     from apps.candidates.forms import EducationHistoryForm
     from apps.candidates.models import EducationHistory
 
@@ -107,8 +114,9 @@ def profile_education(request):
 @login_required
 def profile_education_detail(request, pk):
     """HTMX view for updating/deleting specific education items"""
-    from django.shortcuts import get_object_or_404
     from django.http import HttpResponse, HttpResponseForbidden
+    from django.shortcuts import get_object_or_404
+
     from apps.candidates.forms import EducationHistoryForm
     from apps.candidates.models import EducationHistory
 
@@ -142,9 +150,11 @@ def profile_education_detail(request, pk):
 
 
 @login_required
+@cache_partial("profile_experience", per_user=True)
 def profile_experience(request):
     """HTMX partial view for work experience tab"""
     from django.http import HttpResponseForbidden
+
     from apps.candidates.forms import WorkExperienceForm
     from apps.candidates.models import WorkExperience
 
@@ -181,8 +191,9 @@ def profile_experience(request):
 @login_required
 def profile_experience_detail(request, pk):
     """HTMX view for updating/deleting specific work experience items"""
-    from django.shortcuts import get_object_or_404
     from django.http import HttpResponse, HttpResponseForbidden
+    from django.shortcuts import get_object_or_404
+
     from apps.candidates.forms import WorkExperienceForm
     from apps.candidates.models import WorkExperience
 
@@ -213,9 +224,11 @@ def profile_experience_detail(request, pk):
 
 
 @login_required
+@cache_partial("profile_targets", per_user=True, version=get_catalog_version)
 def profile_targets(request):
     """HTMX partial view for target occupations tab"""
     from django.http import HttpResponseForbidden
+
     from apps.candidates.forms import OccupationTargetForm
     from apps.candidates.models import OccupationTarget
 
@@ -258,8 +271,9 @@ def profile_targets(request):
 @login_required
 def profile_targets_detail(request, pk):
     """HTMX view for updating/deleting specific target occupations"""
-    from django.shortcuts import get_object_or_404
     from django.http import HttpResponseForbidden
+    from django.shortcuts import get_object_or_404
+
     from apps.candidates.models import OccupationTarget
 
     # Ensure user has a candidate profile
@@ -368,7 +382,8 @@ def user_list(request):
     """
     from django.core.paginator import Paginator
     from django.db.models import Q
-    from rolepermissions.checkers import has_role
+
+    from .roles import has_role
 
     if not (
         request.user.is_superuser
@@ -409,8 +424,9 @@ def user_edit(request, pk):
     Edit a user. Accessible by superadmin, admin, and developer.
     """
     from django.shortcuts import get_object_or_404
-    from rolepermissions.checkers import has_role
+
     from .forms import UserAdminForm
+    from .roles import has_role
 
     if not (
         request.user.is_superuser
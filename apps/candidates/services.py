@@ -2,6 +2,7 @@ from django.db.models import Count, Q
 from django.utils import timezone
 from .models import CandidateProfile, AssessmentResponse
 from apps.content.models import Occupation
+from apps.content.stats import get_occupation_stats
 
 # Proficiency Scoring Weights
 PROFICIENCY_SCORING_WEIGHTS = {
@@ -10,10 +11,6 @@ PROFICIENCY_SCORING_WEIGHTS = {
     "QUALIFICATION": 0.20,   # Weight for education relevancy to the occupation
 }
 
-# Task Coverage for Assessments
-# Candidates are assessed on 80% of tasks per occupation, not all tasks.
-# This makes assessments more manageable while still being comprehensive.
-TASK_COVERAGE_PERCENTAGE = 0.80
 
 
 def get_candidate_occupation_score(candidate: CandidateProfile, occupation: Occupation):
@@ -24,9 +21,10 @@ def get_candidate_occupation_score(candidate: CandidateProfile, occupation: Occu
     3. Qualification relevancy (Education)
     """
     # 1. Assessment Score (50%)
-    all_tasks_count = occupation.tasks.count()
+    stats = get_occupation_stats(occupation)
+    all_tasks_count = stats.task_count
     # We only assess 80% of tasks, so proficiency is calculated against this subset
-    required_tasks_count = max(1, int(all_tasks_count * TASK_COVERAGE_PERCENTAGE))
+    required_tasks_count = stats.required_task_count
     
     assessment_score = 0
     if all_tasks_count > 0:
@@ -126,7 +124,9 @@ def compute_candidate_stats(candidate: CandidateProfile):
     candidate.highest_nqf_level = max_nqf_label
 
     # 2. Occupation Matches (Targets)
-    targets = candidate.occupation_targets.select_related('occupation', 'occupation__industry').all()
+    targets = candidate.occupation_targets.select_related(
+        'occupation', 'occupation__industry', 'occupation__stats'
+    ).all()
     candidate.occupation_matches_count = targets.count()
     
     # 3. Assessment Progress
@@ -143,9 +143,8 @@ def compute_candidate_stats(candidate: CandidateProfile):
         if occ.industry:
             target_industries.add(occ.industry)
 
-        all_tasks_count = occ.tasks.count()
         # Show progress against 80% of tasks (the required amount for proficiency)
-        required_tasks_count = max(1, int(all_tasks_count * TASK_COVERAGE_PERCENTAGE))
+        required_tasks_count = get_occupation_stats(occ).required_task_count
         
         responded_tasks = AssessmentResponse.objects.filter(
             candidate=candidate,
@@ -200,7 +199,9 @@ def compute_candidate_stats(candidate: CandidateProfile):
         if slots_available > 0:
             suggestions = Occupation.objects.filter(
                 industry__in=target_industries
-            ).exclude(id__in=target_occupation_ids)[:slots_available]
+            ).exclude(id__in=target_occupation_ids).select_related(
+                "industry", "stats"
+            )[:slots_available]
 
             for occ in suggestions:
                  proficiency_stats.append({
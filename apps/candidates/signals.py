@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.partials import bump_user_partials
+
+from .models import CandidateProfile, EducationHistory, OccupationTarget, WorkExperience
+
+
+@receiver(post_save, sender=CandidateProfile)
+@receiver(post_delete, sender=CandidateProfile)
+def candidate_changed(sender, instance, **kwargs):
+    """Invalidate the candidate's cached profile and onboarding partials."""
+    bump_user_partials(instance.user_id)
+
+
+@receiver(post_save, sender=EducationHistory)
+@receiver(post_delete, sender=EducationHistory)
+@receiver(post_save, sender=WorkExperience)
+@receiver(post_delete, sender=WorkExperience)
+@receiver(post_save, sender=OccupationTarget)
+@receiver(post_delete, sender=OccupationTarget)
+def candidate_record_changed(sender, instance, **kwargs):
+    """Invalidate the cached partials listing the candidate's records."""
+    user_id = (
+        CandidateProfile.objects.filter(pk=instance.candidate_id)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+    if user_id is not None:
+        bump_user_partials(user_id)
@@ -2,7 +2,9 @@ from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect, render
 
 from apps.accounts.models import UserProfile
+from apps.content.versioning import get_catalog_version
 from apps.core.context_processors import navbar_context
+from apps.core.partials import cache_partial
 
 from .forms import (
     EducationHistoryForm,
@@ -94,6 +96,7 @@ def onboarding_profile(request):
 
 
 @login_required
+@cache_partial("onboarding_education", per_user=True)
 def onboarding_education(request):
     """Education step (Score 2→4)."""
     candidate = get_or_create_candidate_profile(request.user)
@@ -157,6 +160,7 @@ def onboarding_education(request):
 
 
 @login_required
+@cache_partial("onboarding_experience", per_user=True)
 def onboarding_experience(request):
     """Work experience step (Score 4→6)."""
     candidate = get_or_create_candidate_profile(request.user)
@@ -196,6 +200,7 @@ def onboarding_experience(request):
 
 
 @login_required
+@cache_partial("onboarding_targets", per_user=True, version=get_catalog_version)
 def onboarding_targets(request):
     """Target occupations step (Score 6→8)."""
     candidate = get_or_create_candidate_profile(request.user)
@@ -402,7 +407,7 @@ def occupation_assessment(request, occupation_id):
     from django.urls import reverse
     from apps.content.models import Occupation, OccupationTask
     from .models import AssessmentResponse
-    from .services import TASK_COVERAGE_PERCENTAGE
+    from apps.content.stats import required_task_count
     
     candidate = get_or_create_candidate_profile(request.user)
     
@@ -430,7 +435,7 @@ def occupation_assessment(request, occupation_id):
     
     # Calculate how many tasks to show (80%)
     total_count = len(all_tasks)
-    required_count = max(1, int(total_count * TASK_COVERAGE_PERCENTAGE))
+    required_count = required_task_count(total_count)
     
     # Deterministic random selection based on candidate+occupation
     # This ensures the same candidate always gets the same tasks for this occupation
@@ -1,8 +1,11 @@
 from django.contrib import admin
+from django.db.models import Count
 from simple_history.admin import SimpleHistoryAdmin
 from dhet_admin.admin import ModelAdmin, TabularInline
 
-from .models import Industry, Occupation, OccupationTask, Skill
+from apps.core.db.replica import ReplicaChangelistMixin
+
+from .models import Industry, Occupation, OccupationTask, OfoGroup, Skill
 
 
 class OccupationTaskInline(TabularInline):
@@ -12,24 +15,41 @@ class OccupationTaskInline(TabularInline):
 
 
 @admin.register(Industry)
-class IndustryAdmin(SimpleHistoryAdmin, ModelAdmin):
+class IndustryAdmin(ReplicaChangelistMixin, SimpleHistoryAdmin, ModelAdmin):
     list_display = ["name", "code"]
     search_fields = ["name", "code"]
     history_list_display = ["name", "code"]
 
 
+@admin.register(OfoGroup)
+class OfoGroupAdmin(ReplicaChangelistMixin, ModelAdmin):
+    list_display = ["code", "title", "level", "occupation_count", "task_count", "target_count"]
+    search_fields = ["code", "title"]
+    list_filter = ["level"]
+    readonly_fields = ["code", "level", "parent", "occupation_count", "task_count", "target_count", "computed_at"]
+
+
 @admin.register(Occupation)
-class OccupationAdmin(SimpleHistoryAdmin, ModelAdmin):
-    list_display = ["ofo_code", "ofo_title", "industry", "years_of_experience"]
+class OccupationAdmin(ReplicaChangelistMixin, SimpleHistoryAdmin, ModelAdmin):
+    list_display = ["ofo_code", "ofo_title", "industry", "years_of_experience", "get_task_count", "get_target_count"]
     search_fields = ["ofo_code", "ofo_title", "industry__name"]
     list_filter = ["industry", "years_of_experience"]
+    list_select_related = ["industry", "stats"]
     inlines = [OccupationTaskInline]
     history_list_display = ["ofo_code", "ofo_title"]
     raw_id_fields = ["industry"]
 
+    @admin.display(description="Tasks")
+    def get_task_count(self, obj):
+        return getattr(getattr(obj, "stats", None), "task_count", None)
+
+    @admin.display(description="Targets")
+    def get_target_count(self, obj):
+        return getattr(getattr(obj, "stats", None), "target_count", None)
+
 
 @admin.register(OccupationTask)
-class OccupationTaskAdmin(SimpleHistoryAdmin, ModelAdmin):
+class OccupationTaskAdmin(ReplicaChangelistMixin, SimpleHistoryAdmin, ModelAdmin):
     list_display = ["title", "occupation", "get_skill_count"]
     search_fields = ["title", "occupation__ofo_code", "occupation__ofo_title"]
     list_filter = ["occupation__industry", "occupation"]
@@ -57,13 +77,16 @@ class OccupationTaskAdmin(SimpleHistoryAdmin, ModelAdmin):
         ),
     )
 
-    @admin.display(description="Skills")
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(skill_count=Count("skills"))
+
+    @admin.display(description="Skills", ordering="skill_count")
     def get_skill_count(self, obj):
-        return obj.skills.count()
+        return obj.skill_count
 
 
 @admin.register(Skill)
-class SkillAdmin(SimpleHistoryAdmin, ModelAdmin):
+class SkillAdmin(ReplicaChangelistMixin, SimpleHistoryAdmin, ModelAdmin):
     list_display = ["name"]
     search_fields = ["name"]
     history_list_display = ["name"]
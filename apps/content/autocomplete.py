@@ -0,0 +1,119 @@
+"""
+In-process prefix indexes backing the autocomplete endpoints.
+
+Each index holds every word-start suffix of the normalised item text in a
+sorted list, so a prefix lookup is a binary search followed by a short scan.
+"Manage project timelines" is found by "man", "proj" and "project ti".
+Indexes are rebuilt lazily, once per process, when the catalog version
+changes. An index younger than AUTOCOMPLETE_REBUILD_SECONDS is kept even if
+the catalog moved on: during an import every save bumps the version, and each
+worker would otherwise rebuild the full task index on almost every request.
+Responses are keyed by the version of the index that served them, so stale
+results are not cached or validated under the new catalog version.
+"""
+
+import bisect
+import re
+import time
+
+from django.conf import settings
+
+from .models import Industry, OccupationTask
+from .versioning import get_catalog_version
+
+# Upper bound on matches scanned per lookup before ranking
+MAX_SCAN = 500
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalise(text):
+    return _WHITESPACE.sub(" ", (text or "").lower()).strip()
+
+
+class PrefixIndex:
+    """Sorted word-start suffix index over a list of items."""
+
+    def __init__(self, items, key):
+        self.items = items
+        self.version = None  # catalog version it was built from
+        self.texts = [normalise(key(item)) for item in items]
+        entries = []
+        for position, text in enumerate(self.texts):
+            start = 0
+            while start != -1:
+                entries.append((text[start:], position))
+                start = text.find(" ", start)
+                if start != -1:
+                    start += 1
+        entries.sort()
+        self.keys = [suffix for suffix, _ in entries]
+        self.positions = [position for _, position in entries]
+
+    def search(self, query, limit):
+        """
+        Return up to `limit` items containing a word that starts with `query`.
+        Items whose text starts with the query rank first, then alphabetical.
+        An empty query returns the first items in their original order.
+        """
+        query = normalise(query)
+        if not query:
+            return self.items[:limit]
+
+        matches = set()
+        i = bisect.bisect_left(self.keys, query)
+        while (
+            i < len(self.keys)
+            and self.keys[i].startswith(query)
+            and len(matches) < MAX_SCAN
+        ):
+            matches.add(self.positions[i])
+            i += 1
+
+        ranked = sorted(
+            matches,
+            key=lambda p: (not self.texts[p].startswith(query), self.texts[p]),
+        )
+        return [self.items[p] for p in ranked[:limit]]
+
+
+def build_industry_index():
+    industries = Industry.objects.order_by("name").values("id", "name")
+    return PrefixIndex(list(industries), key=lambda item: item["name"])
+
+
+def build_task_index():
+    """Index distinct task titles, keeping the first description seen."""
+    tasks = {}
+    queryset = OccupationTask.objects.order_by("title").values_list(
+        "title", "description"
+    )
+    for title, description in queryset.iterator(chunk_size=2000):
+        tasks.setdefault(normalise(title), {"title": title, "description": description})
+    return PrefixIndex(list(tasks.values()), key=lambda item: item["title"])
+
+
+BUILDERS = {
+    "industries": build_industry_index,
+    "tasks": build_task_index,
+}
+
+_indexes = {}
+
+
+def get_index(kind):
+    """
+    Return the index for `kind`, rebuilding it if the catalog has changed and
+    the current index is older than AUTOCOMPLETE_REBUILD_SECONDS.
+    """
+    version = get_catalog_version()
+    cached = _indexes.get(kind)
+    if cached is not None:
+        built_at, index = cached
+        min_age = getattr(settings, "AUTOCOMPLETE_REBUILD_SECONDS", 30)
+        if index.version == version or time.monotonic() - built_at < min_age:
+            return index
+    index = BUILDERS[kind]()
+    index.version = version
+    _indexes[kind] = (time.monotonic(), index)
+    return index
@@ -0,0 +1,117 @@
+"""
+Conditional GET for catalog pages.
+
+`conditional_page` gives a view an ETag and Last-Modified built from version
+stamps alone, so a repeat visit or HTMX re-fetch of an unchanged page gets a
+304 without rendering or running the page's queries. The validators change
+with:
+
+- the catalog version, and the occupation's version for occupation pages
+- the user's role version and partials version (their profile, candidate
+  record and targets; see apps.core.partials)
+- the candidate's stats_last_computed (recommendations and scores)
+- the HX-Request header and the CSRF secret, as the body embeds both
+
+Requests with flash messages waiting always get a full response.
+"""
+
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from apps.accounts.roles import get_role_version
+from apps.candidates.models import CandidateProfile
+from apps.core.partials import get_user_partials_version
+
+from .versioning import get_catalog_version, get_occupation_version, version_datetime
+
+
+def page_validators(request, occupation_id=None, **kwargs):
+    """(ETag, Last-Modified) of a catalog page, or (None, None) to render it."""
+    if request.method not in ("GET", "HEAD") or len(get_messages(request)):
+        return None, None
+    user = request.user
+    versions = [
+        get_catalog_version(),
+        get_occupation_version(occupation_id) if occupation_id else 0,
+        get_role_version(user.pk),
+        get_user_partials_version(user.pk),
+    ]
+    stats_computed = (
+        CandidateProfile.objects.filter(user=user)
+        .values_list("stats_last_computed", flat=True)
+        .first()
+    )
+    last_modified = max(version_datetime(version) for version in versions)
+    if stats_computed is not None:
+        last_modified = max(last_modified, stats_computed)
+
+    key = ":".join(
+        str(part)
+        for part in [
+            *versions,
+            stats_computed.timestamp() if stats_computed else "",
+            settings.SPECTACULAR_SETTINGS.get("VERSION", ""),
+            "partial" if request.headers.get("HX-Request") else "page",
+            request.META.get("CSRF_COOKIE", ""),
+            request.get_full_path(),
+        ]
+    )
+    return f'W/"{hashlib.md5(key.encode()).hexdigest()}"', last_modified
+
+
+def _etag(request, *args, **kwargs):
+    return request._page_validators[0]
+
+
+def _last_modified(request, *args, **kwargs):
+    return request._page_validators[1]
+
+
+def conditional_page(view_func):
+    """
+    Answer conditional GETs of a catalog page with 304 Not Modified (see the
+    module docstring). Works with sync and async views.
+    """
+    conditional_view = condition(etag_func=_etag, last_modified_func=_last_modified)(
+        view_func
+    )
+
+    def finish(request, response, csrf_secret):
+        if request.META.get("CSRF_COOKIE") != csrf_secret:
+            # A new CSRF secret was issued while rendering, so the validators
+            # don't describe this body; the next visit gets them
+            del response["ETag"]
+            del response["Last-Modified"]
+        elif request._page_validators[0]:
+            # Browsers keep the page but revalidate it on every visit
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ("HX-Request",))
+        return response
+
+    if iscoroutinefunction(view_func):
+
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            request._page_validators = await sync_to_async(page_validators)(
+                request, *args, **kwargs
+            )
+            csrf_secret = request.META.get("CSRF_COOKIE")
+            response = await conditional_view(request, *args, **kwargs)
+            return finish(request, response, csrf_secret)
+
+    else:
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            request._page_validators = page_validators(request, *args, **kwargs)
+            csrf_secret = request.META.get("CSRF_COOKIE")
+            response = conditional_view(request, *args, **kwargs)
+            return finish(request, response, csrf_secret)
+
+    return wrapper
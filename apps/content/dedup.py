@@ -0,0 +1,207 @@
+"""
+Near-duplicate task detection with MinHash and locality-sensitive hashing.
+
+Each task's normalised title and description is split into character
+shingles and summarised by a MinHash signature, whose agreement rate between
+two tasks estimates the Jaccard similarity of their shingle sets. Signatures
+are cut into bands; tasks sharing any band bucket are candidate duplicates,
+so lookups and clustering only compare tasks that collide instead of every
+pair. With 16 bands of 4 rows, pairs around 0.5 similarity collide about
+half the time and pairs above 0.8 almost always do.
+"""
+
+import hashlib
+import random
+import zlib
+from collections import defaultdict
+
+from django.db import transaction
+
+from .autocomplete import normalise
+from .models import OccupationTask, TaskFingerprint, TaskLshBand
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+DUPLICATE_THRESHOLD = 0.6
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Fixed seed: signatures are stored, so the permutations must never change
+_random = random.Random(20240601)
+_PERMUTATIONS = [
+    (_random.randrange(1, _PRIME), _random.randrange(0, _PRIME))
+    for _ in range(NUM_PERM)
+]
+
+
+def task_text(title, description=""):
+    return normalise(f"{title} {description}")
+
+
+def shingles(text):
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i : i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    """MinHash signature of the text's shingles, or None for empty text."""
+    hashes = [zlib.crc32(shingle.encode()) for shingle in shingles(text)]
+    if not hashes:
+        return None
+    return [
+        min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def band_keys(signature):
+    keys = []
+    for band in range(BANDS):
+        rows = ",".join(map(str, signature[band * ROWS : (band + 1) * ROWS]))
+        keys.append(f"{band}:{hashlib.md5(rows.encode()).hexdigest()[:16]}")
+    return keys
+
+
+def estimate_similarity(signature, other):
+    return sum(1 for x, y in zip(signature, other) if x == y) / NUM_PERM
+
+
+# ------------- Index maintenance -------------
+
+
+def index_tasks(queryset=None, batch_size=1000):
+    """
+    Brings fingerprints and band buckets up to date for the given tasks (all
+    by default). Only tasks whose text changed since they were last indexed
+    are re-hashed. Returns the number of tasks (re)indexed.
+    """
+    if queryset is None:
+        queryset = OccupationTask.objects.all()
+    rows = queryset.values_list("id", "title", "description", "fingerprint__text_hash")
+
+    indexed = 0
+    batch = []
+    for row in rows.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            indexed += _index_batch(batch)
+            batch = []
+    if batch:
+        indexed += _index_batch(batch)
+    return indexed
+
+
+def _index_batch(rows):
+    fingerprints = []
+    bands = []
+    changed = []
+    for task_id, title, description, stored_hash in rows:
+        text = task_text(title, description)
+        text_hash = hashlib.md5(text.encode()).hexdigest()
+        if text_hash == stored_hash:
+            continue
+        changed.append(task_id)
+        signature = minhash(text)
+        if signature is None:
+            continue
+        fingerprints.append(
+            TaskFingerprint(task_id=task_id, text_hash=text_hash, signature=signature)
+        )
+        bands.extend(
+            TaskLshBand(task_id=task_id, key=key) for key in band_keys(signature)
+        )
+
+    if changed:
+        with transaction.atomic():
+            TaskFingerprint.objects.filter(task_id__in=changed).delete()
+            TaskLshBand.objects.filter(task_id__in=changed).delete()
+            TaskFingerprint.objects.bulk_create(fingerprints, batch_size=1000)
+            TaskLshBand.objects.bulk_create(bands, batch_size=1000)
+    return len(changed)
+
+
+# ------------- Queries -------------
+
+
+def find_similar_tasks(
+    title, description="", exclude=(), limit=5, threshold=DUPLICATE_THRESHOLD
+):
+    """
+    Return up to `limit` (task, score) pairs whose text is estimated to be at
+    least `threshold` similar to the given title and description.
+    """
+    signature = minhash(task_text(title, description))
+    if signature is None:
+        return []
+
+    candidate_ids = set(
+        TaskLshBand.objects.filter(key__in=band_keys(signature)).values_list(
+            "task_id", flat=True
+        )
+    ) - set(exclude)
+    scored = []
+    for task_id, other in TaskFingerprint.objects.filter(
+        task_id__in=candidate_ids
+    ).values_list("task_id", "signature"):
+        score = estimate_similarity(signature, other)
+        if score >= threshold:
+            scored.append((score, task_id))
+    scored.sort(reverse=True)
+    scored = scored[:limit]
+
+    tasks = OccupationTask.objects.select_related("occupation").in_bulk(
+        [task_id for _, task_id in scored]
+    )
+    return [(tasks[task_id], score) for score, task_id in scored if task_id in tasks]
+
+
+def find_duplicate_clusters(threshold=DUPLICATE_THRESHOLD, min_size=2):
+    """
+    Group indexed tasks into clusters of near-duplicates. Returns a list of
+    task id lists, largest cluster first.
+
+    Within each bucket every member is compared with the bucket's first
+    member only, so a bucket costs linear time; clusters are then closed
+    transitively with union-find across all buckets.
+    """
+    signatures = dict(TaskFingerprint.objects.values_list("task_id", "signature"))
+
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    checked = set()
+    anchor_key, anchor = None, None
+    for key, task_id in (
+        TaskLshBand.objects.order_by("key")
+        .values_list("key", "task_id")
+        .iterator(chunk_size=5000)
+    ):
+        if key != anchor_key:
+            anchor_key, anchor = key, task_id
+            continue
+        pair = (anchor, task_id) if anchor < task_id else (task_id, anchor)
+        if pair in checked:
+            continue
+        checked.add(pair)
+        if anchor in signatures and task_id in signatures:
+            score = estimate_similarity(signatures[anchor], signatures[task_id])
+            if score >= threshold:
+                parent[find(task_id)] = find(anchor)
+
+    clusters = defaultdict(list)
+    for task_id in parent:
+        clusters[find(task_id)].append(task_id)
+    return sorted(
+        (sorted(members) for members in clusters.values() if len(members) >= min_size),
+        key=len,
+        reverse=True,
+    )
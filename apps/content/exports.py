@@ -0,0 +1,128 @@
+"""
+Streaming exports of the occupation catalog.
+
+Rows are produced lazily from a chunked queryset iterator so memory stays flat
+regardless of catalog size. The CSV and JSON Lines layouts match the input
+formats accepted by the `load_ofo` management command, so an export can be
+loaded back as-is.
+"""
+
+import csv
+import json
+import zlib
+
+from django.db.models import Prefetch
+
+from .models import Occupation, OccupationTask, Skill
+
+# Occupations fetched (and prefetched) per database round-trip
+EXPORT_CHUNK_SIZE = 500
+
+# Flush the output buffer once it reaches this many bytes
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+CSV_HEADER = [
+    "ofo_code",
+    "ofo_title",
+    "description",
+    "industry_code",
+    "industry_name",
+    "years_of_experience",
+    "preferred_nqf_level",
+    "task_title",
+    "task_description",
+    "skills",
+]
+
+
+class Echo:
+    """Pseudo-buffer that returns written values instead of storing them."""
+
+    def write(self, value):
+        return value
+
+
+def catalog_queryset():
+    """Occupations with industry joined and tasks/skills prefetched per chunk."""
+    return (
+        Occupation.objects.select_related("industry")
+        .prefetch_related(
+            Prefetch(
+                "tasks",
+                queryset=OccupationTask.objects.only(
+                    "id", "occupation_id", "title", "description"
+                ).order_by("title"),
+            ),
+            Prefetch("tasks__skills", queryset=Skill.objects.only("id", "name")),
+        )
+        .order_by("ofo_code")
+    )
+
+
+def iter_occupations(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield plain dicts for each occupation, one chunk of rows at a time."""
+    for occupation in queryset.iterator(chunk_size=chunk_size):
+        industry = occupation.industry
+        yield {
+            "ofo_code": occupation.ofo_code,
+            "ofo_title": occupation.ofo_title,
+            "description": occupation.description,
+            "industry_code": industry.code if industry else "",
+            "industry_name": industry.name if industry else "",
+            "years_of_experience": occupation.years_of_experience,
+            "preferred_nqf_level": occupation.preferred_nqf_level,
+            "tasks": [
+                {
+                    "title": task.title,
+                    "description": task.description,
+                    "skills": sorted(skill.name for skill in task.skills.all()),
+                }
+                for task in occupation.tasks.all()
+            ],
+        }
+
+
+def iter_csv(records):
+    """Yield CSV lines, one per task (or one per occupation without tasks)."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for record in records:
+        base = [record[column] for column in CSV_HEADER[:7]]
+        if not record["tasks"]:
+            yield writer.writerow(base + ["", "", ""])
+        for task in record["tasks"]:
+            yield writer.writerow(
+                base + [task["title"], task["description"], ";".join(task["skills"])]
+            )
+
+
+def iter_jsonl(records):
+    """Yield one JSON document per occupation."""
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def iter_buffered(lines, size=EXPORT_BUFFER_SIZE):
+    """Coalesce small string chunks into encoded blocks of roughly `size` bytes."""
+    buffer = []
+    buffered = 0
+    for line in lines:
+        data = line.encode("utf-8")
+        buffer.append(data)
+        buffered += len(data)
+        if buffered >= size:
+            yield b"".join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def iter_gzip(blocks):
+    """Compress a byte stream into a gzip file on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for block in blocks:
+        data = compressor.compress(block)
+        if data:
+            yield data
+    yield compressor.flush()
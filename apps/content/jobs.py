@@ -0,0 +1,225 @@
+"""
+Background jobs for the content catalog.
+
+Deleting occupations in a request cascades through tasks, candidate responses,
+targets and M2M rows, writing one history row per deleted object. Here the
+dependents are removed leaf-first in bounded batches, each in its own short
+transaction, with their history rows written in bulk. Those deletes are raw
+SQL and send no signals, so the job does itself what the post_delete
+receivers would: history rows, candidate stats flags, similarity refreshes and
+cache version bumps.
+"""
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.candidates.models import (
+    AssessmentResponse,
+    CandidateProfile,
+    OccupationTarget,
+    WorkExperience,
+)
+from apps.core.jobs import enqueue, register, report_progress
+from apps.core.models import BackgroundJob
+from apps.core.partials import bump_user_partials
+
+from .models import (
+    Occupation,
+    OccupationSimilarity,
+    OccupationTask,
+    TaskFingerprint,
+    TaskLshBand,
+)
+from .services import refresh_occupation_similarity
+from .versioning import bump_catalog_version, bump_occupation_versions
+
+DELETE_OCCUPATIONS = "content.delete_occupations"
+DELETE_BATCH_SIZE = 500
+REFRESH_SIMILARITY = "content.refresh_similarity"
+SIMILARITY_BATCH_SIZE = 200
+
+
+def bulk_history_delete(model, objs, user_id=None, reason="Bulk delete"):
+    """Write "-" history rows for `objs` in one INSERT."""
+    if not getattr(settings, "SIMPLE_HISTORY_ENABLED", True):
+        return
+    history_model = model.history.model
+    now = timezone.now()
+    history_model.objects.bulk_create(
+        [
+            history_model(
+                history_date=now,
+                history_type="-",
+                history_user_id=user_id,
+                history_change_reason=reason,
+                **{
+                    field.attname: getattr(obj, field.attname)
+                    for field in history_model.tracked_fields
+                },
+            )
+            for obj in objs
+        ]
+    )
+
+
+def _delete_rows(model, pks):
+    """
+    DELETE by primary key without loading rows or sending signals: no
+    history, stats or cache version receivers run for these rows.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.pk.column)
+    placeholders = ", ".join(["%s"] * len(pks))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE {column} IN ({placeholders})", pks)
+
+
+def _dependent_steps(occupation_ids):
+    """(label, queryset, keep history) for each dependent table, leaves first."""
+    return [
+        (
+            "assessment responses",
+            AssessmentResponse.objects.filter(task__occupation_id__in=occupation_ids),
+            True,
+        ),
+        (
+            "occupation targets",
+            OccupationTarget.objects.filter(occupation_id__in=occupation_ids),
+            True,
+        ),
+        (
+            "work experience task links",
+            WorkExperience.tasks.through.objects.filter(
+                occupationtask__occupation_id__in=occupation_ids
+            ),
+            False,
+        ),
+        (
+            "task skill links",
+            OccupationTask.skills.through.objects.filter(
+                occupationtask__occupation_id__in=occupation_ids
+            ),
+            False,
+        ),
+        (
+            "related occupations",
+            OccupationSimilarity.objects.filter(
+                Q(occupation_id__in=occupation_ids) | Q(related_id__in=occupation_ids)
+            ),
+            False,
+        ),
+        (
+            "duplicate detection index",
+            TaskLshBand.objects.filter(task__occupation_id__in=occupation_ids),
+            False,
+        ),
+        (
+            "task fingerprints",
+            TaskFingerprint.objects.filter(task__occupation_id__in=occupation_ids),
+            False,
+        ),
+        (
+            "tasks",
+            OccupationTask.objects.filter(occupation_id__in=occupation_ids),
+            True,
+        ),
+    ]
+
+
+@register(DELETE_OCCUPATIONS)
+def delete_occupations(job):
+    """
+    Payload: {"occupation_ids": [...], "batch_size": 500}
+
+    Progress counts deleted rows across every dependent table plus the
+    occupations themselves.
+    """
+    occupation_ids = list(job.payload.get("occupation_ids", []))
+    batch_size = job.payload.get("batch_size", DELETE_BATCH_SIZE)
+    user_id = job.created_by_id
+
+    steps = _dependent_steps(occupation_ids)
+    occupations = Occupation.objects.filter(id__in=occupation_ids)
+    total = sum(queryset.count() for _, queryset, _ in steps) + occupations.count()
+    type(job).objects.filter(pk=job.pk).update(total=total)
+    job.total = total
+
+    # Flag everything that cached results derived from these occupations
+    candidates = CandidateProfile.objects.filter(
+        Q(occupation_targets__occupation_id__in=occupation_ids)
+        | Q(assessment_responses__task__occupation_id__in=occupation_ids)
+    )
+    candidate_user_ids = set(candidates.values_list("user_id", flat=True))
+    candidates.update(stats_update_needed=True)
+    mark_similarity_stale(
+        OccupationSimilarity.objects.filter(related_id__in=occupation_ids)
+        .exclude(occupation_id__in=occupation_ids)
+        .values("occupation_id")
+    )
+
+    for label, queryset, keep_history in steps:
+        report_progress(job, message=f"Deleting {label}")
+        while True:
+            with transaction.atomic():
+                if keep_history:
+                    batch = list(queryset[:batch_size])
+                    pks = [obj.pk for obj in batch]
+                else:
+                    pks = list(queryset.values_list("pk", flat=True)[:batch_size])
+                if not pks:
+                    break
+                if keep_history:
+                    bulk_history_delete(queryset.model, batch, user_id)
+                _delete_rows(queryset.model, pks)
+            report_progress(job, processed=len(pks))
+
+    # The occupations are few; a regular delete keeps their signals and
+    # cascades to anything added after this job was written.
+    report_progress(job, message="Deleting occupations")
+    while True:
+        with transaction.atomic():
+            pks = list(occupations.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                break
+            Occupation.objects.filter(pk__in=pks).delete()
+        report_progress(job, processed=len(pks))
+
+    bump_occupation_versions(occupation_ids)
+    bump_catalog_version()
+    for user_id in candidate_user_ids:
+        bump_user_partials(user_id)
+    report_progress(job, message=f"Deleted {len(occupation_ids)} occupation(s)")
+
+
+def mark_similarity_stale(occupation_ids):
+    """
+    Flag occupations for related-occupations re-computation and schedule the
+    refresh job, unless one is already waiting to run.
+    """
+    # update() skips save signals and history, which is what we want for a flag
+    flagged = Occupation.objects.filter(id__in=occupation_ids).update(
+        similarity_update_needed=True
+    )
+    waiting = BackgroundJob.objects.filter(
+        kind=REFRESH_SIMILARITY, status=BackgroundJob.Status.PENDING
+    )
+    if flagged and not waiting.exists():
+        enqueue(REFRESH_SIMILARITY)
+
+
+@register(REFRESH_SIMILARITY)
+def refresh_similarity(job):
+    """Recompute related occupations of every flagged occupation."""
+    stale_ids = list(
+        Occupation.objects.filter(similarity_update_needed=True).values_list(
+            "id", flat=True
+        )
+    )
+    type(job).objects.filter(pk=job.pk).update(total=len(stale_ids))
+    job.total = len(stale_ids)
+    for i in range(0, len(stale_ids), SIMILARITY_BATCH_SIZE):
+        batch = stale_ids[i : i + SIMILARITY_BATCH_SIZE]
+        refresh_occupation_similarity(batch)
+        report_progress(job, processed=len(batch))
@@ -0,0 +1,68 @@
+"""
+Build the related-occupations table.
+
+Usage:
+    uv run python manage.py build_occupation_similarity            # Full rebuild
+    uv run python manage.py build_occupation_similarity --stale    # Only flagged occupations
+    uv run python manage.py build_occupation_similarity --top-k 20
+"""
+
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.content.models import Occupation
+from apps.content.services import (
+    SIMILARITY_TOP_K,
+    build_occupation_similarity,
+    refresh_occupation_similarity,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Precompute top-k related occupations by shared skills and tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale",
+            action="store_true",
+            help="Only refresh occupations flagged as needing an update",
+        )
+        parser.add_argument(
+            "--top-k",
+            type=int,
+            default=SIMILARITY_TOP_K,
+            help=f"Neighbours kept per occupation (default: {SIMILARITY_TOP_K})",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Flagged occupations refreshed per batch with --stale (default: 200)",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        top_k = max(1, options["top_k"])
+
+        if options["stale"]:
+            stale_ids = list(
+                Occupation.objects.filter(similarity_update_needed=True).values_list(
+                    "id", flat=True
+                )
+            )
+            logger.info(f"Refreshing related occupations for {len(stale_ids)} occupations...")
+            rows = 0
+            for i in range(0, len(stale_ids), options["batch_size"]):
+                rows += refresh_occupation_similarity(
+                    stale_ids[i : i + options["batch_size"]], top_k=top_k
+                )
+        else:
+            logger.info("Rebuilding related occupations for the whole catalog...")
+            rows = build_occupation_similarity(top_k=top_k)
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Done! Wrote {rows} similarity rows in {elapsed:.2f}s.")
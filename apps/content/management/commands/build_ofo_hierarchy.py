@@ -0,0 +1,31 @@
+"""
+Build the OFO group hierarchy and its rollups.
+
+Usage:
+    uv run python manage.py build_ofo_hierarchy
+
+Derives major, sub-major, minor and unit groups from occupation codes, links
+occupations to their unit group and recomputes per-group occupation, task and
+candidate target counts. Safe to re-run; schedule it after catalog imports and
+periodically to refresh target counts.
+"""
+
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.content.services import build_ofo_hierarchy
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Rebuild the OFO group hierarchy and its rolled-up counts"
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        logger.info("Rebuilding the OFO hierarchy...")
+        groups = build_ofo_hierarchy()
+        elapsed = time.perf_counter() - started
+        logger.info(f"Done! {groups} groups in {elapsed:.2f}s.")
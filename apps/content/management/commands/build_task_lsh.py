@@ -0,0 +1,46 @@
+"""
+Index tasks for near-duplicate detection.
+
+Usage:
+    uv run python manage.py build_task_lsh          # Index new and changed tasks
+    uv run python manage.py build_task_lsh --full   # Drop and rebuild the index
+
+Task saves keep the index current; run this after bulk loads, which skip
+signals, or after changing the MinHash parameters (with --full).
+"""
+
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.content.dedup import index_tasks
+from apps.content.models import TaskFingerprint, TaskLshBand
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Build the MinHash LSH index used to find near-duplicate tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full", action="store_true", help="Drop the index and rebuild it"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Tasks hashed per batch (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options["full"]:
+            logger.info("Dropping the task duplicate index...")
+            TaskLshBand.objects.all().delete()
+            TaskFingerprint.objects.all().delete()
+
+        indexed = index_tasks(batch_size=options["batch_size"])
+        elapsed = time.perf_counter() - started
+        logger.info(f"Done! Indexed {indexed} tasks in {elapsed:.2f}s.")
@@ -0,0 +1,53 @@
+"""
+List clusters of near-duplicate tasks.
+
+Usage:
+    uv run python manage.py find_duplicate_tasks
+    uv run python manage.py find_duplicate_tasks --threshold 0.8 --limit 20
+
+Reads the index built by build_task_lsh.
+"""
+
+import logging
+
+from django.core.management.base import BaseCommand
+
+from apps.content.dedup import DUPLICATE_THRESHOLD, find_duplicate_clusters
+from apps.content.models import OccupationTask
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "List clusters of near-duplicate tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=DUPLICATE_THRESHOLD,
+            help=f"Minimum estimated similarity (default: {DUPLICATE_THRESHOLD})",
+        )
+        parser.add_argument(
+            "--min-size", type=int, default=2, help="Smallest cluster listed"
+        )
+        parser.add_argument(
+            "--limit", type=int, default=50, help="Clusters listed (default: 50)"
+        )
+
+    def handle(self, *args, **options):
+        clusters = find_duplicate_clusters(
+            threshold=options["threshold"], min_size=options["min_size"]
+        )
+        logger.info(f"Found {len(clusters)} clusters of near-duplicate tasks.")
+
+        shown = clusters[: options["limit"]]
+        tasks = OccupationTask.objects.select_related("occupation").in_bulk(
+            [task_id for cluster in shown for task_id in cluster]
+        )
+        for number, cluster in enumerate(shown, start=1):
+            logger.info(f"Cluster {number} ({len(cluster)} tasks):")
+            for task_id in cluster:
+                task = tasks.get(task_id)
+                if task:
+                    logger.info(f"  [{task.occupation.ofo_code}] {task.title} ({task.id})")
@@ -0,0 +1,445 @@
+"""
+Bulk load an OFO (Organising Framework for Occupations) dataset.
+
+Usage:
+    uv run python manage.py load_ofo data/ofo.jsonl
+    uv run python manage.py load_ofo data/ofo.csv --batch-size 500
+    uv run python manage.py load_ofo data/ofo.jsonl --on-conflict skip --skip-history
+
+JSON Lines: one occupation per line, with its tasks nested:
+    {"ofo_code": "251201", "ofo_title": "Software Developer", "description": "...",
+     "industry_code": "ICT", "industry_name": "Information and Communication Technology",
+     "years_of_experience": 2, "preferred_nqf_level": 6,
+     "tasks": [{"title": "...", "description": "...", "skills": ["Problem Solving"]}]}
+
+CSV: one task per row. Skills are separated by ";".
+    ofo_code,ofo_title,description,industry_code,industry_name,
+    years_of_experience,preferred_nqf_level,task_title,task_description,skills
+
+The file is streamed and processed in batches of occupations. Each batch runs in
+its own transaction and uses bulk inserts for industries, skills, occupations,
+tasks and task-skill links. History rows are bulk-written per batch, or skipped
+entirely with --skip-history (run `populate_history --auto` afterwards).
+"""
+
+import csv
+import json
+import logging
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from apps.content.jobs import mark_similarity_stale
+from apps.content.models import Industry, Occupation, OccupationTask, Skill
+from apps.content.services import link_ofo_groups
+from apps.content.stats import refresh_occupation_stats
+from apps.content.versioning import bump_catalog_version, bump_occupation_versions
+
+logger = logging.getLogger(__name__)
+
+OCCUPATION_FIELDS = [
+    "ofo_title",
+    "description",
+    "industry_id",
+    "years_of_experience",
+    "preferred_nqf_level",
+]
+CHANGE_REASON = "Bulk loaded by load_ofo"
+
+
+def _to_int(value):
+    """Parse a non-negative integer column, falling back to 0."""
+    value = str(value if value is not None else "").strip()
+    return int(value) if value.isdigit() else 0
+
+
+def _industry_code(name):
+    return name.upper().replace(" ", "_")[:50]
+
+
+class Command(BaseCommand):
+    help = "Bulk load OFO occupations, tasks and skills from JSON Lines or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=str, help="Path to a .jsonl or .csv file")
+        parser.add_argument(
+            "--format",
+            choices=["jsonl", "csv"],
+            help="Input format (defaults to the file extension)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of occupations per batch (default: 1000)",
+        )
+        parser.add_argument(
+            "--on-conflict",
+            choices=["update", "skip"],
+            default="update",
+            help="What to do with occupations and tasks that already exist",
+        )
+        parser.add_argument(
+            "--skip-history",
+            action="store_true",
+            help="Do not write history rows (backfill later with populate_history)",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"File not found: {path}")
+
+        fmt = options["format"] or path.suffix.lstrip(".").lower()
+        if fmt == "json":
+            fmt = "jsonl"
+        if fmt not in ("jsonl", "csv"):
+            raise CommandError(
+                f"Cannot infer format from '{path.name}'. Use --format jsonl|csv."
+            )
+
+        batch_size = max(1, options["batch_size"])
+        self.update_existing = options["on_conflict"] == "update"
+        self.with_history = not options["skip_history"]
+        self.stats = {
+            "occupations_created": 0,
+            "occupations_updated": 0,
+            "occupations_skipped": 0,
+            "tasks_created": 0,
+            "tasks_updated": 0,
+            "task_skills_linked": 0,
+            "industries_created": 0,
+            "skills_created": 0,
+        }
+
+        logger.info(f"Loading OFO dataset from {path} ({fmt})...")
+        started = time.perf_counter()
+        records_seen = 0
+        batch_number = 0
+
+        with path.open(newline="", encoding="utf-8") as handle:
+            reader = self.read_jsonl if fmt == "jsonl" else self.read_csv
+            batch = []
+            for record in reader(handle):
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    batch_number += 1
+                    records_seen += len(batch)
+                    self.load_batch(batch, batch_number)
+                    batch = []
+            if batch:
+                batch_number += 1
+                records_seen += len(batch)
+                self.load_batch(batch, batch_number)
+
+        # Bulk operations bypass model signals, so invalidate catalog caches here
+        bump_catalog_version()
+
+        elapsed = time.perf_counter() - started
+        rate = records_seen / elapsed if elapsed else 0
+        logger.info(
+            f"OFO load completed: {records_seen} occupations in {batch_number} "
+            f"batches, {elapsed:.2f}s ({rate:.0f} occupations/s)"
+        )
+        for key, value in self.stats.items():
+            logger.info(f"  {key.replace('_', ' ').capitalize()}: {value}")
+        if not self.with_history:
+            logger.info(
+                "  History skipped. Run `manage.py populate_history --auto` to backfill."
+            )
+        logger.info(
+            "  Run `manage.py build_occupation_similarity` to refresh related occupations."
+        )
+        logger.info(
+            "  Run `manage.py build_ofo_hierarchy` to refresh OFO group rollups."
+        )
+        logger.info(
+            "  Run `manage.py build_task_lsh` to index new tasks for duplicate detection."
+        )
+
+    # ------------- Readers -------------
+
+    def read_jsonl(self, handle):
+        for line_number, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise CommandError(f"Invalid JSON on line {line_number}: {e}")
+            if not record.get("ofo_code"):
+                logger.warning(f"Skipping line {line_number}: missing ofo_code")
+                continue
+            record.setdefault("tasks", [])
+            yield record
+
+    def read_csv(self, handle):
+        """Group consecutive task rows of the same occupation into one record."""
+        current = None
+        for row in csv.DictReader(handle):
+            ofo_code = (row.get("ofo_code") or "").strip()
+            if not ofo_code:
+                continue
+            if current is None or current["ofo_code"] != ofo_code:
+                if current is not None:
+                    yield current
+                current = {
+                    "ofo_code": ofo_code,
+                    "ofo_title": row.get("ofo_title", ""),
+                    "description": row.get("description", ""),
+                    "industry_code": row.get("industry_code", ""),
+                    "industry_name": row.get("industry_name", ""),
+                    "years_of_experience": row.get("years_of_experience"),
+                    "preferred_nqf_level": row.get("preferred_nqf_level"),
+                    "tasks": [],
+                }
+            title = (row.get("task_title") or "").strip()
+            if title:
+                current["tasks"].append(
+                    {
+                        "title": title,
+                        "description": row.get("task_description", ""),
+                        "skills": (row.get("skills") or "").split(";"),
+                    }
+                )
+        if current is not None:
+            yield current
+
+    # ------------- Batch loading -------------
+
+    def load_batch(self, records, batch_number):
+        started = time.perf_counter()
+
+        # Merge duplicate occupations within the batch (last one wins,
+        # tasks are combined)
+        merged = {}
+        for record in records:
+            code = str(record["ofo_code"]).strip()
+            if code in merged:
+                merged[code]["tasks"].extend(record.get("tasks") or [])
+                merged[code].update(
+                    {k: v for k, v in record.items() if k != "tasks"}
+                )
+            else:
+                merged[code] = {**record, "tasks": list(record.get("tasks") or [])}
+
+        with transaction.atomic():
+            industry_ids = self.load_industries(merged.values())
+            skill_ids = self.load_skills(merged.values())
+            occupation_ids = self.load_occupations(merged, industry_ids)
+            task_count = self.load_tasks(merged, occupation_ids, skill_ids)
+            # Bulk writes skip the signals that flag related occupations as stale,
+            # invalidate cached occupation fragments and maintain stats rows
+            mark_similarity_stale(occupation_ids.values())
+            link_ofo_groups(occupation_ids.values())
+            bump_occupation_versions(occupation_ids.values())
+            refresh_occupation_stats(occupation_ids.values())
+
+        elapsed = time.perf_counter() - started
+        rows = len(merged) + task_count
+        rate = rows / elapsed if elapsed else 0
+        logger.info(
+            f"Batch {batch_number}: {len(merged)} occupations, {task_count} tasks "
+            f"in {elapsed:.2f}s ({rate:.0f} rows/s)"
+        )
+
+    def bulk_insert(self, model, objs, lookup):
+        """
+        Insert objs ignoring unique conflicts and bulk-write history for the
+        rows that were actually inserted. `lookup` is a queryset filter that
+        matches every candidate row, used to find out which pks landed.
+        """
+        if not objs:
+            return 0
+        model.objects.bulk_create(objs, ignore_conflicts=True)
+        inserted = set(
+            model.objects.filter(lookup, pk__in=[obj.pk for obj in objs]).values_list(
+                "pk", flat=True
+            )
+        )
+        created = [obj for obj in objs if obj.pk in inserted]
+        if created and self.with_history:
+            model.history.bulk_history_create(
+                created, default_change_reason=CHANGE_REASON
+            )
+        return len(created)
+
+    def load_industries(self, records):
+        """Return a map of industry code and name to industry id."""
+        wanted = {}
+        for record in records:
+            name = (record.get("industry_name") or "").strip()
+            code = (record.get("industry_code") or "").strip()
+            if not name and not code:
+                continue
+            code = code or _industry_code(name)
+            wanted[code] = name or code
+
+        if not wanted:
+            return {}
+
+        lookup = Q(code__in=wanted.keys()) | Q(name__in=wanted.values())
+        existing = Industry.objects.filter(lookup).values_list("code", "name")
+        known = {value for pair in existing for value in pair}
+        new = [
+            Industry(code=code, name=name)
+            for code, name in wanted.items()
+            if code not in known and name not in known
+        ]
+        self.stats["industries_created"] += self.bulk_insert(Industry, new, lookup)
+
+        ids = {}
+        for pk, code, name in Industry.objects.filter(lookup).values_list(
+            "pk", "code", "name"
+        ):
+            ids[code] = pk
+            ids[name] = pk
+        return ids
+
+    def load_skills(self, records):
+        """Return a map of skill name to skill id."""
+        names = {
+            skill.strip()
+            for record in records
+            for task in record["tasks"]
+            for skill in task.get("skills") or []
+            if skill and skill.strip()
+        }
+        if not names:
+            return {}
+
+        lookup = Q(name__in=names)
+        existing = set(Skill.objects.filter(lookup).values_list("name", flat=True))
+        new = [Skill(name=name) for name in names - existing]
+        self.stats["skills_created"] += self.bulk_insert(Skill, new, lookup)
+        return dict(Skill.objects.filter(lookup).values_list("name", "pk"))
+
+    def load_occupations(self, merged, industry_ids):
+        """Insert or update the batch's occupations. Returns ofo_code -> id."""
+        existing = {
+            occ.ofo_code: occ
+            for occ in Occupation.objects.filter(ofo_code__in=merged.keys())
+        }
+        new, changed = [], []
+
+        for code, record in merged.items():
+            industry_key = (record.get("industry_code") or "").strip() or (
+                record.get("industry_name") or ""
+            ).strip()
+            values = {
+                "ofo_title": (record.get("ofo_title") or "").strip(),
+                "description": (record.get("description") or "").strip(),
+                "industry_id": industry_ids.get(industry_key),
+                "years_of_experience": _to_int(record.get("years_of_experience")),
+                "preferred_nqf_level": _to_int(record.get("preferred_nqf_level")),
+            }
+            occupation = existing.get(code)
+            if occupation is None:
+                new.append(Occupation(ofo_code=code, **values))
+                continue
+            if not self.update_existing:
+                self.stats["occupations_skipped"] += 1
+                continue
+            if values["industry_id"] is None:
+                # Keep the current industry if the dataset doesn't specify one
+                values["industry_id"] = occupation.industry_id
+            if any(getattr(occupation, k) != v for k, v in values.items()):
+                for key, value in values.items():
+                    setattr(occupation, key, value)
+                changed.append(occupation)
+
+        lookup = Q(ofo_code__in=merged.keys())
+        self.stats["occupations_created"] += self.bulk_insert(Occupation, new, lookup)
+
+        if changed:
+            Occupation.objects.bulk_update(changed, OCCUPATION_FIELDS)
+            if self.with_history:
+                Occupation.history.bulk_history_create(
+                    changed, update=True, default_change_reason=CHANGE_REASON
+                )
+            self.stats["occupations_updated"] += len(changed)
+
+        return dict(Occupation.objects.filter(lookup).values_list("ofo_code", "pk"))
+
+    def load_tasks(self, merged, occupation_ids, skill_ids):
+        """
+        Insert new tasks, update descriptions of existing ones and link skills.
+        Tasks are matched on (occupation, title). Returns the number of task rows
+        in the batch.
+        """
+        existing = {
+            (task.occupation_id, task.title): task
+            for task in OccupationTask.objects.filter(
+                occupation_id__in=occupation_ids.values()
+            )
+        }
+        new, changed, links = [], [], []
+        seen = set()
+
+        for code, record in merged.items():
+            occupation_id = occupation_ids.get(code)
+            if occupation_id is None:
+                continue
+            for task_data in record["tasks"]:
+                title = (task_data.get("title") or "").strip()[:255]
+                if not title or (occupation_id, title) in seen:
+                    continue
+                seen.add((occupation_id, title))
+                description = (task_data.get("description") or "").strip()
+
+                task = existing.get((occupation_id, title))
+                if task is None:
+                    task = OccupationTask(
+                        occupation_id=occupation_id,
+                        title=title,
+                        description=description,
+                    )
+                    new.append(task)
+                elif self.update_existing and task.description != description:
+                    task.description = description
+                    changed.append(task)
+                elif not self.update_existing:
+                    continue
+
+                for skill in task_data.get("skills") or []:
+                    skill_id = skill_ids.get((skill or "").strip())
+                    if skill_id:
+                        links.append((task.pk, skill_id))
+
+        if new:
+            OccupationTask.objects.bulk_create(new)
+            if self.with_history:
+                OccupationTask.history.bulk_history_create(
+                    new, default_change_reason=CHANGE_REASON
+                )
+            self.stats["tasks_created"] += len(new)
+
+        if changed:
+            OccupationTask.objects.bulk_update(changed, ["description"])
+            if self.with_history:
+                OccupationTask.history.bulk_history_create(
+                    changed, update=True, default_change_reason=CHANGE_REASON
+                )
+            self.stats["tasks_updated"] += len(changed)
+
+        if links:
+            # Count the links that land, not the pairs the conflicts skipped
+            through = OccupationTask.skills.through
+            linked = through.objects.filter(
+                occupationtask_id__in={task_id for task_id, _ in links}
+            ).values_list("occupationtask_id", "skill_id")
+            before = set(linked)
+            through.objects.bulk_create(
+                [
+                    through(occupationtask_id=task_id, skill_id=skill_id)
+                    for task_id, skill_id in set(links) - before
+                ],
+                ignore_conflicts=True,
+            )
+            self.stats["task_skills_linked"] += len(set(linked) - before)
+
+        return len(seen)
@@ -0,0 +1,83 @@
+"""
+Verify denormalized occupation stats against the source tables.
+
+Usage:
+    uv run python manage.py verify_occupation_stats             # Report and repair drift
+    uv run python manage.py verify_occupation_stats --dry-run   # Report only
+    uv run python manage.py verify_occupation_stats --batch-size 500
+"""
+
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.content.models import Occupation, OccupationStats
+from apps.content.stats import (
+    STATS_FIELDS,
+    calculate_occupation_stats,
+    refresh_occupation_stats,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Recalculate occupation stats and repair any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drift without writing corrections",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Occupations checked per batch (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        batch_size = options["batch_size"]
+        occupation_ids = list(Occupation.objects.values_list("id", flat=True))
+        checked = drifted = 0
+
+        for i in range(0, len(occupation_ids), batch_size):
+            batch = occupation_ids[i : i + batch_size]
+            expected = calculate_occupation_stats(batch)
+            stored = {
+                row["occupation_id"]: row
+                for row in OccupationStats.objects.filter(
+                    occupation_id__in=batch
+                ).values("occupation_id", *STATS_FIELDS)
+            }
+
+            stale = []
+            for occupation_id, values in expected.items():
+                row = stored.get(occupation_id)
+                if row is None:
+                    logger.warning(f"Occupation {occupation_id}: stats row missing")
+                    stale.append(occupation_id)
+                    continue
+                diffs = [
+                    f"{field} {row[field]} -> {value}"
+                    for field, value in values.items()
+                    if row[field] != value
+                ]
+                if diffs:
+                    logger.warning(f"Occupation {occupation_id}: {', '.join(diffs)}")
+                    stale.append(occupation_id)
+
+            checked += len(batch)
+            drifted += len(stale)
+            if stale and not options["dry_run"]:
+                refresh_occupation_stats(stale)
+
+        elapsed = time.perf_counter() - started
+        action = "found" if options["dry_run"] else "repaired"
+        logger.info(
+            f"Done! Checked {checked} occupations, {action} {drifted} with drift "
+            f"in {elapsed:.2f}s."
+        )
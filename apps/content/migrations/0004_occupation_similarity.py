@@ -0,0 +1,40 @@
+# Generated by Django 5.2.10 on 2026-10-19 06:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import apps.core.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0003_add_preferred_nqf_level'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='occupation',
+            name='similarity_update_needed',
+            field=models.BooleanField(default=True, help_text='Flag to trigger related occupations re-computation'),
+        ),
+        migrations.CreateModel(
+            name='OccupationSimilarity',
+            fields=[
+                ('id', models.CharField(default=apps.core.models.cuid_generator, editable=False, max_length=30, primary_key=True, serialize=False)),
+                ('score', models.FloatField(help_text='Jaccard similarity of skills and tasks')),
+                ('shared_skills', models.PositiveIntegerField(default=0)),
+                ('shared_tasks', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('occupation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_occupations', to='content.occupation')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='content.occupation')),
+            ],
+            options={
+                'verbose_name': 'Occupation Similarity',
+                'verbose_name_plural': 'Occupation Similarities',
+                'ordering': ['occupation', '-score'],
+                'indexes': [models.Index(fields=['occupation', '-score'], name='content_occsim_lookup_idx')],
+                'unique_together': {('occupation', 'related')},
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.10 on 2026-10-19 06:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import apps.core.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0004_occupation_similarity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfoGroup',
+            fields=[
+                ('id', models.CharField(default=apps.core.models.cuid_generator, editable=False, max_length=30, primary_key=True, serialize=False)),
+                ('code', models.CharField(max_length=10, unique=True)),
+                ('level', models.PositiveSmallIntegerField(choices=[(1, 'Major Group'), (2, 'Sub-Major Group'), (3, 'Minor Group'), (4, 'Unit Group')])),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('occupation_count', models.PositiveIntegerField(default=0)),
+                ('task_count', models.PositiveIntegerField(default=0)),
+                ('target_count', models.PositiveIntegerField(default=0, help_text='Candidate occupation targets')),
+                ('computed_at', models.DateTimeField(blank=True, null=True)),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='content.ofogroup')),
+            ],
+            options={
+                'verbose_name': 'OFO Group',
+                'verbose_name_plural': 'OFO Groups',
+                'ordering': ['code'],
+            },
+        ),
+        migrations.AddField(
+            model_name='occupation',
+            name='ofo_group',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Unit group, derived from the OFO code', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occupations', to='content.ofogroup'),
+        ),
+        migrations.AddIndex(
+            model_name='ofogroup',
+            index=models.Index(fields=['level', 'code'], name='content_ofogroup_level_idx'),
+        ),
+    ]
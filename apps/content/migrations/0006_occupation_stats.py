@@ -0,0 +1,33 @@
+# Generated by Django 5.2.10 on 2026-10-19 06:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import apps.core.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0005_ofo_hierarchy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccupationStats',
+            fields=[
+                ('id', models.CharField(default=apps.core.models.cuid_generator, editable=False, max_length=30, primary_key=True, serialize=False)),
+                ('task_count', models.PositiveIntegerField(default=0)),
+                ('required_task_count', models.PositiveIntegerField(default=1, help_text='Tasks a candidate is assessed on (task coverage)')),
+                ('skill_count', models.PositiveIntegerField(default=0, help_text="Distinct skills across the occupation's tasks")),
+                ('target_count', models.PositiveIntegerField(default=0)),
+                ('response_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('occupation', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='content.occupation')),
+            ],
+            options={
+                'verbose_name': 'Occupation Stats',
+                'verbose_name_plural': 'Occupation Stats',
+            },
+        ),
+    ]
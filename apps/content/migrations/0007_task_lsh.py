@@ -0,0 +1,42 @@
+# Generated by Django 5.2.10 on 2026-10-19 06:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import apps.core.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0006_occupation_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskFingerprint',
+            fields=[
+                ('id', models.CharField(default=apps.core.models.cuid_generator, editable=False, max_length=30, primary_key=True, serialize=False)),
+                ('text_hash', models.CharField(help_text='MD5 of the indexed text', max_length=32)),
+                ('signature', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprint', to='content.occupationtask')),
+            ],
+            options={
+                'verbose_name': 'Task Fingerprint',
+                'verbose_name_plural': 'Task Fingerprints',
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskLshBand',
+            fields=[
+                ('id', models.CharField(default=apps.core.models.cuid_generator, editable=False, max_length=30, primary_key=True, serialize=False)),
+                ('key', models.CharField(db_index=True, max_length=24)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_bands', to='content.occupationtask')),
+            ],
+            options={
+                'verbose_name': 'Task LSH Band',
+                'verbose_name_plural': 'Task LSH Bands',
+            },
+        ),
+    ]
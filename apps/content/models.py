@@ -24,6 +24,51 @@ class Industry(CuidModel):
         return self.name
 
 
+class OfoGroup(CuidModel):
+    """
+    A node of the OFO hierarchy above occupations, identified by its code
+    prefix: major group "2", sub-major "25", minor "251", unit group "2512".
+    Rollups are maintained by apps.content.services.build_ofo_hierarchy.
+    """
+
+    class Level(models.IntegerChoices):
+        MAJOR = 1, "Major Group"
+        SUB_MAJOR = 2, "Sub-Major Group"
+        MINOR = 3, "Minor Group"
+        UNIT = 4, "Unit Group"
+
+    code = models.CharField(max_length=10, unique=True)
+    level = models.PositiveSmallIntegerField(choices=Level.choices)
+    parent = models.ForeignKey(
+        "self",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="children",
+    )
+    title = models.CharField(max_length=255, blank=True)
+
+    # Rollups over every occupation below this node
+    occupation_count = models.PositiveIntegerField(default=0)
+    task_count = models.PositiveIntegerField(default=0)
+    target_count = models.PositiveIntegerField(
+        default=0, help_text="Candidate occupation targets"
+    )
+    computed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "OFO Group"
+        verbose_name_plural = "OFO Groups"
+        ordering = ["code"]
+        indexes = [
+            models.Index(fields=["level", "code"], name="content_ofogroup_level_idx"),
+        ]
+
+    def __str__(self):
+        label = self.title or self.get_level_display()
+        return f"{self.code} - {label}"
+
+
 class Occupation(CuidModel):
     """
     OFO (Organising Framework for Occupations) occupation data.
@@ -48,7 +93,24 @@ class Occupation(CuidModel):
         help_text="Preferred NQF level (0=Any, 4=Matric, 5=Certificate, 6=Diploma, 7=Degree, 8=Honours, 9=Masters, 10=Doctorate)"
     )
 
-    history = HistoricalRecords()
+    ofo_group = models.ForeignKey(
+        OfoGroup,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="occupations",
+        help_text="Unit group, derived from the OFO code",
+    )
+
+    # Flags
+    similarity_update_needed = models.BooleanField(
+        default=True, help_text="Flag to trigger related occupations re-computation"
+    )
+
+    history = HistoricalRecords(
+        excluded_fields=["ofo_group", "similarity_update_needed"]
+    )
 
     class Meta:
         verbose_name = "Occupation"
@@ -59,6 +121,34 @@ class Occupation(CuidModel):
         return f"{self.ofo_code} - {self.ofo_title}"
 
 
+class OccupationStats(CuidModel):
+    """
+    Denormalized per-occupation counts, kept current by apps.content.signals
+    and repaired by the verify_occupation_stats command.
+    """
+
+    occupation = models.OneToOneField(
+        Occupation, on_delete=models.CASCADE, related_name="stats"
+    )
+    task_count = models.PositiveIntegerField(default=0)
+    required_task_count = models.PositiveIntegerField(
+        default=1, help_text="Tasks a candidate is assessed on (task coverage)"
+    )
+    skill_count = models.PositiveIntegerField(
+        default=0, help_text="Distinct skills across the occupation's tasks"
+    )
+    target_count = models.PositiveIntegerField(default=0)
+    response_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Occupation Stats"
+        verbose_name_plural = "Occupation Stats"
+
+    def __str__(self):
+        return f"Stats for {self.occupation_id}"
+
+
 class Skill(CuidModel):
     """
     Skills that can be associated with occupation tasks.
@@ -100,3 +190,72 @@ class OccupationTask(CuidModel):
 
     def __str__(self):
         return f"{self.occupation.ofo_code} - {self.title}"
+
+
+class TaskFingerprint(CuidModel):
+    """
+    MinHash signature of a task's title and description, used to find
+    near-duplicate tasks. Maintained by apps.content.dedup.
+    """
+
+    task = models.OneToOneField(
+        OccupationTask, on_delete=models.CASCADE, related_name="fingerprint"
+    )
+    text_hash = models.CharField(max_length=32, help_text="MD5 of the indexed text")
+    signature = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Task Fingerprint"
+        verbose_name_plural = "Task Fingerprints"
+
+    def __str__(self):
+        return f"Fingerprint of {self.task_id}"
+
+
+class TaskLshBand(CuidModel):
+    """One LSH bucket a task's signature falls into; a task has one per band."""
+
+    task = models.ForeignKey(
+        OccupationTask, on_delete=models.CASCADE, related_name="lsh_bands"
+    )
+    key = models.CharField(max_length=24, db_index=True)
+
+    class Meta:
+        verbose_name = "Task LSH Band"
+        verbose_name_plural = "Task LSH Bands"
+
+    def __str__(self):
+        return f"{self.task_id} in {self.key}"
+
+
+class OccupationSimilarity(CuidModel):
+    """
+    Precomputed top-k related occupations by shared skills and tasks.
+    Maintained by apps.content.services; not edited by hand.
+    """
+
+    occupation = models.ForeignKey(
+        Occupation, on_delete=models.CASCADE, related_name="similar_occupations"
+    )
+    related = models.ForeignKey(
+        Occupation, on_delete=models.CASCADE, related_name="+"
+    )
+    score = models.FloatField(help_text="Jaccard similarity of skills and tasks")
+    shared_skills = models.PositiveIntegerField(default=0)
+    shared_tasks = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Occupation Similarity"
+        verbose_name_plural = "Occupation Similarities"
+        unique_together = ["occupation", "related"]
+        ordering = ["occupation", "-score"]
+        indexes = [
+            models.Index(
+                fields=["occupation", "-score"], name="content_occsim_lookup_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.occupation_id} ~ {self.related_id} ({self.score:.2f})"
@@ -0,0 +1,82 @@
+from rest_framework import serializers
+
+from .models import Industry, Occupation, OccupationTask, OfoGroup, Skill
+
+
+class SparseFieldsetMixin:
+    """
+    Accepts a `fields` argument limiting the serialized fields, as parsed from
+    ?fields= by CatalogViewSetMixin. Only the top-level serializer is pruned.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class IndustrySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Industry
+        fields = ["id", "code", "name", "description"]
+
+
+class SkillSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Skill
+        fields = ["id", "name", "description"]
+
+
+class OfoGroupSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    parent = serializers.SlugRelatedField(slug_field="code", read_only=True)
+
+    class Meta:
+        model = OfoGroup
+        fields = [
+            "id",
+            "code",
+            "level",
+            "title",
+            "parent",
+            "occupation_count",
+            "task_count",
+            "target_count",
+            "computed_at",
+        ]
+
+
+class OccupationTaskSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    skills = serializers.SlugRelatedField(slug_field="name", many=True, read_only=True)
+
+    class Meta:
+        model = OccupationTask
+        fields = ["id", "occupation", "title", "description", "skills"]
+
+
+class NestedTaskSerializer(serializers.ModelSerializer):
+    skills = serializers.SlugRelatedField(slug_field="name", many=True, read_only=True)
+
+    class Meta:
+        model = OccupationTask
+        fields = ["id", "title", "description", "skills"]
+
+
+class OccupationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    ofo_group = serializers.SlugRelatedField(slug_field="code", read_only=True)
+    industry = IndustrySerializer(read_only=True)
+    tasks = NestedTaskSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Occupation
+        fields = [
+            "id",
+            "ofo_code",
+            "ofo_title",
+            "ofo_group",
+            "description",
+            "industry",
+            "years_of_experience",
+            "preferred_nqf_level",
+            "tasks",
+        ]
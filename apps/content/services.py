@@ -0,0 +1,374 @@
+import heapq
+import re
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from apps.candidates.models import OccupationTarget
+
+from .autocomplete import normalise
+from .models import Occupation, OccupationSimilarity, OccupationTask, OfoGroup
+from .versioning import bump_catalog_version
+
+# Related Occupations
+# Each occupation keeps its top-k neighbours by Jaccard similarity over the
+# combined set of skills (via its tasks) and normalised task titles.
+SIMILARITY_TOP_K = 10
+SIMILARITY_MIN_SCORE = 0.05
+
+
+def _load_features(occupation_ids=None):
+    """
+    Returns {occupation_id: set of features}. A feature is ("s", skill_id) or
+    ("t", normalised task title).
+    """
+    features = defaultdict(set)
+
+    tasks = OccupationTask.objects.all()
+    links = OccupationTask.skills.through.objects.all()
+    if occupation_ids is not None:
+        tasks = tasks.filter(occupation_id__in=occupation_ids)
+        links = links.filter(occupationtask__occupation_id__in=occupation_ids)
+
+    for occupation_id, title in tasks.values_list("occupation_id", "title").iterator(
+        chunk_size=5000
+    ):
+        features[occupation_id].add(("t", normalise(title)))
+    for occupation_id, skill_id in links.values_list(
+        "occupationtask__occupation_id", "skill_id"
+    ).iterator(chunk_size=5000):
+        features[occupation_id].add(("s", skill_id))
+
+    return features
+
+
+def _candidate_ids(occupation_ids):
+    """
+    Occupations sharing at least one skill or task title with the given ones.
+    Titles are compared after normalise(), as in _load_features(), which SQL
+    can't do portably: task titles are scanned and matched here instead.
+    """
+    occupation_ids = set(occupation_ids)
+    titles = {
+        normalise(title)
+        for title in OccupationTask.objects.filter(
+            occupation_id__in=occupation_ids
+        ).values_list("title", flat=True)
+    }
+    skill_ids = OccupationTask.skills.through.objects.filter(
+        occupationtask__occupation_id__in=occupation_ids
+    ).values("skill_id")
+    candidates = occupation_ids | set(
+        OccupationTask.objects.filter(skills__in=skill_ids).values_list(
+            "occupation_id", flat=True
+        )
+    )
+    if titles:
+        for occupation_id, title in OccupationTask.objects.values_list(
+            "occupation_id", "title"
+        ).iterator(chunk_size=5000):
+            if occupation_id not in candidates and normalise(title) in titles:
+                candidates.add(occupation_id)
+    return candidates
+
+
+def _inverted_index(features):
+    """feature -> occupations having it."""
+    inverted = defaultdict(list)
+    for occupation_id, occupation_features in features.items():
+        for feature in occupation_features:
+            inverted[feature].append(occupation_id)
+    return inverted
+
+
+def _score(occupation_id, features, inverted):
+    """
+    Sparse co-occurrence scoring: walk the inverted index so only occupations
+    sharing a feature are compared. Returns [(score, other_id, shared skills,
+    shared tasks)] for scores of at least SIMILARITY_MIN_SCORE.
+    """
+    own = features.get(occupation_id)
+    if not own:
+        return []
+    shared_skills = Counter()
+    shared_tasks = Counter()
+    for feature in own:
+        counter = shared_skills if feature[0] == "s" else shared_tasks
+        for other_id in inverted[feature]:
+            if other_id != occupation_id:
+                counter[other_id] += 1
+
+    scored = []
+    for other_id in shared_skills.keys() | shared_tasks.keys():
+        shared = shared_skills[other_id] + shared_tasks[other_id]
+        score = shared / (len(own) + len(features[other_id]) - shared)
+        if score >= SIMILARITY_MIN_SCORE:
+            scored.append(
+                (score, other_id, shared_skills[other_id], shared_tasks[other_id])
+            )
+    return scored
+
+
+def _top_rows(occupation_id, scored, top_k):
+    return [
+        OccupationSimilarity(
+            occupation_id=occupation_id,
+            related_id=other_id,
+            score=round(score, 4),
+            shared_skills=skills,
+            shared_tasks=tasks,
+        )
+        for score, other_id, skills, tasks in heapq.nlargest(top_k, scored)
+    ]
+
+
+def _compute_rows(targets, features, top_k):
+    inverted = _inverted_index(features)
+    rows = []
+    for occupation_id in targets:
+        scored = _score(occupation_id, features, inverted)
+        rows += _top_rows(occupation_id, scored, top_k)
+    return rows
+
+
+def build_occupation_similarity(top_k=SIMILARITY_TOP_K):
+    """
+    Rebuilds the whole related-occupations table in one pass.
+    Returns the number of similarity rows written.
+    """
+    # Clear the flags before reading: a change made while this runs flags the
+    # occupation again instead of being lost
+    flagged_ids = list(
+        Occupation.objects.filter(similarity_update_needed=True).values_list(
+            "id", flat=True
+        )
+    )
+    Occupation.objects.filter(id__in=flagged_ids).update(
+        similarity_update_needed=False
+    )
+    try:
+        features = _load_features()
+        occupation_ids = list(Occupation.objects.values_list("id", flat=True))
+        rows = _compute_rows(occupation_ids, features, top_k)
+
+        with transaction.atomic():
+            OccupationSimilarity.objects.all().delete()
+            OccupationSimilarity.objects.bulk_create(rows, batch_size=1000)
+    except Exception:
+        Occupation.objects.filter(id__in=flagged_ids).update(
+            similarity_update_needed=True
+        )
+        raise
+    return len(rows)
+
+
+def refresh_occupation_similarity(occupation_ids, top_k=SIMILARITY_TOP_K):
+    """
+    Incrementally recomputes related occupations for the given occupations and
+    for every occupation whose top-k may change with them: those listing them
+    now, and those whose top-k they would now enter. Returns the number of
+    similarity rows written.
+    """
+    occupation_ids = set(occupation_ids)
+    if not occupation_ids:
+        return 0
+
+    # Clear the flags before reading: a change made while this runs flags the
+    # occupation again instead of being lost
+    Occupation.objects.filter(id__in=occupation_ids).update(
+        similarity_update_needed=False
+    )
+    try:
+        rows, neighbours = _refreshed_rows(occupation_ids, top_k)
+        with transaction.atomic():
+            # Lock in id order so overlapping refreshes wait for each other
+            list(
+                Occupation.objects.select_for_update()
+                .filter(id__in=occupation_ids | neighbours)
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+            OccupationSimilarity.objects.filter(
+                occupation_id__in=occupation_ids | neighbours
+            ).delete()
+            OccupationSimilarity.objects.bulk_create(rows, batch_size=1000)
+    except Exception:
+        Occupation.objects.filter(id__in=occupation_ids).update(
+            similarity_update_needed=True
+        )
+        raise
+    return len(rows)
+
+
+def _refreshed_rows(occupation_ids, top_k):
+    features = _load_features(_candidate_ids(occupation_ids))
+    inverted = _inverted_index(features)
+    rows = []
+    best = {}
+    for occupation_id in occupation_ids:
+        scored = _score(occupation_id, features, inverted)
+        rows += _top_rows(occupation_id, scored, top_k)
+        for score, other_id, _, _ in scored:
+            best[other_id] = max(score, best.get(other_id, 0))
+
+    # Occupations listing these now may drop or rescore them
+    neighbours = set(
+        OccupationSimilarity.objects.filter(related_id__in=occupation_ids).values_list(
+            "occupation_id", flat=True
+        )
+    )
+    # Similarity is symmetric, but top-k is not: an occupation takes one of
+    # these in if it beats its current k-th score or it has room left
+    floors = {
+        row["occupation_id"]: (row["count"], row["floor"])
+        for row in OccupationSimilarity.objects.filter(occupation_id__in=list(best))
+        .values("occupation_id")
+        .annotate(count=Count("id"), floor=Min("score"))
+    }
+    for other_id, score in best.items():
+        count, floor = floors.get(other_id, (0, 0))
+        if count < top_k or round(score, 4) > floor:
+            neighbours.add(other_id)
+    neighbours -= occupation_ids
+
+    if neighbours:
+        features = _load_features(_candidate_ids(neighbours))
+        rows += _compute_rows(neighbours, features, top_k)
+    return rows, neighbours
+
+
+def get_related_occupations(occupation, limit=SIMILARITY_TOP_K):
+    """
+    Returns the precomputed related occupations. Read-only: occupations whose
+    tasks or skills changed are refreshed by the content.refresh_similarity
+    job (or `build_occupation_similarity --stale`), never in a request.
+    """
+    return list(
+        OccupationSimilarity.objects.filter(occupation=occupation)
+        .select_related("related", "related__industry")
+        .order_by("-score")[:limit]
+    )
+
+
+# OFO Hierarchy
+# A 6-digit OFO code "251201" sits under unit group "2512", minor group "251",
+# sub-major group "25" and major group "2". Codes may carry a framework year
+# prefix ("2021-251201"), which is ignored.
+_NON_DIGITS = re.compile(r"\D")
+
+
+def ofo_group_codes(ofo_code):
+    """Return the group codes above an occupation, major group first."""
+    digits = _NON_DIGITS.sub("", str(ofo_code).rsplit("-", 1)[-1])
+    return [
+        digits[:level]
+        for level in OfoGroup.Level.values
+        if len(digits) > level
+    ]
+
+
+def link_ofo_groups(occupation_ids):
+    """
+    Point occupations at their unit group, creating any missing groups above
+    them, so ?group= finds occupations created or recoded since the last
+    build_ofo_hierarchy. Rollups are left for that rebuild. Returns
+    {occupation_id: group_id}.
+    """
+    rows = list(
+        Occupation.objects.filter(id__in=occupation_ids).values_list(
+            "id", "ofo_code", "ofo_group_id"
+        )
+    )
+    codes = {occupation_id: ofo_group_codes(code) for occupation_id, code, _ in rows}
+    needed = {code for group_codes in codes.values() for code in group_codes}
+    groups = {
+        group.code: group for group in OfoGroup.objects.filter(code__in=needed)
+    }
+    # Parents sort before their children, so every parent exists first
+    for code in sorted(needed - groups.keys(), key=len):
+        groups[code], _ = OfoGroup.objects.get_or_create(
+            code=code, defaults={"level": len(code), "parent": groups.get(code[:-1])}
+        )
+
+    linked = {}
+    moves = defaultdict(list)
+    for occupation_id, _, group_id in rows:
+        group_codes = codes[occupation_id]
+        linked[occupation_id] = groups[group_codes[-1]].id if group_codes else None
+        if linked[occupation_id] != group_id:
+            moves[linked[occupation_id]].append(occupation_id)
+    for group_id, ids in moves.items():
+        for i in range(0, len(ids), 1000):
+            Occupation.objects.filter(id__in=ids[i : i + 1000]).update(
+                ofo_group_id=group_id
+            )
+    return linked
+
+
+def build_ofo_hierarchy():
+    """
+    Rebuilds the OFO group table and its rollups from grouped aggregates, and
+    links every occupation to its unit group. Group titles are preserved;
+    groups left without occupations are removed. Returns the number of groups.
+    """
+    task_counts = dict(
+        OccupationTask.objects.values("occupation_id")
+        .annotate(count=Count("id"))
+        .values_list("occupation_id", "count")
+    )
+    target_counts = dict(
+        OccupationTarget.objects.values("occupation_id")
+        .annotate(count=Count("id"))
+        .values_list("occupation_id", "count")
+    )
+
+    rollups = defaultdict(Counter)
+    unit_members = defaultdict(list)
+    for occupation_id, ofo_code in Occupation.objects.values_list(
+        "id", "ofo_code"
+    ).iterator(chunk_size=5000):
+        codes = ofo_group_codes(ofo_code)
+        for code in codes:
+            rollup = rollups[code]
+            rollup["occupations"] += 1
+            rollup["tasks"] += task_counts.get(occupation_id, 0)
+            rollup["targets"] += target_counts.get(occupation_id, 0)
+        unit_members[codes[-1] if codes else None].append(occupation_id)
+
+    now = timezone.now()
+    with transaction.atomic():
+        groups = {group.code: group for group in OfoGroup.objects.all()}
+        existing = set(groups)
+        for code in rollups.keys() - existing:
+            groups[code] = OfoGroup(code=code, level=len(code))
+        for code, rollup in rollups.items():
+            group = groups[code]
+            group.parent = groups.get(code[:-1])
+            group.occupation_count = rollup["occupations"]
+            group.task_count = rollup["tasks"]
+            group.target_count = rollup["targets"]
+            group.computed_at = now
+
+        # Parents sort before their children, so every parent exists first
+        OfoGroup.objects.bulk_create(
+            [groups[code] for code in sorted(rollups.keys() - existing, key=len)],
+            batch_size=1000,
+        )
+        OfoGroup.objects.bulk_update(
+            [groups[code] for code in rollups.keys() & existing],
+            ["parent", "occupation_count", "task_count", "target_count", "computed_at"],
+            batch_size=1000,
+        )
+
+        for code, occupation_ids in unit_members.items():
+            group_id = groups[code].id if code else None
+            for i in range(0, len(occupation_ids), 1000):
+                Occupation.objects.filter(id__in=occupation_ids[i : i + 1000]).exclude(
+                    ofo_group_id=group_id
+                ).update(ofo_group_id=group_id)
+        OfoGroup.objects.filter(code__in=existing - rollups.keys()).delete()
+
+    bump_catalog_version()
+    return len(rollups)
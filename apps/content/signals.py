@@ -0,0 +1,177 @@
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.candidates.models import AssessmentResponse, OccupationTarget
+
+from .dedup import index_tasks
+from .jobs import mark_similarity_stale
+from .models import Industry, Occupation, OccupationTask, Skill
+from .services import link_ofo_groups
+from .stats import adjust_occupation_stat, refresh_occupation_stats
+from .versioning import bump_catalog_version, bump_occupation_version
+
+
+@receiver(post_save, sender=Industry)
+@receiver(post_save, sender=Occupation)
+@receiver(post_save, sender=OccupationTask)
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Industry)
+@receiver(post_delete, sender=Occupation)
+@receiver(post_delete, sender=OccupationTask)
+@receiver(post_delete, sender=Skill)
+def catalog_changed(sender, **kwargs):
+    """Invalidate catalog caches whenever catalog content changes."""
+    bump_catalog_version()
+
+
+@receiver(m2m_changed, sender=OccupationTask.skills.through)
+def task_skills_changed(sender, action, **kwargs):
+    """Invalidate catalog caches when skills are linked to or unlinked from tasks."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_catalog_version()
+
+
+@receiver(post_save, sender=Occupation)
+@receiver(post_delete, sender=Occupation)
+def occupation_changed(sender, instance, **kwargs):
+    """Invalidate cached fragments of the occupation pages."""
+    bump_occupation_version(instance.id)
+
+
+@receiver(post_save, sender=Occupation)
+def occupation_changed_group(sender, instance, **kwargs):
+    """Link the occupation to its OFO unit group as soon as it is saved."""
+    instance.ofo_group_id = link_ofo_groups([instance.id]).get(instance.id)
+
+
+@receiver(post_save, sender=OccupationTask)
+@receiver(post_delete, sender=OccupationTask)
+def task_changed(sender, instance, **kwargs):
+    """Invalidate cached fragments of the task's occupation."""
+    bump_occupation_version(instance.occupation_id)
+
+
+@receiver(post_save, sender=OccupationTask)
+@receiver(post_delete, sender=OccupationTask)
+def task_changed_similarity(sender, instance, **kwargs):
+    """Flag the task's occupation for related-occupations re-computation."""
+    mark_similarity_stale([instance.occupation_id])
+
+
+@receiver(m2m_changed, sender=OccupationTask.skills.through)
+def task_skills_changed_similarity(sender, instance, action, reverse, pk_set, **kwargs):
+    """Flag occupations whose task skills changed (from either side of the M2M)."""
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        mark_similarity_stale([instance.occupation_id])
+    elif action == "pre_clear":
+        mark_similarity_stale(instance.tasks.values("occupation_id"))
+    elif pk_set:
+        mark_similarity_stale(
+            OccupationTask.objects.filter(id__in=pk_set).values("occupation_id")
+        )
+
+
+def _deleting_occupation(origin):
+    """True when a delete cascades from an occupation, taking its stats with it."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is Occupation
+
+
+@receiver(post_save, sender=Occupation)
+def occupation_created_stats(sender, instance, created, **kwargs):
+    """Create the stats row alongside a new occupation."""
+    if created:
+        refresh_occupation_stats([instance.id])
+
+
+@receiver(pre_save, sender=OccupationTask)
+def task_saving_stats(sender, instance, update_fields=None, **kwargs):
+    """Remember the occupation a task had before it is saved."""
+    instance._stats_previous_occupation_id = None
+    if instance._state.adding or (
+        update_fields is not None and "occupation" not in update_fields
+    ):
+        return
+    instance._stats_previous_occupation_id = (
+        OccupationTask.objects.filter(pk=instance.pk)
+        .values_list("occupation_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=OccupationTask)
+@receiver(post_delete, sender=OccupationTask)
+def task_changed_stats(sender, instance, created=False, **kwargs):
+    """Recount tasks and skills when a task is added, moved or removed."""
+    if kwargs["signal"] is post_delete and _deleting_occupation(kwargs["origin"]):
+        return
+    if created or kwargs["signal"] is post_delete:
+        refresh_occupation_stats([instance.occupation_id])
+        return
+    # Moving a task takes its skills and responses along
+    previous_id = getattr(instance, "_stats_previous_occupation_id", None)
+    if previous_id is not None and previous_id != instance.occupation_id:
+        refresh_occupation_stats([previous_id, instance.occupation_id])
+
+
+@receiver(m2m_changed, sender=OccupationTask.skills.through)
+def task_skills_changed_stats(sender, instance, action, reverse, pk_set, **kwargs):
+    """Recount distinct skills of occupations whose task skills changed."""
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            refresh_occupation_stats([instance.occupation_id])
+    elif action == "pre_clear":
+        # The links are gone by post_clear; remember the affected occupations
+        instance._stats_occupation_ids = list(
+            instance.tasks.values_list("occupation_id", flat=True).distinct()
+        )
+    elif action == "post_clear":
+        refresh_occupation_stats(getattr(instance, "_stats_occupation_ids", []))
+    elif action in ("post_add", "post_remove") and pk_set:
+        refresh_occupation_stats(
+            OccupationTask.objects.filter(id__in=pk_set)
+            .values_list("occupation_id", flat=True)
+            .distinct()
+        )
+
+
+@receiver(post_save, sender=OccupationTarget)
+@receiver(post_delete, sender=OccupationTarget)
+def target_changed_stats(sender, instance, created=False, **kwargs):
+    """Count candidate targets per occupation."""
+    if kwargs["signal"] is post_delete and _deleting_occupation(kwargs["origin"]):
+        return
+    if created:
+        adjust_occupation_stat(instance.occupation_id, "target_count", 1)
+    elif kwargs["signal"] is post_delete:
+        adjust_occupation_stat(instance.occupation_id, "target_count", -1)
+
+
+@receiver(post_save, sender=AssessmentResponse)
+@receiver(post_delete, sender=AssessmentResponse)
+def response_changed_stats(sender, instance, created=False, **kwargs):
+    """Count assessment responses per occupation."""
+    if created:
+        delta = 1
+    elif kwargs["signal"] is post_delete and not _deleting_occupation(
+        kwargs["origin"]
+    ):
+        delta = -1
+    else:
+        return
+    occupation_id = (
+        OccupationTask.objects.filter(pk=instance.task_id)
+        .values_list("occupation_id", flat=True)
+        .first()
+    )
+    if occupation_id is not None:
+        adjust_occupation_stat(occupation_id, "response_count", delta)
+
+
+@receiver(post_save, sender=OccupationTask)
+def task_changed_fingerprint(sender, instance, **kwargs):
+    """Re-fingerprint the task for duplicate detection if its text changed."""
+    index_tasks(OccupationTask.objects.filter(pk=instance.pk))
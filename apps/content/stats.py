@@ -0,0 +1,116 @@
+"""
+Denormalized occupation statistics.
+
+Task and skill counts are recalculated from grouped aggregates whenever a
+task or task-skill link changes; target and response counts are plain
+counters adjusted with F() expressions on every create and delete.
+"""
+
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from apps.candidates.models import AssessmentResponse, OccupationTarget
+
+from .models import Occupation, OccupationStats, OccupationTask
+
+# Task Coverage for Assessments
+# Candidates are assessed on 80% of tasks per occupation, not all tasks.
+# This makes assessments more manageable while still being comprehensive.
+TASK_COVERAGE_PERCENTAGE = 0.80
+
+STATS_FIELDS = [
+    "task_count",
+    "required_task_count",
+    "skill_count",
+    "target_count",
+    "response_count",
+]
+
+
+def required_task_count(task_count):
+    """Number of tasks a candidate is assessed on for an occupation."""
+    return max(1, int(task_count * TASK_COVERAGE_PERCENTAGE))
+
+
+def _grouped_counts(queryset, group_by, count):
+    return dict(
+        queryset.values(group_by)
+        .annotate(total=count)
+        .values_list(group_by, "total")
+    )
+
+
+def calculate_occupation_stats(occupation_ids):
+    """Return {occupation_id: {field: value}} computed from the source tables."""
+    occupation_ids = list(occupation_ids)
+    tasks = _grouped_counts(
+        OccupationTask.objects.filter(occupation_id__in=occupation_ids),
+        "occupation_id",
+        Count("id"),
+    )
+    skills = _grouped_counts(
+        OccupationTask.skills.through.objects.filter(
+            occupationtask__occupation_id__in=occupation_ids
+        ),
+        "occupationtask__occupation_id",
+        Count("skill_id", distinct=True),
+    )
+    targets = _grouped_counts(
+        OccupationTarget.objects.filter(occupation_id__in=occupation_ids),
+        "occupation_id",
+        Count("id"),
+    )
+    responses = _grouped_counts(
+        AssessmentResponse.objects.filter(task__occupation_id__in=occupation_ids),
+        "task__occupation_id",
+        Count("id"),
+    )
+    return {
+        pk: {
+            "task_count": tasks.get(pk, 0),
+            "required_task_count": required_task_count(tasks.get(pk, 0)),
+            "skill_count": skills.get(pk, 0),
+            "target_count": targets.get(pk, 0),
+            "response_count": responses.get(pk, 0),
+        }
+        for pk in occupation_ids
+    }
+
+
+def refresh_occupation_stats(occupation_ids):
+    """Recalculate and upsert the stats rows of the given occupations."""
+    occupation_ids = set(
+        Occupation.objects.filter(id__in=set(occupation_ids)).values_list(
+            "id", flat=True
+        )
+    )
+    if not occupation_ids:
+        return
+    rows = [
+        OccupationStats(occupation_id=pk, **values)
+        for pk, values in calculate_occupation_stats(occupation_ids).items()
+    ]
+    OccupationStats.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["occupation"],
+        update_fields=STATS_FIELDS + ["updated_at"],
+    )
+
+
+def adjust_occupation_stat(occupation_id, field, delta):
+    """Apply a counter change, creating the row from scratch if it is missing."""
+    updated = OccupationStats.objects.filter(occupation_id=occupation_id).update(
+        **{field: Greatest(F(field) + delta, 0)}
+    )
+    if not updated:
+        refresh_occupation_stats([occupation_id])
+
+
+def get_occupation_stats(occupation):
+    """Return the occupation's stats row, building it on first access."""
+    try:
+        return occupation.stats
+    except OccupationStats.DoesNotExist:
+        refresh_occupation_stats([occupation.id])
+        return OccupationStats.objects.get(occupation=occupation)
@@ -1,3 +1,842 @@
-from django.test import TestCase
+import gzip
+import json
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from apps.candidates.models import (
+    AssessmentResponse,
+    CandidateProfile,
+    OccupationTarget,
+)
+from apps.core.jobs import run_pending
+from apps.core.models import BackgroundJob
+from apps.core.partials import get_user_partials_version
+
+from . import autocomplete, services
+from .dedup import find_duplicate_clusters, find_similar_tasks
+from .jobs import DELETE_OCCUPATIONS, REFRESH_SIMILARITY
+from .models import (
+    Industry,
+    Occupation,
+    OccupationSimilarity,
+    OccupationStats,
+    OccupationTask,
+    OfoGroup,
+    Skill,
+    TaskFingerprint,
+    TaskLshBand,
+)
+from .services import (
+    build_occupation_similarity,
+    build_ofo_hierarchy,
+    get_related_occupations,
+    ofo_group_codes,
+    refresh_occupation_similarity,
+)
+
+User = get_user_model()
+
+
+class LoadOfoCommandTests(TestCase):
+    """Tests for the bulk OFO dataset loader"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, name, content):
+        path = Path(self.tmpdir.name) / name
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+    def jsonl(self, records):
+        return self.write("ofo.jsonl", "\n".join(json.dumps(r) for r in records))
+
+    def test_load_jsonl_creates_catalog(self):
+        """Test that a JSON Lines dataset creates all related rows"""
+        path = self.jsonl(
+            [
+                {
+                    "ofo_code": "251201",
+                    "ofo_title": "Software Developer",
+                    "industry_code": "ICT",
+                    "industry_name": "Information Technology",
+                    "years_of_experience": 2,
+                    "preferred_nqf_level": 6,
+                    "tasks": [
+                        {"title": "Write code", "skills": ["Python", "Testing"]},
+                        {"title": "Review code", "skills": ["Python"]},
+                    ],
+                },
+                {"ofo_code": "252201", "ofo_title": "Systems Administrator"},
+            ]
+        )
+        call_command("load_ofo", path, batch_size=1)
+
+        occupation = Occupation.objects.get(ofo_code="251201")
+        self.assertEqual(occupation.industry.code, "ICT")
+        self.assertEqual(occupation.preferred_nqf_level, 6)
+        self.assertEqual(occupation.tasks.count(), 2)
+        self.assertEqual(Skill.objects.count(), 2)
+        task = occupation.tasks.get(title="Write code")
+        self.assertEqual(task.skills.count(), 2)
+        self.assertEqual(Occupation.objects.count(), 2)
+        self.assertEqual(occupation.history.count(), 1)
+
+    def test_reload_updates_without_duplicates(self):
+        """Test that loading the same dataset twice is idempotent"""
+        record = {
+            "ofo_code": "251201",
+            "ofo_title": "Software Developer",
+            "tasks": [{"title": "Write code", "skills": ["Python"]}],
+        }
+        call_command("load_ofo", self.jsonl([record]))
+
+        record["ofo_title"] = "Software Engineer"
+        record["tasks"][0]["description"] = "Writes and tests code"
+        with self.assertLogs("apps.content.management.commands.load_ofo") as logs:
+            call_command("load_ofo", self.jsonl([record]))
+        self.assertIn("Task skills linked: 0", "\n".join(logs.output))
+
+        occupation = Occupation.objects.get(ofo_code="251201")
+        self.assertEqual(occupation.ofo_title, "Software Engineer")
+        self.assertEqual(OccupationTask.objects.count(), 1)
+        self.assertEqual(
+            OccupationTask.objects.get().description, "Writes and tests code"
+        )
+        self.assertEqual(occupation.history.count(), 2)
+
+    def test_skip_conflicts_and_history(self):
+        """Test that --on-conflict skip leaves existing occupations untouched"""
+        Occupation.objects.create(ofo_code="251201", ofo_title="Original")
+        path = self.jsonl([{"ofo_code": "251201", "ofo_title": "Changed"}])
+        call_command("load_ofo", path, on_conflict="skip", skip_history=True)
+
+        occupation = Occupation.objects.get(ofo_code="251201")
+        self.assertEqual(occupation.ofo_title, "Original")
+        self.assertEqual(occupation.history.count(), 1)
+
+    def test_load_csv_groups_task_rows(self):
+        """Test that CSV task rows are grouped into one occupation"""
+        path = self.write(
+            "ofo.csv",
+            "ofo_code,ofo_title,industry_name,task_title,skills\n"
+            "251201,Software Developer,Information Technology,Write code,Python;Git\n"
+            "251201,Software Developer,Information Technology,Review code,Git\n",
+        )
+        call_command("load_ofo", path)
+
+        occupation = Occupation.objects.get(ofo_code="251201")
+        self.assertEqual(occupation.tasks.count(), 2)
+        self.assertEqual(Industry.objects.get().code, "INFORMATION_TECHNOLOGY")
+        self.assertEqual(Skill.objects.count(), 2)
+
+
+class OccupationExportViewTests(TestCase):
+    """Tests for the streaming catalog export"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="staff", email="staff@app.local", password="testpass123"
+        )
+        self.user.is_staff = True
+        self.user.save()
+        industry = Industry.objects.create(code="ICT", name="Information Technology")
+        occupation = Occupation.objects.create(
+            ofo_code="251201", ofo_title="Software Developer", industry=industry
+        )
+        task = OccupationTask.objects.create(occupation=occupation, title="Write code")
+        task.skills.add(Skill.objects.create(name="Python"))
+        Occupation.objects.create(ofo_code="252201", ofo_title="Systems Administrator")
+
+    def export(self, **params):
+        self.client.login(username="staff", password="testpass123")
+        response = self.client.get(reverse("occupation-export"), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content)
+
+    def test_export_requires_staff(self):
+        """Test that non-staff users cannot export the catalog"""
+        User.objects.create_user(
+            username="normal", email="normal@app.local", password="testpass123"
+        )
+        self.client.login(username="normal", password="testpass123")
+        response = self.client.get(reverse("occupation-export"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_export_csv(self):
+        """Test that CSV export has one row per task"""
+        lines = self.export(format="csv").decode().splitlines()
+        self.assertTrue(lines[0].startswith("ofo_code,ofo_title"))
+        self.assertEqual(len(lines), 3)
+        self.assertIn("Write code", lines[1])
+        self.assertTrue(lines[1].endswith(",Python"))
+
+    def test_export_jsonl_gzip(self):
+        """Test that gzipped JSON Lines export decompresses to one line per occupation"""
+        content = gzip.decompress(self.export(format="jsonl", gzip="1"))
+        records = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual([r["ofo_code"] for r in records], ["251201", "252201"])
+        self.assertEqual(records[0]["tasks"][0]["skills"], ["Python"])
+
+    def test_export_round_trips_through_loader(self):
+        """Test that an export can be loaded back with load_ofo"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "export.csv"
+            path.write_bytes(self.export(format="csv"))
+            OccupationTask.objects.all().delete()
+            call_command("load_ofo", str(path))
+        self.assertEqual(OccupationTask.objects.get().skills.get().name, "Python")
+
+
+class AutocompleteViewTests(TestCase):
+    """Tests for the industry and task autocomplete endpoints"""
+
+    def setUp(self):
+        self.client = Client()
+        user = User.objects.create_user(
+            username="staff", email="staff@app.local", password="testpass123"
+        )
+        user.is_staff = True
+        user.save()
+        self.client.login(username="staff", password="testpass123")
+        Industry.objects.create(code="ICT", name="Information Technology")
+        Industry.objects.create(code="MIN", name="Mining")
+        occupation = Occupation.objects.create(ofo_code="251201", ofo_title="Developer")
+        for title in ["Manage project timelines", "Project planning", "Write code"]:
+            OccupationTask.objects.create(occupation=occupation, title=title)
+        autocomplete._indexes.clear()
+        self.addCleanup(autocomplete._indexes.clear)
+
+    def test_industry_prefix_search(self):
+        """Test that industries are matched on word prefixes"""
+        response = self.client.get(reverse("industry-autocomplete"), {"q": "tech"})
+        self.assertEqual(response.status_code, 200)
+        names = [r["name"] for r in response.json()["results"]]
+        self.assertEqual(names, ["Information Technology"])
+
+    def test_task_search_ranks_leading_matches_first(self):
+        """Test that titles starting with the query rank before inner matches"""
+        response = self.client.get(reverse("task-autocomplete"), {"q": "proj"})
+        titles = [r["title"] for r in response.json()["results"]]
+        self.assertEqual(titles, ["Project planning", "Manage project timelines"])
+
+    @override_settings(AUTOCOMPLETE_REBUILD_SECONDS=0)
+    def test_etag_not_modified_until_catalog_changes(self):
+        """Test that a matching ETag returns 304 until the catalog changes"""
+        url = reverse("industry-autocomplete")
+        etag = self.client.get(url, {"q": "m"})["ETag"]
+        response = self.client.get(url, {"q": "m"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Industry.objects.create(code="MAN", name="Manufacturing")
+        response = self.client.get(url, {"q": "m"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        names = [r["name"] for r in response.json()["results"]]
+        self.assertEqual(names, ["Manufacturing", "Mining"])
+
+
+    def test_rebuilds_are_debounced(self):
+        """Test that a young index keeps serving, with its own ETag, after a change"""
+        url = reverse("industry-autocomplete")
+        etag = self.client.get(url, {"q": "m"})["ETag"]
+        Industry.objects.create(code="MAN", name="Manufacturing")
+        response = self.client.get(url, {"q": "m"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        later = time.monotonic() + 31
+        with mock.patch.object(autocomplete.time, "monotonic", return_value=later):
+            response = self.client.get(url, {"q": "m"}, HTTP_IF_NONE_MATCH=etag)
+        names = [r["name"] for r in response.json()["results"]]
+        self.assertEqual(names, ["Manufacturing", "Mining"])
+
+
+class OccupationSimilarityTests(TestCase):
+    """Tests for the precomputed related occupations table"""
+
+    def setUp(self):
+        self.python = Skill.objects.create(name="Python")
+        self.sql = Skill.objects.create(name="SQL")
+        self.welding = Skill.objects.create(name="Welding")
+        self.developer = self.occupation("1", "Developer", [self.python, self.sql])
+        self.analyst = self.occupation("2", "Data Analyst", [self.sql])
+        self.welder = self.occupation("3", "Welder", [self.welding])
+
+    def occupation(self, code, title, skills):
+        occupation = Occupation.objects.create(ofo_code=code, ofo_title=title)
+        task = OccupationTask.objects.create(occupation=occupation, title=f"{title} work")
+        task.skills.set(skills)
+        return occupation
+
+    def related(self, occupation):
+        occupation.refresh_from_db()
+        return [item.related for item in get_related_occupations(occupation)]
+
+    def test_build_ranks_by_shared_features(self):
+        """Test that only occupations sharing skills or tasks are related"""
+        build_occupation_similarity()
+        self.assertEqual(self.related(self.developer), [self.analyst])
+        self.assertEqual(self.related(self.welder), [])
+        self.assertFalse(
+            Occupation.objects.filter(similarity_update_needed=True).exists()
+        )
+
+    def test_skill_change_refreshes_incrementally(self):
+        """Test that changing a task's skills updates both sides of the relation"""
+        build_occupation_similarity()
+        self.welder.tasks.get().skills.add(self.python)
+
+        self.welder.refresh_from_db()
+        self.assertTrue(self.welder.similarity_update_needed)
+        # Pages only read; the queued job does the refresh
+        self.assertEqual(self.related(self.welder), [])
+        self.assertTrue(
+            BackgroundJob.objects.filter(
+                kind=REFRESH_SIMILARITY, status=BackgroundJob.Status.PENDING
+            ).exists()
+        )
+        run_pending()
+        self.assertEqual(self.related(self.welder), [self.developer])
+        self.assertIn(
+            self.welder,
+            [item.related for item in self.developer.similar_occupations.all()],
+        )
+
+    def test_refresh_updates_neighbours_it_now_ranks_for(self):
+        """Test that occupations whose top-k a change enters are refreshed too"""
+        a, b, e, f, g, q, r = (
+            Skill.objects.create(name=name) for name in "abefgqr"
+        )
+        changed = self.occupation("10", "Changed", [e, f, g])
+        self.occupation("11", "Closest", [e, f, g])
+        other = self.occupation("12", "Other", [a, b])
+        self.occupation("13", "Weak", [a, q, r])
+        build_occupation_similarity(top_k=1)
+
+        # "Other" now ranks "Changed" first, though "Changed" ranks "Closest"
+        changed.tasks.get().skills.add(a, b)
+        refresh_occupation_similarity([changed.id], top_k=1)
+        self.assertEqual(self.related(other), [changed])
+
+        def table():
+            return set(
+                OccupationSimilarity.objects.values_list(
+                    "occupation_id", "related_id", "score"
+                )
+            )
+
+        incremental = table()
+        build_occupation_similarity(top_k=1)
+        self.assertEqual(incremental, table())
+
+    def test_refresh_matches_titles_like_the_full_build(self):
+        """Test that titles differing in case or spacing relate incrementally too"""
+        welder = self.occupation("20", "Pipe Welder", [])
+        fitter = self.occupation("21", "Pipe Fitter", [])
+        OccupationTask.objects.create(occupation=welder, title="Weld  Pipes")
+        OccupationTask.objects.create(occupation=fitter, title="weld pipes")
+
+        def table():
+            return set(
+                OccupationSimilarity.objects.values_list("occupation_id", "related_id")
+            )
+
+        build_occupation_similarity()
+        full = table()
+        self.assertIn((welder.id, fitter.id), full)
+
+        refresh_occupation_similarity([welder.id])
+        self.assertEqual(table(), full)
+
+    def test_build_keeps_flags_set_while_it_runs(self):
+        """Test that a change made during a full rebuild stays flagged"""
+        Occupation.objects.update(similarity_update_needed=True)
+        load_features = services._load_features
+
+        def load_and_edit(*args, **kwargs):
+            features = load_features(*args, **kwargs)
+            Occupation.objects.filter(pk=self.welder.pk).update(
+                similarity_update_needed=True
+            )
+            return features
+
+        with mock.patch.object(services, "_load_features", load_and_edit):
+            build_occupation_similarity()
+        self.assertEqual(
+            list(Occupation.objects.filter(similarity_update_needed=True)),
+            [self.welder],
+        )
+
+    def test_build_command_stale_only(self):
+        """Test that --stale only refreshes flagged occupations"""
+        call_command("build_occupation_similarity", stale=True)
+        self.assertEqual(OccupationSimilarity.objects.count(), 2)
+
+
+class OccupationTasksPartialTests(TestCase):
+    """Tests for the cached task list on the occupation edit page"""
+
+    def setUp(self):
+        self.client = Client()
+        user = User.objects.create_user(
+            username="staff", email="staff@app.local", password="testpass123"
+        )
+        user.is_staff = True
+        user.save()
+        self.client.login(username="staff", password="testpass123")
+        self.occupation = Occupation.objects.create(ofo_code="1", ofo_title="Developer")
+        self.url = reverse("occupation-tasks-partial", args=[self.occupation.id])
+
+    def test_task_list_invalidated_by_task_changes(self):
+        """Test that adding or editing a task refreshes the cached list"""
+        self.assertContains(self.client.get(self.url), "No tasks defined")
+
+        response = self.client.post(self.url, {"title": "Write code"})
+        self.assertContains(response, "Write code")
+        self.assertNotContains(response, "No tasks defined")
+
+        task = OccupationTask.objects.get()
+        task.title = "Review code"
+        task.save()
+        self.assertContains(self.client.get(self.url), "Review code")
+
+    def test_not_modified_until_tasks_change(self):
+        """Test that re-fetching an unchanged task list returns 304"""
+        self.client.get(self.url)  # issues the CSRF cookie
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        OccupationTask.objects.create(occupation=self.occupation, title="Test code")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "Test code")
+
+
+class OccupationDeleteJobTests(TestCase):
+    """Tests for background deletion of occupations"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="staff", email="staff@app.local", password="testpass123"
+        )
+        self.user.is_staff = True
+        self.user.save()
+        self.client.login(username="staff", password="testpass123")
+
+        candidate_user = User.objects.create_user(
+            username="candidate", email="candidate@app.local", password="testpass123"
+        )
+        self.candidate = CandidateProfile.objects.create(user=candidate_user)
+        skill = Skill.objects.create(name="Python")
+        self.occupations = []
+        for code in ("1", "2"):
+            occupation = Occupation.objects.create(ofo_code=code, ofo_title=code)
+            for title in ("Write code", "Review code", "Deploy code"):
+                task = OccupationTask.objects.create(occupation=occupation, title=title)
+                task.skills.add(skill)
+                AssessmentResponse.objects.create(
+                    candidate=self.candidate, task=task, response="yes"
+                )
+            OccupationTarget.objects.create(
+                candidate=self.candidate, occupation=occupation
+            )
+            self.occupations.append(occupation)
+        self.kept = Occupation.objects.create(ofo_code="3", ofo_title="Kept")
+        OccupationTask.objects.create(occupation=self.kept, title="Write code")
+        CandidateProfile.objects.update(stats_update_needed=False)
+
+    def test_bulk_delete_runs_in_batches(self):
+        """Test that bulk delete removes dependents and reports progress"""
+        ids = [occupation.id for occupation in self.occupations]
+        partials_version = get_user_partials_version(self.candidate.user_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("occupation-bulk-delete"), {"selected_occupations": ids}
+            )
+        job = BackgroundJob.objects.get(kind=DELETE_OCCUPATIONS)
+        self.assertRedirects(
+            response,
+            f"{reverse('occupations')}?job={job.id}",
+            fetch_redirect_response=False,
+        )
+
+        self.assertEqual(job.status, BackgroundJob.Status.SUCCEEDED)
+        # 6 responses + 2 targets + 6 skill links + 96 LSH bands
+        # + 6 fingerprints + 6 tasks + 2 occupations
+        self.assertEqual(job.total, 124)
+        self.assertEqual(job.processed, job.total)
+        self.assertEqual(list(Occupation.objects.all()), [self.kept])
+        self.assertEqual(OccupationTask.objects.count(), 1)
+        self.assertFalse(AssessmentResponse.objects.exists())
+        self.assertFalse(OccupationTarget.objects.exists())
+        self.candidate.refresh_from_db()
+        self.assertTrue(self.candidate.stats_update_needed)
+        # The raw deletes send no signals; the job bumps the partials itself
+        self.assertNotEqual(
+            get_user_partials_version(self.candidate.user_id), partials_version
+        )
+
+        # Bulk-written history carries the deleting user
+        deleted = AssessmentResponse.history.filter(history_type="-")
+        self.assertEqual(deleted.count(), 6)
+        self.assertEqual({row.history_user_id for row in deleted}, {self.user.id})
+        self.assertEqual(OccupationTask.history.filter(history_type="-").count(), 6)
+        self.assertEqual(Occupation.history.filter(history_type="-").count(), 2)
+
+    def test_job_status_partial(self):
+        """Test that the status partial stops polling once the job finishes"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("occupation-delete", args=[self.occupations[0].id])
+            )
+        job = BackgroundJob.objects.get(kind=DELETE_OCCUPATIONS)
+        response = self.client.get(reverse("job-status", args=[job.id]))
+        self.assertContains(response, "100%")
+        self.assertNotContains(response, "hx-trigger")
+
+        other = User.objects.get(username="candidate")
+        self.client.force_login(other)
+        response = self.client.get(reverse("job-status", args=[job.id]))
+        self.assertEqual(response.status_code, 403)
+
+
+class CatalogApiTests(TestCase):
+    """Tests for the read-only catalog API"""
+
+    def setUp(self):
+        self.client = Client()
+        User.objects.create_user(
+            username="api", email="api@app.local", password="testpass123"
+        )
+        self.client.login(username="api", password="testpass123")
+        industry = Industry.objects.create(code="ICT", name="Information Technology")
+        skill = Skill.objects.create(name="Python")
+        for code in ("1", "2", "3"):
+            occupation = Occupation.objects.create(
+                ofo_code=code, ofo_title=f"Occupation {code}", industry=industry
+            )
+            for title in ("Write code", "Review code"):
+                task = OccupationTask.objects.create(occupation=occupation, title=title)
+                task.skills.add(skill)
+
+    def test_occupation_list_query_count_is_constant(self):
+        """Test that nested industry, tasks and skills do not cause N+1 queries"""
+        # session + user, occupations with industry, tasks, skills
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("api-occupation-list"))
+        results = response.json()["results"]
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]["industry"]["code"], "ICT")
+        self.assertEqual(results[0]["tasks"][0]["skills"], ["Python"])
+
+    def test_sparse_fieldsets_skip_joins(self):
+        """Test that ?fields= limits output and the queries needed for it"""
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse("api-occupation-list"), {"fields": "id,ofo_code"}
+            )
+        self.assertEqual(
+            set(response.json()["results"][0]), {"id", "ofo_code"}
+        )
+
+    def test_cursor_pagination(self):
+        """Test that pages are linked by an opaque cursor"""
+        response = self.client.get(reverse("api-task-list"), {"page_size": 4})
+        data = response.json()
+        self.assertEqual(len(data["results"]), 4)
+        self.assertIn("cursor=", data["next"])
+        data = self.client.get(data["next"]).json()
+        self.assertEqual(len(data["results"]), 2)
+        self.assertIsNone(data["next"])
+
+    def test_conditional_get(self):
+        """Test that ETag and Last-Modified revalidate until the catalog changes"""
+        url = reverse("api-industry-list")
+        response = self.client.get(url)
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Skill.objects.create(name="SQL")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertTrue(last_modified)
+
+    def test_requires_authentication(self):
+        """Test that anonymous clients are rejected before any 304"""
+        self.client.logout()
+        response = self.client.get(reverse("api-skill-list"))
+        self.assertEqual(response.status_code, 403)
+
+
+class OfoHierarchyTests(TestCase):
+    """Tests for the OFO group hierarchy and its rollups"""
+
+    def setUp(self):
+        candidate_user = User.objects.create_user(
+            username="candidate", email="candidate@app.local", password="testpass123"
+        )
+        self.candidate = CandidateProfile.objects.create(user=candidate_user)
+        self.developer = Occupation.objects.create(ofo_code="251201", ofo_title="Dev")
+        self.tester = Occupation.objects.create(ofo_code="251202", ofo_title="Tester")
+        self.welder = Occupation.objects.create(
+            ofo_code="2021-651202", ofo_title="Welder"
+        )
+        for title in ("Write code", "Review code"):
+            OccupationTask.objects.create(occupation=self.developer, title=title)
+        OccupationTask.objects.create(occupation=self.welder, title="Weld")
+        OccupationTarget.objects.create(
+            candidate=self.candidate, occupation=self.developer
+        )
+
+    def test_group_codes(self):
+        """Test that codes split into four levels and ignore a year prefix"""
+        self.assertEqual(ofo_group_codes("251201"), ["2", "25", "251", "2512"])
+        self.assertEqual(ofo_group_codes("2021-651202"), ["6", "65", "651", "6512"])
+
+    def test_build_rolls_up_counts(self):
+        """Test that every level carries occupation, task and target counts"""
+        self.assertEqual(build_ofo_hierarchy(), 8)
+
+        major = OfoGroup.objects.get(code="2")
+        self.assertEqual(major.level, OfoGroup.Level.MAJOR)
+        self.assertEqual(
+            (major.occupation_count, major.task_count, major.target_count), (2, 2, 1)
+        )
+        unit = OfoGroup.objects.get(code="2512")
+        self.assertEqual(unit.parent.code, "251")
+        self.developer.refresh_from_db()
+        self.assertEqual(self.developer.ofo_group, unit)
+
+    def test_rebuild_removes_empty_groups(self):
+        """Test that groups without occupations are dropped on rebuild"""
+        build_ofo_hierarchy()
+        OfoGroup.objects.filter(code="2").update(title="Professionals")
+        self.welder.delete()
+        call_command("build_ofo_hierarchy")
+
+        self.assertFalse(OfoGroup.objects.filter(code__startswith="6").exists())
+        self.assertEqual(OfoGroup.objects.get(code="2").title, "Professionals")
+
+    def test_api_drill_down(self):
+        """Test that groups and occupations can be browsed by code"""
+        build_ofo_hierarchy()
+        client = Client()
+        client.force_login(self.candidate.user)
+        response = client.get(reverse("api-ofo-group-list"), {"parent": "25"})
+        self.assertEqual([g["code"] for g in response.json()["results"]], ["251"])
+
+        response = client.get(
+            reverse("api-occupation-list"), {"group": "25", "fields": "ofo_code"}
+        )
+        codes = {o["ofo_code"] for o in response.json()["results"]}
+        self.assertEqual(codes, {"251201", "251202"})
+
+
+    def test_api_rejects_invalid_level(self):
+        """Test that ?level= only accepts the four group levels"""
+        client = Client()
+        client.force_login(self.candidate.user)
+        url = reverse("api-ofo-group-list")
+        for level in ("abc", "5"):
+            self.assertEqual(client.get(url, {"level": level}).status_code, 400)
+        response = client.get(url, {"level": "1"})
+        self.assertEqual([g["code"] for g in response.json()["results"]], ["2", "6"])
+
+    def test_saved_occupations_are_linked(self):
+        """Test that new and recoded occupations get a group without a rebuild"""
+        build_ofo_hierarchy()
+        analyst = Occupation.objects.create(ofo_code="261101", ofo_title="Analyst")
+        self.assertEqual(analyst.ofo_group.code, "2611")
+        self.assertEqual(OfoGroup.objects.get(code="2611").parent.code, "261")
+
+        self.tester.ofo_code = "651203"
+        self.tester.save()
+        self.tester.refresh_from_db()
+        self.assertEqual(self.tester.ofo_group.code, "6512")
+
+
+class OccupationStatsTests(TestCase):
+    """Tests for the denormalized occupation stats row"""
+
+    def setUp(self):
+        candidate_user = User.objects.create_user(
+            username="candidate", email="candidate@app.local", password="testpass123"
+        )
+        self.candidate = CandidateProfile.objects.create(user=candidate_user)
+        self.occupation = Occupation.objects.create(ofo_code="1", ofo_title="Dev")
+        self.python = Skill.objects.create(name="Python")
+        self.sql = Skill.objects.create(name="SQL")
+
+    def stats(self):
+        return OccupationStats.objects.get(occupation=self.occupation)
+
+    def test_signals_keep_counts_current(self):
+        """Test that task, skill, target and response changes update the row"""
+        tasks = [
+            OccupationTask.objects.create(occupation=self.occupation, title=title)
+            for title in ("Write code", "Review code", "Test code", "Ship code", "Fix")
+        ]
+        tasks[0].skills.add(self.python, self.sql)
+        tasks[1].skills.add(self.python)
+        self.sql.tasks.add(tasks[2])
+        AssessmentResponse.objects.create(
+            candidate=self.candidate, task=tasks[0], response="yes"
+        )
+        target = OccupationTarget.objects.create(
+            candidate=self.candidate, occupation=self.occupation
+        )
+
+        stats = self.stats()
+        self.assertEqual(
+            (stats.task_count, stats.required_task_count, stats.skill_count),
+            (5, 4, 2),
+        )
+        self.assertEqual((stats.target_count, stats.response_count), (1, 1))
+
+        tasks[0].delete()
+        target.delete()
+        self.python.tasks.clear()
+        stats = self.stats()
+        self.assertEqual(
+            (stats.task_count, stats.required_task_count, stats.skill_count),
+            (4, 3, 1),
+        )
+        self.assertEqual((stats.target_count, stats.response_count), (0, 0))
+
+    def test_moved_task_updates_both_occupations(self):
+        """Test that reassigning a task recounts its old and new occupation"""
+        task = OccupationTask.objects.create(
+            occupation=self.occupation, title="Write code"
+        )
+        task.skills.add(self.python)
+        AssessmentResponse.objects.create(
+            candidate=self.candidate, task=task, response="yes"
+        )
+        other = Occupation.objects.create(ofo_code="2", ofo_title="Analyst")
+
+        task.occupation = other
+        task.save()
+        stats = self.stats()
+        self.assertEqual(
+            (stats.task_count, stats.skill_count, stats.response_count), (0, 0, 0)
+        )
+        stats = OccupationStats.objects.get(occupation=other)
+        self.assertEqual(
+            (stats.task_count, stats.required_task_count, stats.skill_count),
+            (1, 1, 1),
+        )
+        self.assertEqual(stats.response_count, 1)
+
+    def test_verify_repairs_drift(self):
+        """Test that the verify command recalculates drifted and missing rows"""
+        OccupationTask.objects.create(occupation=self.occupation, title="Write code")
+        OccupationStats.objects.update(task_count=7, target_count=3)
+        other = Occupation.objects.create(ofo_code="2", ofo_title="Analyst")
+        OccupationStats.objects.filter(occupation=other).delete()
+
+        call_command("verify_occupation_stats", dry_run=True)
+        self.assertEqual(self.stats().task_count, 7)
+
+        call_command("verify_occupation_stats")
+        stats = self.stats()
+        self.assertEqual((stats.task_count, stats.target_count), (1, 0))
+        self.assertTrue(OccupationStats.objects.filter(occupation=other).exists())
+
+
+class TaskDuplicateDetectionTests(TestCase):
+    """Tests for MinHash LSH near-duplicate task detection"""
+
+    def setUp(self):
+        self.developer = Occupation.objects.create(ofo_code="1", ofo_title="Dev")
+        self.manager = Occupation.objects.create(ofo_code="2", ofo_title="Manager")
+        self.original = OccupationTask.objects.create(
+            occupation=self.developer,
+            title="Manage project timelines",
+            description="Plan and track delivery schedules",
+        )
+        self.copy = OccupationTask.objects.create(
+            occupation=self.manager,
+            title="Manage project timeline",
+            description="Plan and track delivery schedules.",
+        )
+        self.other = OccupationTask.objects.create(
+            occupation=self.manager, title="Weld metal parts"
+        )
+
+    def test_tasks_indexed_on_save(self):
+        """Test that saving a task fingerprints it and re-indexes text changes"""
+        self.assertEqual(TaskFingerprint.objects.count(), 3)
+        self.assertEqual(TaskLshBand.objects.filter(task=self.other).count(), 16)
+
+        fingerprint = TaskFingerprint.objects.get(task=self.other)
+        self.other.title = "Weld steel parts"
+        self.other.save()
+        self.assertNotEqual(
+            TaskFingerprint.objects.get(task=self.other).text_hash,
+            fingerprint.text_hash,
+        )
+
+    def test_find_similar_tasks(self):
+        """Test that near-duplicates are suggested and unrelated tasks are not"""
+        similar = find_similar_tasks(
+            "Manage project timelines", "Plan and track delivery schedules"
+        )
+        self.assertEqual(
+            [task for task, _ in similar], [self.original, self.copy]
+        )
+        similar = find_similar_tasks(
+            "Manage project timelines",
+            "Plan and track delivery schedules",
+            exclude=[self.original.id],
+        )
+        self.assertEqual([task for task, _ in similar], [self.copy])
+
+    def test_duplicate_clusters(self):
+        """Test that colliding tasks are grouped into clusters"""
+        self.assertEqual(
+            find_duplicate_clusters(),
+            [sorted([self.original.id, self.copy.id])],
+        )
+        call_command("find_duplicate_tasks")
+
+    def test_build_command_indexes_bulk_loaded_tasks(self):
+        """Test that the build command indexes tasks created without signals"""
+        OccupationTask.objects.bulk_create(
+            [OccupationTask(occupation=self.developer, title="Review code")]
+        )
+        call_command("build_task_lsh")
+        self.assertEqual(TaskFingerprint.objects.count(), 4)
+
+    def test_similar_endpoint(self):
+        """Test that the endpoint returns JSON, or a partial for HTMX"""
+        user = User.objects.create_user(
+            username="staff", email="staff@app.local", password="testpass123"
+        )
+        user.is_staff = True
+        user.save()
+        self.client.force_login(user)
+        url = reverse("task-similar")
+        params = {
+            "title": "Manage project timeline",
+            "description": "Plan and track delivery schedules",
+            "exclude": self.copy.id,
+        }
+        results = self.client.get(url, params).json()["results"]
+        self.assertEqual([r["id"] for r in results], [self.original.id])
+        self.assertEqual(results[0]["occupation"]["ofo_code"], "1")
+
+        response = self.client.get(url, params, HTTP_HX_REQUEST="true")
+        self.assertContains(response, "Similar tasks already exist")
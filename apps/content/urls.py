@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path("occupations/add/", views.occupation_add, name="occupation-add"),
     path("occupations/upload/", views.occupation_upload, name="occupation-upload"),
+    path("occupations/export/", views.occupation_export, name="occupation-export"),
     path(
         "occupations/<str:occupation_id>/edit/",
         views.occupation_edit,
@@ -35,6 +36,22 @@ urlpatterns = [
         views.occupation_bulk_delete,
         name="occupation-bulk-delete",
     ),
+    # Autocomplete (JSON)
+    path(
+        "occupations/autocomplete/industries/",
+        views.industry_autocomplete,
+        name="industry-autocomplete",
+    ),
+    path(
+        "occupations/autocomplete/tasks/",
+        views.task_autocomplete,
+        name="task-autocomplete",
+    ),
+    path(
+        "occupations/tasks/similar/",
+        views.task_similar,
+        name="task-similar",
+    ),
     path(
         "occupations/partials/task-selector/",
         views.task_list_partial,
@@ -0,0 +1,81 @@
+"""
+Catalog version stamps.
+
+A catalog-wide stamp is bumped whenever catalog content (industries,
+occupations, tasks, skills) changes, and a per-occupation stamp whenever that
+occupation or one of its tasks changes. Caches, template fragments and ETags
+are keyed on these stamps, so a bump invalidates everything derived from the
+changed content without enumerating keys.
+"""
+
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.db import transaction
+
+CATALOG_VERSION_KEY = "content:catalog_version"
+OCCUPATION_VERSION_KEY = "content:occupation_version:{}"
+
+# Fragments keyed on a version stamp never go stale, so they can live long
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _get(key):
+    version = cache.get(key)
+    if version is None:
+        version = _set(key)
+    return version
+
+
+def _set(key):
+    version = time.time_ns() // 1000
+    cache.set(key, version, None)
+    return version
+
+
+def _bump(key):
+    version = _set(key)
+    # Bump again on commit: a concurrent request may have cached the
+    # pre-commit state under the first stamp
+    transaction.on_commit(lambda: _set(key))
+    return version
+
+
+def get_catalog_version():
+    """Return the current catalog version (microseconds since the epoch)."""
+    return _get(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    """Mark the catalog as changed and return the new version."""
+    return _bump(CATALOG_VERSION_KEY)
+
+
+def get_occupation_version(occupation_id):
+    """Return the current version of a single occupation and its tasks."""
+    return _get(OCCUPATION_VERSION_KEY.format(occupation_id))
+
+
+def bump_occupation_version(occupation_id):
+    """Mark an occupation (or its tasks) as changed and return the new version."""
+    return _bump(OCCUPATION_VERSION_KEY.format(occupation_id))
+
+
+def bump_occupation_versions(occupation_ids):
+    """Bulk variant of bump_occupation_version, for batch jobs."""
+    keys = [OCCUPATION_VERSION_KEY.format(pk) for pk in occupation_ids]
+    if not keys:
+        return
+
+    def bump():
+        version = time.time_ns() // 1000
+        cache.set_many({key: version for key in keys}, None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def version_datetime(version):
+    """Convert a version stamp to an aware datetime, e.g. for Last-Modified."""
+    return datetime.fromtimestamp(version / 1_000_000, tz=timezone.utc)
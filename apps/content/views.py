@@ -1,17 +1,34 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.http import HttpResponse
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
 import csv
+import hashlib
 import io
 
 
 from apps.core.context_processors import navbar_context
+from apps.core.db.replica import use_replica
+from apps.core.pagination import apaginate
+from apps.core.partials import cache_partial
+from apps.core.jobs import enqueue
+from .conditional import conditional_page
 from .models import Occupation, OccupationTask, Industry
 from .forms import OccupationForm, OccupationTaskForm
+from . import autocomplete, dedup, exports, jobs
+from .versioning import (
+    FRAGMENT_CACHE_TIMEOUT,
+    get_catalog_version,
+    get_occupation_version,
+)
 
 
-from rolepermissions.checkers import has_role
+from apps.accounts.roles import has_role
 
 
 def is_staff_or_admin(user):
@@ -44,6 +61,7 @@ def occupation_edit(request, occupation_id):
 
 @login_required
 @user_passes_test(is_staff_or_admin)
+@conditional_page
 def occupation_details_partial(request, occupation_id):
     """
     HTMX partial for editing occupation details.
@@ -64,6 +82,7 @@ def occupation_details_partial(request, occupation_id):
 
 @login_required
 @user_passes_test(is_staff_or_admin)
+@conditional_page
 def occupation_tasks_partial(request, occupation_id):
     """
     HTMX partial for listing and adding tasks.
@@ -81,14 +100,22 @@ def occupation_tasks_partial(request, occupation_id):
     else:
         form = OccupationTaskForm()
 
+    # Lazy: only evaluated when the cached task list fragment is re-rendered
     tasks = occupation.tasks.all()
 
-    context = {"form": form, "occupation": occupation, "tasks": tasks}
+    context = {
+        "form": form,
+        "occupation": occupation,
+        "tasks": tasks,
+        "occupation_version": get_occupation_version(occupation.id),
+        "fragment_cache_timeout": FRAGMENT_CACHE_TIMEOUT,
+    }
     return render(request, "content/partials/occupation_tasks.html", context)
 
 
 @login_required
 @user_passes_test(is_staff_or_admin)
+@conditional_page
 def occupation_task_detail(request, occupation_id, task_id):
     """
     HTMX partial for editing/deleting a single task.
@@ -169,20 +196,9 @@ def occupation_add(request):
     else:
         form = OccupationForm()
 
-    # Get some industries for autocomplete
-    industries = Industry.objects.all().values("id", "name")[:20]
-
-    # Get some common tasks for autocomplete (title and description)
-    common_tasks = list(
-        OccupationTask.objects.values("title", "description").distinct()[:50]
-    )
-
-    import json
-
+    # Industry and task suggestions are fetched from the autocomplete endpoints
     context = navbar_context(request)
     context["form"] = form
-    context["industries_json"] = json.dumps(list(industries))
-    context["common_tasks_json"] = json.dumps(list(common_tasks))
     context["nqf_levels"] = [
         {"id": "0", "name": "Any / Not Applicable (0)"},
         {"id": "4", "name": "Grade 12 / Matric (4)"},
@@ -261,6 +277,22 @@ def occupation_upload(request):
     return render(request, "content/occupation_upload.html", context)
 
 
+def _start_deletion(request, occupation_ids):
+    """
+    Queue a background job deleting the occupations and their dependents, then
+    return to the list where the job's progress is polled.
+    """
+    job = enqueue(
+        jobs.DELETE_OCCUPATIONS, {"occupation_ids": list(occupation_ids)}, request.user
+    )
+    messages.success(
+        request,
+        f"Deleting {len(occupation_ids)} occupation(s) in the background. "
+        "They will disappear from the list once the job completes.",
+    )
+    return redirect(f"{reverse('occupations')}?job={job.id}")
+
+
 @login_required
 @user_passes_test(is_staff_or_admin)
 def occupation_delete(request, occupation_id):
@@ -269,9 +301,7 @@ def occupation_delete(request, occupation_id):
     """
     occupation = get_object_or_404(Occupation, pk=occupation_id)
     if request.method == "POST" or request.method == "DELETE":
-        occupation.delete()
-        messages.success(request, "Occupation deleted successfully.")
-        return redirect("occupations")
+        return _start_deletion(request, [occupation.id])
 
     context = navbar_context(request)
     context["occupation"] = occupation
@@ -287,23 +317,57 @@ def occupation_bulk_delete(request):
     if request.method == "POST":
         occupation_ids = request.POST.getlist("selected_occupations")
         if occupation_ids:
-            deleted_count = Occupation.objects.filter(id__in=occupation_ids).delete()[0]
-            messages.success(
-                request,
-                f"Successfully deleted {deleted_count} occupations related records.",
-            )
+            return _start_deletion(request, occupation_ids)
         else:
             messages.warning(request, "No occupations selected for deletion.")
     return redirect("occupations")
 
 
 @login_required
-def task_list_partial(request):
+@user_passes_test(is_staff_or_admin)
+def occupation_export(request):
+    """
+    Stream the occupation catalog (occupations, tasks and skills) as CSV or
+    JSON Lines. Pass ?gzip=1 to download a gzip-compressed file.
+    """
+    export_format = request.GET.get("format", "csv")
+    if export_format not in ("csv", "jsonl"):
+        return HttpResponse("Unsupported export format.", status=400)
+
+    queryset = exports.catalog_queryset()
+    industry_id = request.GET.get("industry")
+    if industry_id:
+        queryset = queryset.filter(industry_id=industry_id)
+
+    records = exports.iter_occupations(queryset)
+    if export_format == "csv":
+        lines = exports.iter_csv(records)
+        content_type = "text/csv"
+    else:
+        lines = exports.iter_jsonl(records)
+        content_type = "application/x-ndjson"
+
+    stream = exports.iter_buffered(lines)
+    filename = f"occupations.{export_format}"
+    if request.GET.get("gzip") in ("1", "true"):
+        stream = exports.iter_gzip(stream)
+        content_type = "application/gzip"
+        filename += ".gz"
+
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+@conditional_page
+@cache_partial("task_list", version=get_catalog_version)
+@use_replica
+async def task_list_partial(request):
     """
     HTMX view to return a list of tasks for the search modal.
     """
     from django.db.models import Q
-    from django.core.paginator import Paginator
 
     query = request.GET.get("q", "")
     tasks_qs = (
@@ -317,12 +381,108 @@ def task_list_partial(request):
             Q(title__icontains=query) | Q(description__icontains=query)
         )
 
-    paginator = Paginator(tasks_qs, 10)
-    page_number = request.GET.get("page")
-    tasks_page = paginator.get_page(page_number)
+    tasks_page = await apaginate(tasks_qs, 10, request.GET.get("page"))
 
-    return render(
+    return await sync_to_async(render)(
         request,
         "content/partials/task_list_selector.html",
         {"tasks": tasks_page, "search_query": query},
     )
+
+
+# Server-side result cache TTL and browser max-age for autocomplete responses
+AUTOCOMPLETE_CACHE_TIMEOUT = 60
+AUTOCOMPLETE_MAX_AGE = 30
+AUTOCOMPLETE_LIMIT = 20
+
+
+def _autocomplete_params(request):
+    query = request.GET.get("q", "").strip()[:100]
+    try:
+        limit = int(request.GET.get("limit", AUTOCOMPLETE_LIMIT))
+    except ValueError:
+        limit = AUTOCOMPLETE_LIMIT
+    return query, max(1, min(limit, 50))
+
+
+def _autocomplete_key(kind, request):
+    query, limit = _autocomplete_params(request)
+    digest = hashlib.md5(autocomplete.normalise(query).encode()).hexdigest()
+    version = autocomplete.get_index(kind).version
+    return f"content:autocomplete:{kind}:{version}:{digest}:{limit}"
+
+
+def _autocomplete_response(request, kind):
+    query, limit = _autocomplete_params(request)
+    results = cache.get_or_set(
+        _autocomplete_key(kind, request),
+        lambda: autocomplete.get_index(kind).search(query, limit),
+        AUTOCOMPLETE_CACHE_TIMEOUT,
+    )
+    response = JsonResponse({"results": results})
+    patch_cache_control(response, private=True, max_age=AUTOCOMPLETE_MAX_AGE)
+    return response
+
+
+@login_required
+@user_passes_test(is_staff_or_admin)
+@condition(etag_func=lambda request: _autocomplete_key("industries", request))
+@use_replica
+def industry_autocomplete(request):
+    """
+    JSON autocomplete for industries: {"results": [{"id", "name"}]}.
+    """
+    return _autocomplete_response(request, "industries")
+
+
+@login_required
+@user_passes_test(is_staff_or_admin)
+@condition(etag_func=lambda request: _autocomplete_key("tasks", request))
+@use_replica
+def task_autocomplete(request):
+    """
+    JSON autocomplete for distinct task titles: {"results": [{"title", "description"}]}.
+    """
+    return _autocomplete_response(request, "tasks")
+
+
+@login_required
+@user_passes_test(is_staff_or_admin)
+@use_replica
+async def task_similar(request):
+    """
+    Existing tasks similar to ?title=&description=, for "similar task already
+    exists" hints. Pass ?exclude=<task id> when editing. Returns JSON
+    {"results": [{"id", "title", "score", "occupation": {...}}]}, or an HTML
+    partial for HTMX requests.
+    """
+    title = request.GET.get("title", "").strip()
+    similar = []
+    if len(title) >= 3:
+        similar = await sync_to_async(dedup.find_similar_tasks)(
+            title,
+            request.GET.get("description", ""),
+            exclude=request.GET.getlist("exclude"),
+        )
+
+    if request.headers.get("HX-Request"):
+        return await sync_to_async(render)(
+            request, "content/partials/similar_tasks.html", {"similar": similar}
+        )
+    return JsonResponse(
+        {
+            "results": [
+                {
+                    "id": task.id,
+                    "title": task.title,
+                    "score": round(score, 2),
+                    "occupation": {
+                        "id": task.occupation.id,
+                        "ofo_code": task.occupation.ofo_code,
+                        "ofo_title": task.occupation.ofo_title,
+                    },
+                }
+                for task, score in similar
+            ]
+        }
+    )
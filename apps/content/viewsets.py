@@ -0,0 +1,171 @@
+import hashlib
+
+from django.db.models import Prefetch
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+
+from apps.core.db.replica import use_replica
+
+from .models import Industry, Occupation, OccupationTask, OfoGroup, Skill
+from .serializers import (
+    IndustrySerializer,
+    OccupationSerializer,
+    OccupationTaskSerializer,
+    OfoGroupSerializer,
+    SkillSerializer,
+)
+from .versioning import get_catalog_version, version_datetime
+
+
+class CatalogCursorPagination(CursorPagination):
+    """Stable pagination for mirroring: pages don't shift as rows are added."""
+
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering = "id"
+
+
+def _catalog_etag(request, *args, **kwargs):
+    key = f"{get_catalog_version()}:{request.get_full_path()}:{request.META.get('HTTP_ACCEPT', '')}"
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def _catalog_last_modified(request, *args, **kwargs):
+    return version_datetime(get_catalog_version())
+
+
+catalog_condition = method_decorator(
+    condition(etag_func=_catalog_etag, last_modified_func=_catalog_last_modified)
+)
+
+
+class CatalogViewSetMixin:
+    """
+    Read-only catalog endpoint with cursor pagination, sparse fieldsets
+    (?fields=id,name) and conditional GET keyed on the catalog version.
+    """
+
+    pagination_class = CatalogCursorPagination
+
+    def requested_fields(self):
+        fields = self.request.query_params.get("fields", "")
+        return [name.strip() for name in fields.split(",") if name.strip()]
+
+    def wants(self, name):
+        fields = self.requested_fields()
+        return not fields or name in fields
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("fields", self.requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # Let clients cache, but revalidate every time against the ETag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    @method_decorator(use_replica)
+    @catalog_condition
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @method_decorator(use_replica)
+    @catalog_condition
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+class IndustryViewSet(CatalogViewSetMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Industry.objects.all()
+    serializer_class = IndustrySerializer
+
+
+class SkillViewSet(CatalogViewSetMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Skill.objects.all()
+    serializer_class = SkillSerializer
+
+
+class OfoGroupPagination(CatalogCursorPagination):
+    ordering = "code"
+
+
+class OfoGroupViewSet(CatalogViewSetMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    OFO groups with rolled-up counts. Drill down with ?parent=<code>, or list
+    one level with ?level=1..4 (major, sub-major, minor, unit group).
+    """
+
+    queryset = OfoGroup.objects.all()
+    serializer_class = OfoGroupSerializer
+    pagination_class = OfoGroupPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        parent = self.request.query_params.get("parent")
+        if parent:
+            queryset = queryset.filter(parent__code=parent)
+        level = self.request.query_params.get("level")
+        if level:
+            if level not in {str(value) for value in OfoGroup.Level.values}:
+                raise ValidationError({"level": "Must be 1, 2, 3 or 4."})
+            queryset = queryset.filter(level=level)
+        if self.wants("parent"):
+            queryset = queryset.select_related("parent")
+        return queryset
+
+
+class OccupationViewSet(CatalogViewSetMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Occupations with their industry and tasks. Filter with ?industry=<id> or
+    ?group=<OFO group code>.
+    """
+
+    queryset = Occupation.objects.all()
+    serializer_class = OccupationSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        industry_id = self.request.query_params.get("industry")
+        if industry_id:
+            queryset = queryset.filter(industry_id=industry_id)
+        group = self.request.query_params.get("group")
+        if group:
+            # Prefix match on the small group table, not on occupation codes
+            queryset = queryset.filter(ofo_group__code__startswith=group)
+        # Only join or prefetch what the requested fields render
+        if self.wants("industry"):
+            queryset = queryset.select_related("industry")
+        if self.wants("ofo_group"):
+            queryset = queryset.select_related("ofo_group")
+        if self.wants("tasks"):
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "tasks",
+                    queryset=OccupationTask.objects.order_by("title").prefetch_related(
+                        "skills"
+                    ),
+                )
+            )
+        return queryset
+
+
+class OccupationTaskViewSet(CatalogViewSetMixin, viewsets.ReadOnlyModelViewSet):
+    """Tasks with their skill names. Filter with ?occupation=<id>."""
+
+    queryset = OccupationTask.objects.all()
+    serializer_class = OccupationTaskSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        occupation_id = self.request.query_params.get("occupation")
+        if occupation_id:
+            queryset = queryset.filter(occupation_id=occupation_id)
+        if self.wants("skills"):
+            queryset = queryset.prefetch_related("skills")
+        return queryset
@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.contrib.admin.exceptions import NotRegistered
 from dhet_admin.admin import ModelAdmin, TabularInline
 from cookie_consent.models import CookieGroup, Cookie
-from .models import UserCookieConsent
+from .models import BackgroundJob, UserCookieConsent
 
 class CookieInline(TabularInline):
     model = Cookie
@@ -41,3 +41,10 @@ class UserCookieConsentAdmin(ModelAdmin):
     list_filter = ["action", "group_varname", "created_at"]
     search_fields = ["user__username", "user__email", "group_varname"]
     readonly_fields = ["user", "group_varname", "action", "version", "created_at"]
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(ModelAdmin):
+    list_display = ["kind", "status", "processed", "total", "created_by", "created_at", "finished_at"]
+    list_filter = ["status", "kind"]
+    search_fields = ["kind", "message", "error"]
+    readonly_fields = ["kind", "payload", "status", "total", "processed", "message", "error", "created_by", "created_at", "started_at", "heartbeat_at", "finished_at"]
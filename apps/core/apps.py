@@ -8,6 +8,13 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         from django.apps import apps
+        from django.db.backends.signals import connection_created
+
+        from .instrumentation import install_query_recorder
+
+        # Count every connection's queries in the per-request metrics
+        connection_created.connect(install_query_recorder)
+
         try:
             cookie_consent_app = apps.get_app_config('cookie_consent')
             cookie_consent_app.verbose_name = 'Cookie Consent'
@@ -0,0 +1,207 @@
+"""
+Two-tier cache: a small per-process LRU (L1) in front of a shared backend (L2).
+
+Reads try the local tier first and fall back to the shared one, copying what
+they find into L1 for at most L1_TIMEOUT seconds. Writes and deletes go to
+both tiers, so a process always sees its own changes at once; other worker
+processes see them once their L1 copy expires. Keys whose changes must be
+visible everywhere immediately can skip L1 with L1_EXCLUDE prefixes.
+
+The shared tier is chosen with CACHE_URL, in the style of DATABASE_URL:
+
+    locmem://                      per-process only (no tiers)
+    redis://host:6379/0            Redis (requires the redis package)
+    file:///var/tmp/dhet_cache     files on a shared volume
+    db://dhet_cache                database table (manage.py createcachetable)
+"""
+
+from urllib.parse import urlsplit
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from .instrumentation import record_cache_lookup
+
+_MISSING = object()
+
+L2_BACKENDS = {
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "rediss": "django.core.cache.backends.redis.RedisCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "db": "django.core.cache.backends.db.DatabaseCache",
+}
+
+
+def _raw_key(key, key_prefix, version):
+    # The tiered cache builds the full key; the tiers must store it as is
+    return key
+
+
+def cache_config(url, l1_timeout=5, l1_max_entries=1000, l1_exclude=(), **extra):
+    """Build a CACHES entry from a cache URL (see the module docstring)."""
+    parts = urlsplit(url)
+    if parts.scheme == "locmem":
+        return {"BACKEND": "apps.core.instrumentation.InstrumentedLocMemCache", **extra}
+    if parts.scheme not in L2_BACKENDS:
+        raise ImproperlyConfigured(f"Unsupported CACHE_URL scheme '{parts.scheme}'")
+
+    if parts.scheme == "file":
+        location = parts.path
+    elif parts.scheme == "db":
+        location = parts.netloc or parts.path.lstrip("/")
+    else:
+        location = url
+    shared = {"BACKEND": L2_BACKENDS[parts.scheme], "LOCATION": location}
+    if not l1_timeout:
+        return {**shared, **extra}
+    return {
+        "BACKEND": "apps.core.cache.TieredCache",
+        "OPTIONS": {
+            "L2": shared,
+            "L1_TIMEOUT": l1_timeout,
+            "L1_MAX_ENTRIES": l1_max_entries,
+            "L1_EXCLUDE": list(l1_exclude),
+        },
+        **extra,
+    }
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        options = dict(params.get("OPTIONS", {}))
+        shared = options.pop("L2", None)
+        if not shared:
+            raise ImproperlyConfigured("TieredCache needs an 'L2' cache in OPTIONS")
+        self.l1_timeout = options.pop("L1_TIMEOUT", 5)
+        self.l1_exclude = tuple(options.pop("L1_EXCLUDE", ()))
+        l1_max_entries = options.pop("L1_MAX_ENTRIES", 1000)
+        super().__init__({**params, "OPTIONS": options})
+
+        self.l1 = LocMemCache(
+            f"tiered-l1-{location}",
+            {
+                "TIMEOUT": self.l1_timeout,
+                "KEY_FUNCTION": _raw_key,
+                "OPTIONS": {"MAX_ENTRIES": l1_max_entries, "CULL_FREQUENCY": 4},
+            },
+        )
+        l2_class = import_string(shared["BACKEND"])
+        self.l2 = l2_class(
+            shared.get("LOCATION", ""),
+            {**shared, "KEY_FUNCTION": _raw_key, "TIMEOUT": self.default_timeout},
+        )
+
+    def _local(self, key):
+        return not key.startswith(self.l1_exclude)
+
+    def _l1_timeout(self, timeout):
+        if timeout is None:
+            return self.l1_timeout
+        return min(timeout, self.l1_timeout)
+
+    def _timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        timeout = self._timeout(timeout)
+        added = self.l2.add(full_key, value, timeout)
+        if added and self._local(key):
+            self.l1.set(full_key, value, self._l1_timeout(timeout))
+        return added
+
+    def get(self, key, default=None, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        local = self._local(key)
+        value = self.l1.get(full_key, _MISSING) if local else _MISSING
+        if value is _MISSING:
+            value = self.l2.get(full_key, _MISSING)
+            if value is not _MISSING and local:
+                self.l1.set(full_key, value)
+        record_cache_lookup(value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        timeout = self._timeout(timeout)
+        self.l2.set(full_key, value, timeout)
+        if self._local(key):
+            self.l1.set(full_key, value, self._l1_timeout(timeout))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        timeout = self._timeout(timeout)
+        if self._local(key):
+            self.l1.touch(full_key, self._l1_timeout(timeout))
+        return self.l2.touch(full_key, timeout)
+
+    def delete(self, key, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        self.l1.delete(full_key)
+        return self.l2.delete(full_key)
+
+    def has_key(self, key, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        return self.l1.has_key(full_key) or self.l2.has_key(full_key)
+
+    def incr(self, key, delta=1, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        self.l1.delete(full_key)
+        try:
+            return self.l2.incr(full_key, delta)
+        except ValueError:
+            raise ValueError(f"Key '{key}' not found") from None
+
+    def get_many(self, keys, version=None):
+        full_keys = {self.make_and_validate_key(k, version=version): k for k in keys}
+        found = {}
+        remote = []
+        for full_key, key in full_keys.items():
+            value = (
+                self.l1.get(full_key, _MISSING) if self._local(key) else _MISSING
+            )
+            if value is _MISSING:
+                remote.append(full_key)
+            else:
+                found[key] = value
+        if remote:
+            for full_key, value in self.l2.get_many(remote).items():
+                key = full_keys[full_key]
+                found[key] = value
+                if self._local(key):
+                    self.l1.set(full_key, value)
+        for key in keys:
+            record_cache_lookup(key in found)
+        return found
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        full_data = {
+            self.make_and_validate_key(key, version=version): value
+            for key, value in data.items()
+        }
+        failed = self.l2.set_many(full_data, timeout)
+        local = {
+            full_key: value
+            for (key, value), full_key in zip(data.items(), full_data)
+            if self._local(key)
+        }
+        self.l1.set_many(local, self._l1_timeout(timeout))
+        # set_many reports failures as the keys that were passed in
+        by_full_key = dict(zip(full_data, data))
+        return [by_full_key.get(key, key) for key in failed]
+
+    def delete_many(self, keys, version=None):
+        full_keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        self.l1.delete_many(full_keys)
+        self.l2.delete_many(full_keys)
+
+    def clear(self):
+        # Other processes keep their L1 copies until they expire
+        self.l1.clear()
+        self.l2.clear()
+
+    def close(self, **kwargs):
+        self.l2.close(**kwargs)
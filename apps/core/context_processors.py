@@ -1,5 +1,6 @@
 from django.urls import reverse
-from rolepermissions.checkers import has_role
+
+from apps.accounts.roles import has_role
 
 
 def resolve_role(user):
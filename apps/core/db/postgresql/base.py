@@ -0,0 +1,26 @@
+"""
+PostgreSQL backend that reports connection checkouts to the request metrics.
+
+With OPTIONS["pool"] set, opening a connection is a checkout from the
+psycopg pool, so the time recorded here is the pool wait; without a pool it
+is the cost of a fresh connection. Failures (e.g. PoolTimeout when the pool
+stays exhausted for its timeout) are counted before the error propagates.
+"""
+
+import time
+
+from django.db.backends.postgresql import base
+
+from apps.core.instrumentation import record_connection_checkout
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        start = time.perf_counter()
+        try:
+            connection = super().get_new_connection(conn_params)
+        except Exception:
+            record_connection_checkout(time.perf_counter() - start, failed=True)
+            raise
+        record_connection_checkout(time.perf_counter() - start)
+        return connection
@@ -0,0 +1,106 @@
+"""
+Read-replica routing for read-only views.
+
+Views wrapped in `use_replica` send their reads of replica-safe apps
+(REPLICA_READ_APPS) to the "replica" database when one is configured
+(DATABASE_REPLICA_URL). Everything else, and every write, uses the primary:
+
+- only safe methods (GET, HEAD, OPTIONS) are routed to the replica
+- after a write, reads in the same request go back to the primary, as do
+  reads inside a transaction on the primary
+- after an unsafe request ReplicaPinMiddleware sets a short-lived cookie, and
+  that browser reads from the primary until it expires, so users see their
+  own changes despite replication lag (read-your-writes)
+"""
+
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_ALIAS = "replica"
+PIN_COOKIE = "read_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# None outside replica-enabled views; otherwise a dict for the current request
+_state = ContextVar("replica_state", default=None)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def use_replica(view_func):
+    """
+    Let a read-only view, sync or async, read from the replica (see the module
+    docstring).
+    """
+
+    def enabled(request):
+        return (
+            replica_configured()
+            and request.method in SAFE_METHODS
+            and PIN_COOKIE not in request.COOKIES
+        )
+
+    if iscoroutinefunction(view_func):
+
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            if not enabled(request):
+                return await view_func(request, *args, **kwargs)
+            # Queries run in worker threads, which inherit this context
+            token = _state.set({"wrote": False})
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                _state.reset(token)
+
+    else:
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not enabled(request):
+                return view_func(request, *args, **kwargs)
+            token = _state.set({"wrote": False})
+            try:
+                return view_func(request, *args, **kwargs)
+            finally:
+                _state.reset(token)
+
+    return wrapper
+
+
+class ReplicaRouter:
+    def _reads_from_replica(self, model):
+        state = _state.get()
+        return (
+            state is not None
+            and not state["wrote"]
+            and model._meta.app_label in getattr(settings, "REPLICA_READ_APPS", ())
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        )
+
+    def db_for_read(self, model, **hints):
+        if self._reads_from_replica(model):
+            return REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state["wrote"] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+
+class ReplicaChangelistMixin:
+    """ModelAdmin mixin: changelist pages read from the replica."""
+
+    def changelist_view(self, request, extra_context=None):
+        return use_replica(super().changelist_view)(request, extra_context)
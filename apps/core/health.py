@@ -0,0 +1,109 @@
+"""
+Readiness checks for load balancer and orchestrator probes.
+
+Results are kept in process memory for HEALTH_CHECK_CACHE_SECONDS, so a probe
+hitting every few seconds costs at most one round of checks per interval.
+The migration check loads the migration graph, so once it passes it is never
+repeated: applied migrations don't go away under a running process.
+
+The probe endpoints are public, so a failing check is reported by name only;
+the exception goes to the log.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+CACHE_PROBE_KEY = "core:health_probe"
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_cached = {"expires": 0.0, "result": None, "refreshing": False}
+_migrated = False
+
+
+def check_database():
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+
+
+def check_cache():
+    token = str(time.monotonic())
+    cache.set(CACHE_PROBE_KEY, token, 30)
+    if cache.get(CACHE_PROBE_KEY) != token:
+        raise RuntimeError("Cache did not return the value just written")
+
+
+def check_migrations():
+    global _migrated
+    if _migrated:
+        return
+    connection = connections[DEFAULT_DB_ALIAS]
+    executor = MigrationExecutor(connection)
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    if plan:
+        raise RuntimeError(f"{len(plan)} unapplied migration(s)")
+    _migrated = True
+
+
+CHECKS = {
+    "database": check_database,
+    "cache": check_cache,
+    "migrations": check_migrations,
+}
+
+
+def run_checks():
+    """Run every check; returns (ready, {name: "ok" or "failed"})."""
+    results = {}
+    for name, check in CHECKS.items():
+        try:
+            check()
+        except Exception:
+            # Any error means not ready, whatever the backend raises
+            logger.exception(f"Readiness check {name} failed")
+            results[name] = "failed"
+        else:
+            results[name] = "ok"
+    return all(value == "ok" for value in results.values()), results
+
+
+def readiness():
+    """
+    Cached result of run_checks(). The checks run outside the lock: while one
+    thread refreshes an expired result, the others return the previous one
+    rather than queueing behind a slow database or cache.
+    """
+    with _lock:
+        if _cached["result"] is not None and (
+            time.monotonic() < _cached["expires"] or _cached["refreshing"]
+        ):
+            return _cached["result"]
+        _cached["refreshing"] = True
+    try:
+        result = run_checks()
+    finally:
+        with _lock:
+            _cached["refreshing"] = False
+    with _lock:
+        _cached["result"] = result
+        _cached["expires"] = time.monotonic() + getattr(
+            settings, "HEALTH_CHECK_CACHE_SECONDS", 5
+        )
+    return result
+
+
+def reset():
+    """Forget cached results (used by tests)."""
+    global _migrated
+    with _lock:
+        _cached["result"] = None
+        _cached["refreshing"] = False
+        _migrated = False
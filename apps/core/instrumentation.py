@@ -0,0 +1,245 @@
+"""
+Per-request performance counters.
+
+RequestTracingMiddleware opens a RequestMetrics collector for every request.
+Database time is measured by an execute_wrapper installed on every connection
+as it opens, which reports to the collector of the current context, so the
+queries async views run in worker threads are counted too. Cache lookups and template rendering report to the collector from the
+instrumented cache and template backends configured in settings. Outside a
+request (management commands, background jobs) nothing is collected.
+
+The collector can also watch for N+1 patterns: every statement is reduced to
+a template (placeholders, literals and IN lists collapsed) and counted. When
+a template reaches `repeat_threshold` executions the call stack is captured
+once, so the loop issuing it can be found from the log without paying for a
+stack walk on every query.
+"""
+
+import re
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.template.backends.django import DjangoTemplates
+from django.template.backends.django import Template as DjangoTemplate
+
+_current = ContextVar("request_metrics", default=None)
+_MISSING = object()
+
+_SQL_NORMALIZERS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),
+    (re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+"), "(...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+class RepeatedQueriesError(Exception):
+    """Raised at the end of a request that repeated a query too often."""
+
+
+def normalize_sql(sql):
+    """Reduce a statement to its template so repeats with other values match."""
+    for pattern, replacement in _SQL_NORMALIZERS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def _project_stack(limit=12):
+    """The current call stack, keeping only frames from the project's code."""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame
+        for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(base_dir)
+        and "site-packages" not in frame.filename
+    ]
+    return "".join(traceback.format_list(frames[-limit:]))
+
+
+class RequestMetrics:
+    """Counters for a single request. Times are in milliseconds."""
+
+    def __init__(self, repeat_threshold=None):
+        self.started = time.perf_counter()
+        self.repeat_threshold = repeat_threshold
+        self.query_templates = Counter()
+        self.repeat_stacks = {}
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.db_connects = 0
+        self.db_connect_time = 0.0
+        self.db_connect_errors = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_time = 0.0
+        self._template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Connection execute_wrapper
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_time += (time.perf_counter() - start) * 1000
+            if self.repeat_threshold:
+                self._count_template(sql)
+
+    def _count_template(self, sql):
+        template = normalize_sql(sql)
+        self.query_templates[template] += 1
+        if self.query_templates[template] == self.repeat_threshold:
+            self.repeat_stacks[template] = _project_stack()
+
+    def repeated_queries(self):
+        """(template, count, stack) for templates over the threshold, worst first."""
+        return sorted(
+            (
+                (template, self.query_templates[template], stack)
+                for template, stack in self.repeat_stacks.items()
+            ),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+    @property
+    def total_time(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def as_dict(self):
+        return {
+            "duration_ms": round(self.total_time, 2),
+            "db_queries": self.db_queries,
+            "db_ms": round(self.db_time, 2),
+            "db_connects": self.db_connects,
+            "db_connect_ms": round(self.db_connect_time, 2),
+            "db_connect_errors": self.db_connect_errors,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "template_ms": round(self.template_time, 2),
+        }
+
+    def log_fields(self):
+        """The counters as `key=value` pairs for the response log line."""
+        return " ".join(f"{key}={value}" for key, value in self.as_dict().items())
+
+    def server_timing(self):
+        """Value for the Server-Timing response header."""
+        return ", ".join(
+            [
+                f'db;dur={self.db_time:.1f};desc="{self.db_queries} queries"',
+                f"dbconn;dur={self.db_connect_time:.1f};"
+                f'desc="{self.db_connects} checkouts, {self.db_connect_errors} failed"',
+                f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+                f"tpl;dur={self.template_time:.1f}",
+                f"total;dur={self.total_time:.1f}",
+            ]
+        )
+
+
+def current_metrics():
+    """The collector of the request being served, or None."""
+    return _current.get()
+
+
+@contextmanager
+def collect_metrics(repeat_threshold=None):
+    """
+    Collect metrics for everything run inside the block. With a
+    `repeat_threshold`, also count query templates to detect N+1 patterns.
+    """
+    metrics = RequestMetrics(repeat_threshold)
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created receiver: report the connection's queries."""
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def record_cache_lookup(hit):
+    metrics = _current.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+def record_connection_checkout(seconds, failed=False):
+    """Report a database connection being opened or taken from the pool."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.db_connect_time += seconds * 1000
+        if failed:
+            metrics.db_connect_errors += 1
+        else:
+            metrics.db_connects += 1
+
+
+@contextmanager
+def time_template():
+    """Time a template render; nested renders count towards the outer one."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    metrics._template_depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics._template_depth -= 1
+        if not metrics._template_depth:
+            metrics.template_time += (time.perf_counter() - start) * 1000
+
+
+# ------------- Instrumented backends -------------
+
+
+class InstrumentedCacheMixin:
+    """Counts get() hits and misses; mix in before a cache backend class."""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        record_cache_lookup(value is not _MISSING)
+        return default if value is _MISSING else value
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
+
+
+class InstrumentedTemplate(DjangoTemplate):
+    def render(self, context=None, request=None):
+        with time_template():
+            return super().render(context, request)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates whose templates report render time."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return InstrumentedTemplate(super().get_template(template_name).template, self)
@@ -0,0 +1,192 @@
+"""
+Minimal database-backed background jobs.
+
+Handlers are registered per job kind and receive the BackgroundJob row:
+
+    @register("content.delete_occupations")
+    def delete_occupations(job):
+        ...
+        report_progress(job, processed=n, message="Deleting tasks")
+
+How enqueued jobs are executed is controlled by settings.BACKGROUND_JOBS_MODE:
+
+- "thread": run in a daemon thread once the enqueuing transaction commits
+- "inline": run synchronously once the enqueuing transaction commits
+- "worker": leave the job pending for `manage.py run_jobs`
+
+A runner can die mid-job (a deploy or OOM kill of the web process, say),
+leaving the job RUNNING. report_progress() refreshes the job's heartbeat, and
+recover_stale_jobs() finds running jobs whose heartbeat is older than
+BACKGROUND_JOBS_STALE_SECONDS: the worker requeues them, while in the other
+modes, with no process polling for pending jobs, they are marked failed.
+Handlers must therefore report progress more often than that, and be safe
+to run again from the start.
+"""
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+
+def register(kind):
+    """Decorator registering `func` as the handler for jobs of `kind`."""
+
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+
+    return decorator
+
+
+def enqueue(kind, payload=None, user=None, total=0):
+    """Create a pending job and dispatch it according to BACKGROUND_JOBS_MODE."""
+    if kind not in _handlers:
+        raise ValueError(f"No handler registered for job kind '{kind}'")
+
+    job = BackgroundJob.objects.create(
+        kind=kind,
+        payload=payload or {},
+        created_by=user if user is not None and user.is_authenticated else None,
+        total=total,
+    )
+
+    mode = getattr(settings, "BACKGROUND_JOBS_MODE", "thread")
+    if mode != "worker":
+        recover_stale_jobs()
+    if mode == "inline":
+        transaction.on_commit(lambda: run_job(job.pk))
+    elif mode == "thread":
+        transaction.on_commit(
+            lambda: threading.Thread(
+                target=_run_in_thread, args=(job.pk,), daemon=True
+            ).start()
+        )
+    return job
+
+
+def _run_in_thread(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def claim(job_id):
+    """Atomically move a pending job to running. Returns True if claimed."""
+    now = timezone.now()
+    return bool(
+        BackgroundJob.objects.filter(
+            pk=job_id, status=BackgroundJob.Status.PENDING
+        ).update(
+            status=BackgroundJob.Status.RUNNING, started_at=now, heartbeat_at=now
+        )
+    )
+
+
+def recover_stale_jobs():
+    """
+    Requeue (worker mode) or fail (other modes) running jobs whose heartbeat
+    is older than BACKGROUND_JOBS_STALE_SECONDS. Returns the number recovered.
+    """
+    timeout = getattr(settings, "BACKGROUND_JOBS_STALE_SECONDS", 900)
+    stale = BackgroundJob.objects.alias(
+        last_seen=Coalesce("heartbeat_at", "started_at")
+    ).filter(
+        status=BackgroundJob.Status.RUNNING,
+        last_seen__lt=timezone.now() - timedelta(seconds=timeout),
+    )
+    if getattr(settings, "BACKGROUND_JOBS_MODE", "thread") == "worker":
+        count = stale.update(
+            status=BackgroundJob.Status.PENDING,
+            processed=0,
+            started_at=None,
+            heartbeat_at=None,
+        )
+        action = "requeued"
+    else:
+        count = stale.update(
+            status=BackgroundJob.Status.FAILED,
+            error=f"Interrupted: no progress for {timeout} seconds",
+            finished_at=timezone.now(),
+        )
+        action = "marked failed"
+    if count:
+        logger.warning(f"{count} stale running job(s) {action}")
+    return count
+
+
+def run_job(job_id):
+    """
+    Claim and execute a job. Returns the refreshed job, or None if it was
+    already claimed by another runner.
+    """
+    if not claim(job_id):
+        return None
+
+    job = BackgroundJob.objects.get(pk=job_id)
+    logger.info(f"Job {job.pk} ({job.kind}) started")
+    try:
+        _handlers[job.kind](job)
+    except Exception as e:
+        logger.exception(f"Job {job.pk} ({job.kind}) failed")
+        BackgroundJob.objects.filter(pk=job.pk).update(
+            status=BackgroundJob.Status.FAILED,
+            error=str(e),
+            finished_at=timezone.now(),
+        )
+    else:
+        BackgroundJob.objects.filter(pk=job.pk).update(
+            status=BackgroundJob.Status.SUCCEEDED,
+            finished_at=timezone.now(),
+        )
+        logger.info(f"Job {job.pk} ({job.kind}) finished")
+    job.refresh_from_db()
+    return job
+
+
+def run_pending(limit=None):
+    """Run pending jobs oldest first. Returns the number of jobs executed."""
+    recover_stale_jobs()
+    count = 0
+    while limit is None or count < limit:
+        job_id = (
+            BackgroundJob.objects.filter(status=BackgroundJob.Status.PENDING)
+            .order_by("created_at")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if job_id is None:
+            break
+        if run_job(job_id) is not None:
+            count += 1
+    return count
+
+
+def report_progress(job, processed=0, message=None):
+    """
+    Add `processed` units to the job's progress and optionally replace its
+    status message. Written with UPDATE so concurrent readers see it at once.
+    Also refreshes the job's heartbeat.
+    """
+    updates = {
+        "processed": F("processed") + processed,
+        "heartbeat_at": timezone.now(),
+    }
+    if message is not None:
+        updates["message"] = message[:255]
+    BackgroundJob.objects.filter(pk=job.pk).update(**updates)
+    job.processed += processed
+    if message is not None:
+        job.message = message[:255]
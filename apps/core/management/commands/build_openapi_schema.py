@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from scalar.schema import SCHEMA_STATIC_PATH, generate_schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes the OpenAPI schema to OPENAPI_BUILD_DIR; run before collectstatic "
+        "so it is served as a fingerprinted static file"
+    )
+
+    def handle(self, *args, **options):
+        path = settings.OPENAPI_BUILD_DIR / SCHEMA_STATIC_PATH
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(generate_schema())
+        self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
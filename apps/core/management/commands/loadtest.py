@@ -0,0 +1,122 @@
+"""
+Small HTTP load generator for comparing servers locally.
+
+Usage:
+    python manage.py loadtest http://127.0.0.1:8000/health/
+    python manage.py loadtest http://127.0.0.1:8000/ready/ --requests 5000 --concurrency 32
+
+Run it once against `manage.py runserver` and once against `gunicorn` (same
+port, same MODE and database) to compare throughput and latency. Each client
+thread reuses one keep-alive connection, as a browser or proxy would.
+"""
+
+import http.client
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(ordered, percent):
+    index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = "Sends concurrent requests to a URL and reports throughput and latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", help="URL to request")
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=2000,
+            help="Total number of requests (default: 2000)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=16,
+            help="Number of concurrent clients (default: 16)",
+        )
+
+    def handle(self, *args, **options):
+        url = urlsplit(options["url"])
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise CommandError("URL must be an absolute http(s) URL")
+        path = url.path or "/"
+        if url.query:
+            path = f"{path}?{url.query}"
+        connection_class = (
+            http.client.HTTPSConnection
+            if url.scheme == "https"
+            else http.client.HTTPConnection
+        )
+
+        total = options["requests"]
+        concurrency = max(1, min(options["concurrency"], total))
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+        counter = iter(range(total))
+
+        def client():
+            connection = connection_class(url.hostname, url.port, timeout=30)
+            while True:
+                with lock:
+                    if next(counter, None) is None:
+                        break
+                start = time.perf_counter()
+                try:
+                    connection.request("GET", path)
+                    response = connection.getresponse()
+                    response.read()
+                    ok = response.status < 500
+                    if response.getheader("Connection", "").lower() == "close":
+                        connection.close()
+                except (OSError, http.client.HTTPException) as e:
+                    ok = False
+                    connection.close()
+                    error = e.__class__.__name__
+                else:
+                    error = f"HTTP {response.status}"
+                elapsed = time.perf_counter() - start
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        errors.append(error)
+            connection.close()
+
+        self.stdout.write(
+            f"{total} requests to {options['url']} with {concurrency} clients..."
+        )
+        started = time.perf_counter()
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.perf_counter() - started
+
+        if not latencies:
+            raise CommandError(f"All requests failed: {sorted(set(errors))}")
+        latencies.sort()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Throughput: {len(latencies) / duration:.1f} req/s "
+                f"({len(latencies)} ok, {len(errors)} failed in {duration:.2f}s)"
+            )
+        )
+        self.stdout.write(
+            f"Latency: p50 {_percentile(latencies, 50) * 1000:.1f}ms, "
+            f"p95 {_percentile(latencies, 95) * 1000:.1f}ms, "
+            f"p99 {_percentile(latencies, 99) * 1000:.1f}ms, "
+            f"max {latencies[-1] * 1000:.1f}ms"
+        )
+        if errors:
+            logger.warning(f"Load test errors: {sorted(set(errors))}")
@@ -0,0 +1,123 @@
+"""
+Report the slowest imports of the app's entry points.
+
+Usage:
+    python manage.py profile_imports                       # wsgi and run_jobs
+    python manage.py profile_imports asgi "check --deploy" --top 30
+
+An entry point is `wsgi`, `asgi` (importing the server application, as a
+Gunicorn worker does before forking with preload_app) or a management command
+line. Each runs in a fresh interpreter under `python -X importtime`, so a
+command line is really executed: the default profiles the job worker through
+`help run_jobs`, which loads the command without processing any jobs. The
+report lists the slowest places where one package imports another, with the
+module that did the import: that import is the one to make lazy.
+"""
+
+import shlex
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_ENTRY_POINTS = ["wsgi", "help run_jobs"]
+SERVER_MODULES = {"wsgi": "dhet_app.wsgi", "asgi": "dhet_app.asgi"}
+
+
+def parse_importtime(output):
+    """
+    Parse `-X importtime` output into (module, self_us, cumulative_us, parent)
+    tuples; parent is the module that imported it, None for top-level imports.
+    """
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # the header
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+
+    # Modules are listed after their own imports; walk them parent first
+    imports = []
+    ancestors = []
+    for name, self_us, cumulative_us, depth in reversed(rows):
+        del ancestors[depth:]
+        parent = ancestors[-1] if depth else None
+        imports.append((name, self_us, cumulative_us, parent))
+        ancestors.append(name)
+    imports.reverse()
+    return imports
+
+
+def _package(module):
+    return module.split(".")[0] if module else None
+
+
+def package_imports(imports):
+    """
+    The imports that load a package from another one (boto3 from
+    apps.storage.utils, say): their cumulative time is what making that import
+    lazy would save.
+    """
+    return [row for row in imports if _package(row[0]) != _package(row[3])]
+
+
+class Command(BaseCommand):
+    help = "Reports the slowest imports of the app's entry points"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "entry_points",
+            nargs="*",
+            help='wsgi, asgi or a command line such as "help run_jobs" '
+            f"(default: {', '.join(DEFAULT_ENTRY_POINTS)})",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=20,
+            help="Number of imports to list per entry point (default: 20)",
+        )
+
+    def handle(self, *args, **options):
+        for entry_point in options["entry_points"] or DEFAULT_ENTRY_POINTS:
+            imports = self.profile(entry_point)
+            total = sum(row[2] for row in imports if row[3] is None)
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(
+                    f"{entry_point}: {len(imports)} modules, {total / 1000:.0f}ms"
+                )
+            )
+            slowest = sorted(package_imports(imports), key=lambda row: -row[2])
+            for name, _, cumulative_us, parent in slowest[: options["top"]]:
+                imported_by = f"  (imported by {parent})" if parent else ""
+                self.stdout.write(
+                    f"{cumulative_us / 1000:>9.1f}ms  {name}{imported_by}"
+                )
+            self.stdout.write("")
+
+    def profile(self, entry_point):
+        if entry_point in SERVER_MODULES:
+            command = ["-c", f"import {SERVER_MODULES[entry_point]}"]
+        else:
+            command = ["manage.py", *shlex.split(entry_point)]
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *command],
+            cwd=settings.BASE_DIR,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=False,
+        )
+        if result.returncode:
+            errors = [
+                line
+                for line in result.stderr.splitlines()
+                if not line.startswith("import time:")
+            ]
+            raise CommandError(f"{entry_point} failed:\n" + "\n".join(errors[-10:]))
+        return parse_importtime(result.stderr)
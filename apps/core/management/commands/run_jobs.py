@@ -0,0 +1,53 @@
+"""
+Process pending background jobs.
+
+Usage:
+    python manage.py run_jobs              # Poll for jobs until interrupted
+    python manage.py run_jobs --once       # Drain the queue and exit
+    python manage.py run_jobs --interval 5 # Seconds between polls when idle
+
+Needed when BACKGROUND_JOBS_MODE=worker; in the other modes jobs are started
+by the process that enqueues them.
+"""
+
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.core.jobs import run_pending
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Processes pending background jobs"
+    # The checks import every URLconf and view; the web process runs them
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Exit once the queue is empty"
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait between polls when idle (default: 2)",
+        )
+
+    def handle(self, *args, **options):
+        logger.info("Job worker started")
+        try:
+            while True:
+                close_old_connections()
+                count = run_pending()
+                if count:
+                    logger.info(f"Processed {count} job(s)")
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        logger.info("Job worker stopped")
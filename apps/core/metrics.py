@@ -0,0 +1,369 @@
+"""
+In-process metrics in Prometheus text format.
+
+Each worker process records into its own in-memory registry, which costs a
+few dict updates under an uncontended lock per request. When METRICS_DIR is
+set, every process periodically writes a snapshot to
+`<METRICS_DIR>/<pid>-<random id>.json` (atomically, via rename) and the
+/metrics view merges all snapshots, so a scrape sees the totals of every
+Gunicorn worker no matter which one serves it. The random id keeps a worker
+that reuses an exited worker's pid from overwriting its snapshot.
+
+Counters must never go backwards, so exited workers' numbers are kept: a
+worker folds its final snapshot into `<METRICS_DIR>/aggregate.json` when it
+exits, and a scrape folds in the snapshots of workers that died without doing
+so (their pid no longer runs on this host). Clear the directory when the
+server starts.
+
+Without METRICS_DIR only the serving process's own numbers are reported.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no shared METRICS_DIR locking
+    fcntl = None
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Request latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+METRICS_HELP = {
+    "http_request_duration_seconds": (
+        "histogram",
+        "Request latency by view and method.",
+    ),
+    "http_responses_total": ("counter", "Responses by view and status code."),
+    "db_queries_total": ("counter", "Database queries issued by view."),
+    "db_query_seconds_total": ("counter", "Time spent in database queries by view."),
+    "db_connection_checkouts_total": (
+        "counter",
+        "Database connections opened or taken from the pool.",
+    ),
+    "db_connection_wait_seconds_total": (
+        "counter",
+        "Time spent opening or waiting for database connections.",
+    ),
+    "db_connection_errors_total": (
+        "counter",
+        "Failed database connection checkouts (including pool timeouts).",
+    ),
+    "db_pool_connections": (
+        "gauge",
+        "Connections in this worker's pool, by state.",
+    ),
+    "db_pool_requests_waiting": (
+        "gauge",
+        "Requests waiting for a connection from this worker's pool.",
+    ),
+    "cache_lookups_total": ("counter", "Cache lookups by result."),
+    "template_render_seconds_total": ("counter", "Template render time by view."),
+    "background_jobs": ("gauge", "Background jobs by status."),
+    "background_job_oldest_pending_seconds": (
+        "gauge",
+        "Age of the oldest pending background job.",
+    ),
+}
+
+
+AGGREGATE_FILENAME = "aggregate.json"
+LOCK_FILENAME = ".lock"
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class MetricsRegistry:
+    def __init__(self, flush_interval=5.0):
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._histograms = {}
+        self._last_flush = time.monotonic()
+        self.snapshot_name = f"{os.getpid()}-{uuid.uuid4().hex[:12]}.json"
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            self._counters[(name, _labels_key(labels))] += value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {
+                    "buckets": [0] * len(buckets),
+                    "le": list(buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram["buckets"][i] += 1
+                    break
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def record_request(self, view, method, status, metrics):
+        """Record a finished request from its RequestMetrics collector."""
+        self.observe(
+            "http_request_duration_seconds",
+            metrics.total_time / 1000,
+            view=view,
+            method=method,
+        )
+        self.inc("http_responses_total", view=view, status=str(status))
+        self.inc("db_queries_total", metrics.db_queries, view=view)
+        self.inc("db_query_seconds_total", metrics.db_time / 1000, view=view)
+        self.inc("db_connection_checkouts_total", metrics.db_connects)
+        self.inc("db_connection_wait_seconds_total", metrics.db_connect_time / 1000)
+        self.inc("db_connection_errors_total", metrics.db_connect_errors)
+        self.inc(
+            "template_render_seconds_total", metrics.template_time / 1000, view=view
+        )
+        self.inc("cache_lookups_total", metrics.cache_hits, result="hit")
+        self.inc("cache_lookups_total", metrics.cache_misses, result="miss")
+        self.maybe_flush()
+
+    # ------------- Snapshots -------------
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": [
+                    [name, dict(labels), value]
+                    for (name, labels), value in self._counters.items()
+                ],
+                "histograms": [
+                    [name, dict(labels), {**h, "buckets": list(h["buckets"])}]
+                    for (name, labels), h in self._histograms.items()
+                ],
+            }
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write this process's snapshot to METRICS_DIR, if configured."""
+        self._last_flush = time.monotonic()
+        directory = getattr(settings, "METRICS_DIR", "")
+        if not directory:
+            return
+        path = os.path.join(directory, self.snapshot_name)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            _write_json(path, self.snapshot())
+        except OSError:
+            logger.exception(f"Could not write metrics snapshot to {path}")
+
+    def retire(self):
+        """Fold this process's final numbers into the aggregate snapshot."""
+        directory = getattr(settings, "METRICS_DIR", "")
+        if not directory:
+            return
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with _locked(directory):
+                _fold(directory, [self.snapshot()], [self.snapshot_name])
+        except OSError:
+            logger.exception(f"Could not fold metrics snapshot into {directory}")
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def _after_fork(self):
+        # A worker forked from a preloaded master starts its own snapshot
+        self._lock = threading.Lock()
+        self.reset()
+        self.snapshot_name = f"{os.getpid()}-{uuid.uuid4().hex[:12]}.json"
+
+
+registry = MetricsRegistry()
+atexit.register(registry.retire)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=registry._after_fork)
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None  # Worker mid-write or gone
+
+
+@contextmanager
+def _locked(directory):
+    """Serialize changes to the aggregate snapshot between processes."""
+    with open(os.path.join(directory, LOCK_FILENAME), "w") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def _fold(directory, snapshots, filenames):
+    """Add `snapshots` to the aggregate and remove the files they came from."""
+    aggregate_path = os.path.join(directory, AGGREGATE_FILENAME)
+    aggregate = _read_json(aggregate_path)
+    if aggregate is not None:
+        snapshots = [aggregate, *snapshots]
+    _write_json(aggregate_path, _to_snapshot(*merge_snapshots(snapshots)))
+    for filename in filenames:
+        try:
+            os.remove(os.path.join(directory, filename))
+        except FileNotFoundError:
+            pass
+
+
+def _pid_running(filename):
+    try:
+        pid = int(filename.split("-")[0].removesuffix(".json"))
+    except ValueError:
+        return True  # Not a worker snapshot; leave it alone
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # Running, as another user
+    return True
+
+
+def collect_snapshots():
+    """
+    Snapshots of every worker: files in METRICS_DIR plus our live state.
+    Snapshots of workers that died without retiring are folded into the
+    aggregate on the way.
+    """
+    snapshots = [registry.snapshot()]
+    directory = getattr(settings, "METRICS_DIR", "")
+    if not directory or not os.path.isdir(directory):
+        return snapshots
+    with _locked(directory):
+        dead = []
+        for filename in os.listdir(directory):
+            if not filename.endswith(".json") or filename == registry.snapshot_name:
+                continue
+            snapshot = _read_json(os.path.join(directory, filename))
+            if snapshot is None:
+                continue
+            if filename != AGGREGATE_FILENAME and not _pid_running(filename):
+                dead.append((filename, snapshot))
+            snapshots.append(snapshot)
+        if dead:
+            _fold(
+                directory,
+                [snapshot for _, snapshot in dead],
+                [filename for filename, _ in dead],
+            )
+    return snapshots
+
+
+def merge_snapshots(snapshots):
+    counters = defaultdict(float)
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot["counters"]:
+            counters[(name, _labels_key(labels))] += value
+        for name, labels, h in snapshot["histograms"]:
+            key = (name, _labels_key(labels))
+            merged = histograms.setdefault(
+                key,
+                {"le": h["le"], "buckets": [0] * len(h["le"]), "sum": 0.0, "count": 0},
+            )
+            merged["buckets"] = [
+                a + b for a, b in zip(merged["buckets"], h["buckets"])
+            ]
+            merged["sum"] += h["sum"]
+            merged["count"] += h["count"]
+    return counters, histograms
+
+
+def _to_snapshot(counters, histograms):
+    """Inverse of merge_snapshots() for a single merged snapshot."""
+    return {
+        "counters": [
+            [name, dict(labels), value] for (name, labels), value in counters.items()
+        ],
+        "histograms": [
+            [name, dict(labels), h] for (name, labels), h in histograms.items()
+        ],
+    }
+
+
+# ------------- Exposition -------------
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _format_value(value):
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+def render_metrics(gauges=()):
+    """
+    Prometheus text exposition of all workers' metrics plus `gauges`, an
+    iterable of (name, labels dict, value) computed at scrape time.
+    """
+    counters, histograms = merge_snapshots(collect_snapshots())
+    samples = defaultdict(list)
+    for (name, labels), value in sorted(counters.items()):
+        samples[name].append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    for (name, labels), h in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(h["le"], h["buckets"]):
+            cumulative += count
+            samples[name].append(
+                f"{name}_bucket{_format_labels(labels, le=bound)} {cumulative}"
+            )
+        samples[name].append(
+            f'{name}_bucket{_format_labels(labels, le="+Inf")} {h["count"]}'
+        )
+        samples[name].append(f"{name}_sum{_format_labels(labels)} {h['sum']!r}")
+        samples[name].append(f"{name}_count{_format_labels(labels)} {h['count']}")
+    for name, labels, value in gauges:
+        samples[name].append(
+            f"{name}{_format_labels(_labels_key(labels))} {_format_value(value)}"
+        )
+
+    lines = []
+    for name, metric_samples in samples.items():
+        kind, help_text = METRICS_HELP.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(metric_samples)
+    return "\n".join(lines) + "\n"
@@ -1,15 +1,109 @@
 import logging
-import time
+import random
 import uuid
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
 from django.urls import reverse
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import health
+from .db import replica
+from .instrumentation import RepeatedQueriesError, collect_metrics
+from .metrics import registry
 
 logger = logging.getLogger(__name__)
 
 
-class RequestTracingMiddleware:
+class AsyncCapableMiddleware:
+    """
+    Base for middleware that runs natively under both WSGI and ASGI, so async
+    views aren't pushed back onto a thread. Subclasses check `async_mode` in
+    __call__ and return self.__acall__(request) when it is set.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+
+class HealthCheckMiddleware(AsyncCapableMiddleware):
+    """
+    Answers probes before any other middleware runs, so they skip sessions,
+    auth, host validation and tracing.
+
+    - /health/: liveness; the process is up and serving requests
+    - /ready/: readiness; database, cache and migrations checked (cached for
+      HEALTH_CHECK_CACHE_SECONDS), 503 if any check fails
+    """
+
+    LIVENESS_PATH = "/health/"
+    READINESS_PATH = "/ready/"
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if request.path == self.LIVENESS_PATH:
+            return self.liveness()
+        if request.path == self.READINESS_PATH:
+            return self.readiness(*health.readiness())
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if request.path == self.LIVENESS_PATH:
+            return self.liveness()
+        if request.path == self.READINESS_PATH:
+            return self.readiness(*await sync_to_async(health.readiness)())
+        return await self.get_response(request)
+
+    def liveness(self):
+        return HttpResponse("ok", content_type="text/plain")
+
+    def readiness(self, ready, checks):
+        return JsonResponse(
+            {"status": "ok" if ready else "unavailable", "checks": checks},
+            status=200 if ready else 503,
+        )
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise, able to pass requests for anything but static files on to an
+    async handler without switching to a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+class RequestTracingMiddleware(AsyncCapableMiddleware):
     """
     Middleware that adds request tracing with useful tags.
 
@@ -17,35 +111,52 @@ class RequestTracingMiddleware:
     - request_id: Unique identifier for each request
     - user: Username or email of authenticated user
     - mode: Application mode (development/testing/production)
-    - Logs request/response details with timing
+    - Logs request/response details with timing, query count, DB time, cache
+      hits/misses and template render time (also sent as Server-Timing)
+    - Warns about N+1 patterns: SQL templates repeated NPLUSONE_THRESHOLD
+      times in one request, on a NPLUSONE_SAMPLE_RATE share of requests
+    - Records latency, status and query counters in the /metrics registry
     """
 
     def __init__(self, get_response):
-        self.get_response = get_response
+        super().__init__(get_response)
         self.mode = getattr(settings, "MODE", "development")
+        self.server_timing = getattr(settings, "SERVER_TIMING_ENABLED", True)
 
     def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        extra = self._start(request, getattr(request, "user", None))
+        # Process request, counting queries, cache lookups and render time
+        with collect_metrics(self._repeat_threshold()) as metrics:
+            response = self.get_response(request)
+        return self._finish(request, response, metrics, extra)
+
+    async def __acall__(self, request):
+        user = await request.auser() if hasattr(request, "auser") else None
+        extra = self._start(request, user)
+        with collect_metrics(self._repeat_threshold()) as metrics:
+            response = await self.get_response(request)
+        return self._finish(request, response, metrics, extra)
+
+    def _start(self, request, user):
+        """Tag the request and log it; returns the log `extra` for the request."""
         # Generate unique request ID
         request_id = str(uuid.uuid4())[:8]
         request.request_id = request_id
 
         # Get user info
-        user = "anonymous"
-        if hasattr(request, "user") and request.user.is_authenticated:
-            user = (
-                request.user.email
-                if hasattr(request.user, "email") and request.user.email
-                else str(request.user)
+        identifier = "anonymous"
+        if user is not None and user.is_authenticated:
+            identifier = (
+                user.email if hasattr(user, "email") and user.email else str(user)
             )
-        request.user_identifier = user
-
-        # Start timing
-        start_time = time.time()
+        request.user_identifier = identifier
 
         # Log incoming request
         extra = {
             "request_id": request_id,
-            "user": user,
+            "user": identifier,
             "mode": self.mode,
         }
 
@@ -57,15 +168,24 @@ class RequestTracingMiddleware:
             )
             if request.GET:
                 logger.debug(f"Query params: {dict(request.GET)}", extra=extra)
+        return extra
 
-        # Process request
-        response = self.get_response(request)
-
-        # Calculate duration
-        duration_ms = (time.time() - start_time) * 1000
+    def _finish(self, request, response, metrics, extra):
+        """Report the request's metrics and tag the response."""
+        duration_ms = metrics.total_time
+        extra.update(metrics.as_dict())
+        match = request.resolver_match
+        registry.record_request(
+            (match.view_name or match.route) if match else "<unresolved>",
+            request.method,
+            response.status_code,
+            metrics,
+        )
 
         # Add request_id to response headers
-        response["X-Request-ID"] = request_id
+        response["X-Request-ID"] = request.request_id
+        if self.server_timing:
+            response["Server-Timing"] = metrics.server_timing()
 
         # Log response
         log_level = logging.INFO
@@ -76,7 +196,7 @@ class RequestTracingMiddleware:
 
         logger.log(
             log_level,
-            f"[RESPONSE] {request.method} {request.path} - {response.status_code} ({duration_ms:.2f}ms)",
+            f"[RESPONSE] {request.method} {request.path} - {response.status_code} ({duration_ms:.2f}ms) {metrics.log_fields()}",
             extra=extra,
         )
 
@@ -87,8 +207,38 @@ class RequestTracingMiddleware:
                 extra=extra,
             )
 
+        self._report_repeated_queries(request, metrics, extra)
         return response
 
+    def _repeat_threshold(self):
+        """N+1 threshold for this request, or None if it isn't sampled."""
+        threshold = getattr(settings, "NPLUSONE_THRESHOLD", 0)
+        rate = getattr(settings, "NPLUSONE_SAMPLE_RATE", 1.0)
+        if threshold and random.random() < rate:
+            return threshold
+        return None
+
+    def _report_repeated_queries(self, request, metrics, extra):
+        offenders = metrics.repeated_queries()
+        if not offenders:
+            return
+
+        match = request.resolver_match
+        view = (
+            f"{match.func.__module__}.{match.func.__qualname__}"
+            if match
+            else request.path
+        )
+        template, count, stack = offenders[0]
+        message = (
+            f"[N+1] {request.method} {request.path} ({view}) repeated "
+            f"{len(offenders)} query template(s); worst ran {count}x: "
+            f"{template[:500]}\n{stack}"
+        )
+        logger.warning(message, extra=extra)
+        if getattr(settings, "NPLUSONE_RAISE", False):
+            raise RepeatedQueriesError(message)
+
     def process_exception(self, request, exception):
         """Log exceptions with request context"""
         request_id = getattr(request, "request_id", "unknown")
@@ -107,26 +257,64 @@ class RequestTracingMiddleware:
         )
 
 
-class RestrictedAdminMiddleware:
+class ReplicaPinMiddleware(AsyncCapableMiddleware):
+    """
+    Read-your-writes for the read replica: after a request that may have
+    written (any method but GET, HEAD and OPTIONS), sets a cookie that makes
+    use_replica views read from the primary for REPLICA_STICKY_SECONDS, until
+    replication has caught up with the change.
+    """
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.pin(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.pin(request, await self.get_response(request))
+
+    def pin(self, request, response):
+        if (
+            request.method not in replica.SAFE_METHODS
+            and replica.replica_configured()
+        ):
+            response.set_cookie(
+                replica.PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class RestrictedAdminMiddleware(AsyncCapableMiddleware):
     """
     Middleware that restricts access to the admin panel to staff users only.
     Authenticated non-staff users attempting to access /admin/ will be shown a 403 page.
     """
 
-    def __init__(self, get_response):
-        self.get_response = get_response
-
     def __call__(self, request):
-        if request.path.startswith("/admin/"):
-            # Allow login page through (which we overrode, but just in case)
-            if request.path == "/admin/login/":
-                return self.get_response(request)
+        if self.async_mode:
+            return self.__acall__(request)
+        if self._restricted(request) and self._denied(request.user):
+            from apps.core.views_errors import access_denied
 
-            # If user is authenticated but not staff, show 403
-            if request.user.is_authenticated and not request.user.is_staff:
-                from apps.core.views_errors import access_denied
+            return access_denied(request)
+        return self.get_response(request)
 
-                return access_denied(request)
+    async def __acall__(self, request):
+        if self._restricted(request) and self._denied(await request.auser()):
+            from apps.core.views_errors import access_denied
 
-        response = self.get_response(request)
-        return response
+            return await sync_to_async(access_denied)(request)
+        return await self.get_response(request)
+
+    def _restricted(self, request):
+        # Allow login page through (which we overrode, but just in case)
+        return request.path.startswith("/admin/") and request.path != "/admin/login/"
+
+    def _denied(self, user):
+        # If user is authenticated but not staff, show 403
+        return user.is_authenticated and not user.is_staff
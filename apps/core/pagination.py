@@ -0,0 +1,41 @@
+"""
+Pagination for async views.
+
+Paginator counts and slices querysets synchronously; `apaginate` runs the
+count and the page query through the async ORM, side by side, and returns a
+regular Page so templates don't change.
+"""
+
+import asyncio
+
+from django.core.paginator import Page, Paginator
+
+
+async def _afetch(queryset, number, per_page):
+    bottom = (number - 1) * per_page
+    return [obj async for obj in queryset[bottom : bottom + per_page]]
+
+
+async def apaginate(queryset, per_page, number):
+    """
+    Async Paginator(queryset, per_page).get_page(number): invalid numbers give
+    the first page, numbers past the end the last one.
+    """
+    paginator = Paginator(queryset, per_page)
+    try:
+        number = int(number)
+    except (TypeError, ValueError):
+        number = 1
+    if number >= 1:
+        # Fetch the page without waiting for the count; in range is the norm
+        count, rows = await asyncio.gather(
+            queryset.acount(), _afetch(queryset, number, per_page)
+        )
+    else:
+        count, rows = await queryset.acount(), None
+
+    paginator.count = count
+    if number < 1 or number > paginator.num_pages:
+        number = paginator.num_pages
+        rows = await _afetch(queryset, number, per_page)
+    return Page(rows, number, paginator)
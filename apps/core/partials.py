@@ -0,0 +1,162 @@
+"""
+Response cache for views that serve HTMX partials.
+
+`cache_partial` caches a view's GET responses. A URL can answer with a
+partial or a full page depending on the HX-Request header, so the cache key
+varies on:
+
+- HX-Request, which the response also lists in its Vary header
+- the user's role
+- the view's version stamp (`version`, e.g. the catalog version)
+- for `per_user` views: the user, the user's partials version and their CSRF
+  secret, so forms rendered for one browser are never served to another
+
+Per-user partials show the user's own records. Save and delete signals of
+those models call bump_user_partials(user_id) to invalidate them all.
+
+Responses are never cached if they are not a plain 200, if they show or add
+flash messages, or if they are shared (not `per_user`) and embed a CSRF token.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from .context_processors import resolve_role
+
+PARTIAL_CACHE_TIMEOUT = 60 * 10
+USER_PARTIALS_VERSION_KEY = "core:user_partials_version:{}"
+
+
+def _set_user_partials_version(user_id):
+    version = time.time_ns() // 1000
+    cache.set(USER_PARTIALS_VERSION_KEY.format(user_id), version, None)
+    return version
+
+
+def get_user_partials_version(user_id):
+    version = cache.get(USER_PARTIALS_VERSION_KEY.format(user_id))
+    if version is None:
+        version = _set_user_partials_version(user_id)
+    return version
+
+
+def bump_user_partials(user_id):
+    """Invalidate every cached per-user partial of this user."""
+    _set_user_partials_version(user_id)
+    # Bump again on commit: a concurrent request may have cached the
+    # pre-commit state under the first stamp
+    transaction.on_commit(lambda: _set_user_partials_version(user_id))
+
+
+def _digest(value):
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+class PartialCache:
+    def __init__(self, name, timeout, per_user, version):
+        self.name = name
+        self.timeout = timeout
+        self.per_user = per_user
+        self.version = version
+
+    def key(self, request):
+        """Cache key for the request, or None if it must not be cached."""
+        if request.method not in ("GET", "HEAD") or len(get_messages(request)):
+            return None
+        user = request.user
+        parts = [
+            self.name,
+            self.version() if self.version else "",
+            "partial" if request.headers.get("HX-Request") else "page",
+            resolve_role(user),
+        ]
+        if self.per_user:
+            parts += [
+                user.pk,
+                get_user_partials_version(user.pk),
+                _digest(request.META.get("CSRF_COOKIE", ""))[:12],
+            ]
+        parts.append(_digest(request.get_full_path()))
+        return "core:partial:" + ":".join(str(part) for part in parts)
+
+    def lookup(self, request):
+        """(key, cached response or None, CSRF state before the view)."""
+        key = self.key(request)
+        if key is None:
+            return None, None, None
+        csrf = (
+            request.META.get("CSRF_COOKIE"),
+            request.META.get("CSRF_COOKIE_NEEDS_UPDATE", False),
+        )
+        return key, cache.get(key), csrf
+
+    def store(self, request, key, response, csrf):
+        if (
+            response.status_code != 200
+            or response.streaming
+            or response.cookies
+            or getattr(get_messages(request), "added_new", False)
+        ):
+            return
+        secret, token_used = csrf
+        if request.META.get("CSRF_COOKIE") != secret:
+            # A new CSRF secret was issued while rendering
+            return
+        if not self.per_user and (
+            request.META.get("CSRF_COOKIE_NEEDS_UPDATE", False) != token_used
+        ):
+            # Embeds this browser's CSRF token
+            return
+        cache.set(key, response, self.timeout)
+
+    def finish(self, response):
+        patch_vary_headers(response, ("HX-Request",))
+        if self.per_user:
+            patch_cache_control(response, private=True)
+        return response
+
+
+def cache_partial(name, timeout=PARTIAL_CACHE_TIMEOUT, per_user=False, version=None):
+    """
+    Cache a view's GET responses (see the module docstring). `version` is a
+    callable returning the view's current version stamp, such as
+    get_catalog_version. Works with sync and async views.
+    """
+
+    def decorator(view_func):
+        partials = PartialCache(name, timeout, per_user, version)
+
+        if iscoroutinefunction(view_func):
+
+            @wraps(view_func)
+            async def wrapper(request, *args, **kwargs):
+                key, response, csrf = await sync_to_async(partials.lookup)(request)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                    if key is not None:
+                        await sync_to_async(partials.store)(
+                            request, key, response, csrf
+                        )
+                return partials.finish(response)
+
+        else:
+
+            @wraps(view_func)
+            def wrapper(request, *args, **kwargs):
+                key, response, csrf = partials.lookup(request)
+                if response is None:
+                    response = view_func(request, *args, **kwargs)
+                    if key is not None:
+                        partials.store(request, key, response, csrf)
+                return partials.finish(response)
+
+        return wrapper
+
+    return decorator
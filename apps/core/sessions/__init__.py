@@ -0,0 +1,62 @@
+"""
+Session engines that skip writes when nothing changed.
+
+Django saves a session whenever a value is assigned, even if it is equal to
+the stored one, so views that refresh flags on every request (onboarding
+state, cached roles) rewrite the session each time. The stores here remember
+a fingerprint of the session key and data when the session loads, and only
+report the session modified if the fingerprint differs at the end of the
+request. Values changed in place and assigned back (a dict in the session,
+say) therefore still save.
+
+Pick one with SESSION_STRATEGY:
+
+- "cached_db": read through the cache, write to the database (default)
+- "db": database only
+- "cache": cache only; sessions are lost if the cache is cleared
+- "signed_cookies": the whole session in a signed cookie, no server storage
+"""
+
+import hashlib
+
+SESSION_ENGINES = {
+    "cached_db": "apps.core.sessions.cached_db",
+    "db": "apps.core.sessions.db",
+    "cache": "apps.core.sessions.cache",
+    "signed_cookies": "apps.core.sessions.signed_cookies",
+}
+
+
+class CoalescingSessionMixin:
+    """Mix in before a SessionStore so unchanged sessions don't save."""
+
+    def _fingerprint(self):
+        data = self.serializer().dumps(self._session_cache)
+        return hashlib.md5(f"{self.session_key}:".encode() + data).hexdigest()
+
+    def _get_session(self, no_load=False):
+        loaded = hasattr(self, "_session_cache")
+        session = super()._get_session(no_load)
+        if not loaded:
+            self._snapshot = self._fingerprint()
+        return session
+
+    _session = property(_get_session)
+
+    async def _aget_session(self, no_load=False):
+        loaded = hasattr(self, "_session_cache")
+        session = await super()._aget_session(no_load)
+        if not loaded:
+            self._snapshot = self._fingerprint()
+        return session
+
+    @property
+    def modified(self):
+        # SessionMiddleware only saves (and resends the cookie) when True
+        if not self._modified or not hasattr(self, "_session_cache"):
+            return self._modified
+        return self._fingerprint() != getattr(self, "_snapshot", None)
+
+    @modified.setter
+    def modified(self, value):
+        self._modified = value
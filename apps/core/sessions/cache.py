@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends.cache import SessionStore as BaseSessionStore
+
+from . import CoalescingSessionMixin
+
+
+class SessionStore(CoalescingSessionMixin, BaseSessionStore):
+    pass
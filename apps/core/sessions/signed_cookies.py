@@ -0,0 +1,9 @@
+from django.contrib.sessions.backends.signed_cookies import (
+    SessionStore as BaseSessionStore,
+)
+
+from . import CoalescingSessionMixin
+
+
+class SessionStore(CoalescingSessionMixin, BaseSessionStore):
+    pass
@@ -1,3 +1,810 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.test import (
+    Client,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.content.models import Occupation, OccupationTask, Skill
+
+from . import health, jobs
+from .cache import TieredCache, cache_config
+from .db.replica import PIN_COOKIE, ReplicaRouter, use_replica
+from .instrumentation import (
+    RepeatedQueriesError,
+    collect_metrics,
+    normalize_sql,
+    record_connection_checkout,
+)
+from .metrics import MetricsRegistry, registry
+from .middleware import ReplicaPinMiddleware, RequestTracingMiddleware
+from .models import BackgroundJob
+from .pagination import apaginate
+from .partials import bump_user_partials, cache_partial
+from .sessions.db import SessionStore as DbSessionStore
+
+User = get_user_model()
+
+# Full pages reference static assets; skip the collectstatic manifest in tests
+STATIC_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+    },
+}
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class OccupationDetailViewTests(TestCase):
+    """Tests for the occupation detail page"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@app.local", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+        skill = Skill.objects.create(name="Python")
+        self.developer = Occupation.objects.create(ofo_code="1", ofo_title="Developer")
+        self.analyst = Occupation.objects.create(ofo_code="2", ofo_title="Data Analyst")
+        for occupation in (self.developer, self.analyst):
+            task = OccupationTask.objects.create(occupation=occupation, title="Code")
+            task.skills.add(skill)
+
+    def test_detail_shows_related_occupations(self):
+        """Test that related occupations computed by the job are listed"""
+        from apps.core.jobs import run_pending
+
+        run_pending()
+        response = self.client.get(
+            reverse("occupation-detail", args=[self.developer.id])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Related Occupations")
+        self.assertContains(response, "Data Analyst")
+
+    def test_detail_task_list_served_from_fragment_cache(self):
+        """Test that tasks are cached until the occupation's tasks change"""
+        url = reverse("occupation-detail", args=[self.developer.id])
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertContains(response, "Tasks and Responsibilities")
+        self.assertFalse(
+            any('"content_occupationtask"' in q["sql"] for q in queries.captured_queries)
+        )
+
+        OccupationTask.objects.create(occupation=self.developer, title="Deploy")
+        self.assertContains(self.client.get(url), "Deploy")
+
+    def test_repeat_visit_not_modified(self):
+        """Test that an unchanged page is answered with 304 without its queries"""
+        from django.utils import timezone
+
+        from apps.candidates.models import CandidateProfile
+
+        url = reverse("occupation-detail", args=[self.developer.id])
+        # The first visit issues the CSRF cookie, so it has no validators
+        self.assertFalse(self.client.get(url).has_header("ETag"))
+        etag = self.client.get(url)["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([q for q in queries if "content_occupation" in q["sql"]])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, HTTP_HX_REQUEST="true")
+        self.assertEqual(response.status_code, 200)
+
+        # Recomputed candidate stats change the page, even without signals
+        CandidateProfile.objects.create(user=self.user)
+        etag = self.client.get(url)["ETag"]
+        CandidateProfile.objects.update(stats_last_computed=timezone.now())
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class AsyncCatalogViewTests(TestCase):
+    """Tests for the async catalog views"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="async", password="testpass123")
+        for number in range(12):
+            Occupation.objects.create(
+                ofo_code=f"{number:02}", ofo_title=f"Occupation {number:02}"
+            )
+
+    async def test_catalog_pages_under_asgi(self):
+        """Test that the list, detail and task search pages render via ASGI"""
+        await self.async_client.aforce_login(self.user)
+        occupation = await Occupation.objects.aget(ofo_code="03")
+
+        response = await self.async_client.get(reverse("occupations"), {"q": "03"})
+        self.assertContains(response, "Occupation 03")
+        self.assertNotIn('db;dur=0.0;desc="0 queries"', response["Server-Timing"])
+        response = await self.async_client.get(
+            reverse("occupation-detail", args=[occupation.id])
+        )
+        self.assertContains(response, "Occupation 03")
+        response = await self.async_client.get(reverse("task-list-partial"))
+        self.assertEqual(response.status_code, 200)
+
+    async def test_apaginate_matches_get_page(self):
+        """Test that apaginate clamps page numbers like Paginator.get_page"""
+        occupations = Occupation.objects.order_by("ofo_code")
+        page = await apaginate(occupations, 5, "2")
+        self.assertEqual([o.ofo_code for o in page], ["05", "06", "07", "08", "09"])
+        self.assertTrue(page.has_next())
+
+        for number in ("99", "0"):
+            page = await apaginate(occupations, 5, number)
+            self.assertEqual((page.number, len(page)), (3, 2))
+        page = await apaginate(occupations, 5, "x")
+        self.assertEqual(page.number, 1)
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class RequestTracingTests(TestCase):
+    """Tests for the per-request metrics in RequestTracingMiddleware"""
+
+    def setUp(self):
+        User.objects.create_user(username="tracer", password="testpass123")
+        self.client.login(username="tracer", password="testpass123")
+
+    def test_server_timing_header(self):
+        """Test that responses report DB, cache and template timings"""
+        response = self.client.get(reverse("occupations"))
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn("cache;desc=", timing)
+        self.assertRegex(timing, r"tpl;dur=[\d.]+")
+        self.assertNotIn("tpl;dur=0.0,", timing)
+        self.assertRegex(timing, r"total;dur=[\d.]+")
+
+    @override_settings(SERVER_TIMING_ENABLED=False)
+    def test_server_timing_can_be_disabled(self):
+        """Test that SERVER_TIMING_ENABLED=False omits the header"""
+        response = self.client.get(reverse("occupations"))
+        self.assertNotIn("Server-Timing", response)
+
+    def test_collects_queries_and_cache_lookups(self):
+        """Test that the collector counts queries, hits and misses"""
+        cache.set("tracing-test", 1)
+        with collect_metrics() as metrics:
+            list(Occupation.objects.all())
+            cache.get("tracing-test")
+            cache.get("tracing-test-missing")
+        self.assertEqual(metrics.db_queries, 1)
+        self.assertEqual((metrics.cache_hits, metrics.cache_misses), (1, 1))
+
+    def test_collects_connection_checkouts(self):
+        """Test that connection checkouts and failures reach the collector"""
+        with collect_metrics() as metrics:
+            record_connection_checkout(0.004)
+            record_connection_checkout(1.0, failed=True)
+        self.assertEqual((metrics.db_connects, metrics.db_connect_errors), (1, 1))
+        self.assertAlmostEqual(metrics.db_connect_time, 1004.0)
+        self.assertIn(
+            'dbconn;dur=1004.0;desc="1 checkouts, 1 failed"', metrics.server_timing()
+        )
+
+
+def n_plus_one_view(request):
+    for occupation in Occupation.objects.all():
+        list(occupation.tasks.all())
+    return HttpResponse("ok")
+
+
+@override_settings(NPLUSONE_THRESHOLD=3, NPLUSONE_SAMPLE_RATE=1.0)
+class RepeatedQueryDetectionTests(TestCase):
+    """Tests for N+1 detection in RequestTracingMiddleware"""
+
+    def setUp(self):
+        for code in range(4):
+            Occupation.objects.create(
+                ofo_code=str(code), ofo_title=f"Occupation {code}"
+            )
+        self.middleware = RequestTracingMiddleware(n_plus_one_view)
+        self.request = RequestFactory().get("/occupations/")
+
+    def test_normalize_sql(self):
+        """Test that statements differing only in values share a template"""
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id IN (%s, %s) AND n = 5"),
+            normalize_sql("SELECT * FROM t WHERE id IN (%s)  AND n = 12"),
+        )
+
+    @override_settings(NPLUSONE_RAISE=True)
+    def test_repeated_queries_fail_in_testing(self):
+        """Test that a repeated query raises with the offending stack"""
+        with self.assertRaises(RepeatedQueriesError) as raised:
+            self.middleware(self.request)
+        self.assertIn("worst ran 4x", str(raised.exception))
+        self.assertIn("n_plus_one_view", str(raised.exception))
+
+    @override_settings(NPLUSONE_RAISE=False)
+    def test_repeated_queries_logged(self):
+        """Test that a repeated query logs a warning with the request id"""
+        with self.assertLogs("apps.core.middleware", "WARNING") as logs:
+            response = self.middleware(self.request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(logs.records[0].request_id, self.request.request_id)
+        self.assertIn("[N+1]", logs.output[0])
+
+    @override_settings(NPLUSONE_RAISE=True, NPLUSONE_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_not_checked(self):
+        """Test that requests outside the sample rate are not checked"""
+        response = self.middleware(self.request)
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(STORAGES=STATIC_STORAGES, METRICS_TOKEN="scrape-token")
+class MetricsEndpointTests(TestCase):
+    """Tests for the Prometheus /metrics endpoint"""
+
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+        self.auth = {"HTTP_AUTHORIZATION": "Bearer scrape-token"}
+
+    def test_requires_token(self):
+        """Test that scrapes without the bearer token are refused"""
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+
+    def test_reports_request_metrics(self):
+        """Test that requests are reported as histograms and counters"""
+        self.client.get(reverse("home"))
+        body = self.client.get(reverse("metrics"), **self.auth).content.decode()
+        self.assertIn("# TYPE http_request_duration_seconds histogram", body)
+        self.assertIn(
+            'http_request_duration_seconds_count{method="GET",view="home"} 1', body
+        )
+        self.assertIn('http_responses_total{status="302",view="home"} 1', body)
+        self.assertIn('background_jobs{status="pending"} 0', body)
+
+    def test_merges_worker_snapshots(self):
+        """Test that snapshots written by other workers are added in"""
+        other = MetricsRegistry()
+        other.inc("db_queries_total", 5, view="home")
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "999999.json"), "w") as f:
+                json.dump(other.snapshot(), f)
+            registry.inc("db_queries_total", 2, view="home")
+            with self.settings(METRICS_DIR=directory):
+                body = self.client.get(reverse("metrics"), **self.auth).content
+        self.assertIn(b'db_queries_total{view="home"} 7', body)
+
+
+    def test_exited_workers_are_kept(self):
+        """Test that exited workers' counters move into the aggregate snapshot"""
+        import subprocess
+        import sys
+
+        dead_pid = subprocess.run(
+            [sys.executable, "-c", "import os; print(os.getpid())"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        crashed = MetricsRegistry()
+        crashed.inc("db_queries_total", 5, view="home")
+        retired = MetricsRegistry()
+        retired.inc("db_queries_total", 3, view="home")
+        registry.inc("db_queries_total", 2, view="home")
+        with (
+            tempfile.TemporaryDirectory() as directory,
+            self.settings(METRICS_DIR=directory),
+        ):
+            with open(os.path.join(directory, f"{dead_pid}-crashed.json"), "w") as f:
+                json.dump(crashed.snapshot(), f)
+            retired.flush()
+            retired.retire()
+            for _ in range(2):
+                body = self.client.get(reverse("metrics"), **self.auth).content
+                self.assertIn(b'db_queries_total{view="home"} 10', body)
+            self.assertEqual(sorted(os.listdir(directory)), [".lock", "aggregate.json"])
+
+
+class HealthCheckTests(TestCase):
+    """Tests for the liveness and readiness probes"""
+
+    def setUp(self):
+        health.reset()
+        self.addCleanup(health.reset)
+
+    def test_liveness_skips_the_stack(self):
+        """Test that /health/ answers without queries or session cookies"""
+        with self.assertNumQueries(0):
+            response = self.client.get("/health/", HTTP_HOST="10.0.0.5")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Request-ID", response)
+
+    def test_readiness_checks(self):
+        """Test that /ready/ reports each check and caches the result"""
+        response = self.client.get("/ready/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["checks"],
+            {"database": "ok", "cache": "ok", "migrations": "ok"},
+        )
+        with self.assertNumQueries(0):
+            self.client.get("/ready/")
+
+    def test_readiness_fails_when_a_check_fails(self):
+        """Test that a failing check makes /ready/ return 503"""
+
+        def broken():
+            raise RuntimeError("down")
+
+        with (
+            mock.patch.dict(health.CHECKS, {"cache": broken}),
+            self.assertLogs("apps.core.health", "ERROR") as logs,
+        ):
+            response = self.client.get("/ready/")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["checks"]["cache"], "failed")
+        self.assertNotIn(b"down", response.content)
+        self.assertIn("RuntimeError: down", logs.output[0])
+
+    def test_checks_run_outside_the_lock(self):
+        """Test that concurrent probes don't queue behind a slow check"""
+        held = []
+
+        def probe():
+            held.append(health._lock.locked())
+
+        with mock.patch.dict(health.CHECKS, {"cache": probe}):
+            self.client.get("/ready/")
+        self.assertEqual(held, [False])
+
+
+class BackgroundJobTests(TestCase):
+    """Tests for recovering jobs whose runner died"""
+
+    def setUp(self):
+        self.ran = []
+        jobs.register("core.test")(lambda job: self.ran.append(job.pk))
+        self.addCleanup(jobs._handlers.pop, "core.test")
+
+    def running_job(self, minutes_ago):
+        seen = timezone.now() - timedelta(minutes=minutes_ago)
+        return BackgroundJob.objects.create(
+            kind="core.test",
+            status=BackgroundJob.Status.RUNNING,
+            started_at=seen,
+            heartbeat_at=seen,
+        )
+
+    @override_settings(BACKGROUND_JOBS_MODE="worker")
+    def test_worker_requeues_stale_jobs(self):
+        """Test that the worker reruns jobs left running by a dead process"""
+        stale = self.running_job(minutes_ago=60)
+        live = self.running_job(minutes_ago=1)
+
+        self.assertEqual(jobs.run_pending(), 1)
+        self.assertEqual(self.ran, [stale.pk])
+        live.refresh_from_db()
+        self.assertEqual(live.status, BackgroundJob.Status.RUNNING)
+
+    def test_stale_jobs_fail_without_a_worker(self):
+        """Test that enqueueing a job fails stale jobs when no worker polls"""
+        stale = self.running_job(minutes_ago=60)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            jobs.enqueue("core.test")
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, BackgroundJob.Status.FAILED)
+        self.assertTrue(stale.error.startswith("Interrupted"))
+
+    def test_progress_refreshes_heartbeat(self):
+        """Test that a job reporting progress is not considered stale"""
+        job = self.running_job(minutes_ago=60)
+        jobs.report_progress(job, processed=1)
+
+        self.assertEqual(jobs.recover_stale_jobs(), 0)
+
+
+class TieredCacheTests(TestCase):
+    """Tests for the L1/L2 tiered cache backend"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.location = f"file://{directory.name}"
+        config = cache_config(self.location, l1_timeout=60, l1_exclude=["live:"])
+        self.cache = TieredCache("test", config)
+        self.addCleanup(self.cache.clear)
+
+    def other_process_sets(self, key, value):
+        self.cache.l2.set(self.cache.make_key(key), value)
+
+    def test_local_tier_serves_hot_keys(self):
+        """Test that reads are served locally until the L1 copy expires"""
+        self.cache.set("hot", 1)
+        self.other_process_sets("hot", 2)
+        self.assertEqual(self.cache.get("hot"), 1)
+        self.cache.l1.clear()
+        self.assertEqual(self.cache.get("hot"), 2)
+
+    def test_writes_and_deletes_reach_both_tiers(self):
+        """Test that this process sees its own changes at once"""
+        self.cache.set("key", 1)
+        self.cache.set("key", 2)
+        self.assertEqual(self.cache.get("key"), 2)
+        self.cache.delete("key")
+        self.assertIsNone(self.cache.get("key"))
+        self.assertIsNone(self.cache.l2.get(self.cache.make_key("key")))
+
+    def test_excluded_prefixes_skip_local_tier(self):
+        """Test that L1_EXCLUDE keys are always read from the shared tier"""
+        self.cache.set("live:stamp", 1)
+        self.other_process_sets("live:stamp", 2)
+        self.assertEqual(self.cache.get("live:stamp"), 2)
+
+    def test_version_stamps_skip_local_tier(self):
+        """Test that a stamp bumped by another worker is seen at once"""
+        from apps.accounts.roles import ROLE_VERSION_KEY
+        from apps.content.versioning import (
+            CATALOG_VERSION_KEY,
+            OCCUPATION_VERSION_KEY,
+        )
+
+        from .partials import USER_PARTIALS_VERSION_KEY
+
+        config = cache_config(
+            self.location, l1_timeout=60, l1_exclude=settings.CACHE_L1_EXCLUDE
+        )
+        this_worker = TieredCache("test", config)
+        other_worker = TieredCache("other", config)
+        self.addCleanup(other_worker.clear)
+        for key in [
+            CATALOG_VERSION_KEY,
+            OCCUPATION_VERSION_KEY.format("occupation"),
+            ROLE_VERSION_KEY.format(1),
+            USER_PARTIALS_VERSION_KEY.format(1),
+        ]:
+            this_worker.set(key, 1)
+            self.assertEqual(this_worker.get(key), 1)
+            other_worker.set(key, 2)
+            self.assertEqual(this_worker.get(key), 2, key)
+
+    def test_get_many_fills_local_tier(self):
+        """Test that get_many combines both tiers"""
+        self.cache.set("a", 1)
+        self.other_process_sets("b", 2)
+        self.assertEqual(self.cache.get_many(["a", "b", "c"]), {"a": 1, "b": 2})
+        self.assertEqual(self.cache.l1.get(self.cache.make_key("b")), 2)
+
+    def test_versioned_keys(self):
+        """Test that cache versions keep separate entries"""
+        self.cache.set("key", "v1", version=1)
+        self.cache.set("key", "v2", version=2)
+        self.assertEqual(self.cache.get("key", version=1), "v1")
+        self.assertEqual(self.cache.get("key", version=2), "v2")
+
+    def test_cache_url_parsing(self):
+        """Test that CACHE_URL schemes map to backends"""
+        self.assertEqual(
+            cache_config("locmem://")["BACKEND"],
+            "apps.core.instrumentation.InstrumentedLocMemCache",
+        )
+        redis = cache_config("redis://cache:6379/0", l1_timeout=0)
+        self.assertEqual(redis["LOCATION"], "redis://cache:6379/0")
+        self.assertEqual(
+            cache_config("db://dhet_cache")["OPTIONS"]["L2"]["LOCATION"], "dhet_cache"
+        )
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class SessionStrategyTests(TestCase):
+    """Tests for the low-write session engines"""
+
+    def test_unchanged_assignment_does_not_save(self):
+        """Test that assigning an equal value leaves the session unmodified"""
+        session = DbSessionStore()
+        session["is_onboarded"] = False
+        session.save()
+
+        session = DbSessionStore(session.session_key)
+        session["is_onboarded"] = False
+        session.update({"is_onboarded": False})
+        self.assertFalse(session.modified)
+        session["is_onboarded"] = True
+        self.assertTrue(session.modified)
+        session["is_onboarded"] = False
+        self.assertFalse(session.modified)
+
+    def test_in_place_change_saves(self):
+        """Test that a stored dict changed in place and assigned back saves"""
+        session = DbSessionStore()
+        session["login"] = {"failed_attempts": []}
+        session.save()
+
+        session = DbSessionStore(session.session_key)
+        state = session["login"]
+        state["failed_attempts"].append("123456")
+        session["login"] = state
+        self.assertTrue(session.modified)
+        session.save()
+        session = DbSessionStore(session.session_key)
+        self.assertEqual(session["login"], {"failed_attempts": ["123456"]})
+
+    def test_login_code_attempts_are_limited(self):
+        """Test that wrong login codes are counted until the login is aborted"""
+        User.objects.create_user(
+            username="codes", email="codes@example.com", password="testpass123"
+        )
+        self.client.post(
+            reverse("account_request_login_code"), {"email": "codes@example.com"}
+        )
+        statuses = [
+            self.client.post(
+                reverse("account_confirm_login_code"), {"code": "WRONG1"}
+            ).status_code
+            for _ in range(4)  # allauth allows 3 attempts by default
+        ]
+        self.assertEqual(statuses[-1], 302)
+
+    def test_cycled_key_saves(self):
+        """Test that a new session key is reported even if the data is equal"""
+        session = DbSessionStore()
+        session["is_onboarded"] = True
+        session.save()
+
+        session = DbSessionStore(session.session_key)
+        session.get("is_onboarded")
+        session.cycle_key()
+        self.assertTrue(session.modified)
+
+    @override_settings(SESSION_ENGINE="apps.core.sessions.cached_db")
+    def test_cached_db_pages_skip_session_table(self):
+        """Test that repeat page loads don't query the session table"""
+        User.objects.create_user(username="sessions", password="testpass123")
+        self.client.login(username="sessions", password="testpass123")
+        self.client.get(reverse("occupations"))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("occupations"))
+        self.assertFalse([q for q in queries if "django_session" in q["sql"]])
+
+
+def _with_replica(configured=True):
+    return mock.patch(
+        "apps.core.db.replica.replica_configured", return_value=configured
+    )
+
+
+class ReplicaRoutingTests(SimpleTestCase):
+    """Tests for routing read-only views to the read replica"""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+        @use_replica
+        def view(request):
+            # Aliases the router picks for a catalog model and a user
+            return HttpResponse(
+                f"{self.router.db_for_read(Occupation)},"
+                f"{self.router.db_for_read(User)}"
+            )
+
+        self.view = view
+
+    def test_read_only_view_reads_catalog_from_replica(self):
+        """Test that catalog reads go to the replica and others to the primary"""
+        with _with_replica():
+            response = self.view(self.factory.get("/"))
+        self.assertEqual(response.content, b"replica,default")
+        self.assertEqual(self.router.db_for_read(Occupation), "default")
+
+    def test_primary_used_without_replica_or_for_writes(self):
+        """Test that unsafe methods and a missing replica use the primary"""
+        with _with_replica(configured=False):
+            response = self.view(self.factory.get("/"))
+        self.assertEqual(response.content, b"default,default")
+        with _with_replica():
+            response = self.view(self.factory.post("/"))
+        self.assertEqual(response.content, b"default,default")
+
+    def test_reads_after_write_use_primary(self):
+        """Test that a write pins the rest of the request to the primary"""
+
+        @use_replica
+        def view(request):
+            before = self.router.db_for_read(Occupation)
+            self.assertEqual(self.router.db_for_write(Occupation), "default")
+            return HttpResponse(f"{before},{self.router.db_for_read(Occupation)}")
+
+        with _with_replica():
+            response = view(self.factory.get("/"))
+        self.assertEqual(response.content, b"replica,default")
+
+    def test_post_pins_browser_to_primary(self):
+        """Test that a POST sets the pin cookie that later reads honour"""
+        middleware = ReplicaPinMiddleware(lambda request: HttpResponse())
+        with _with_replica():
+            self.assertNotIn(PIN_COOKIE, middleware(self.factory.get("/")).cookies)
+            cookie = middleware(self.factory.post("/")).cookies[PIN_COOKIE]
+            self.assertEqual(cookie["max-age"], settings.REPLICA_STICKY_SECONDS)
+
+            request = self.factory.get("/")
+            request.COOKIES[PIN_COOKIE] = "1"
+            self.assertEqual(self.view(request).content, b"default,default")
+        with _with_replica(configured=False):
+            self.assertNotIn(PIN_COOKIE, middleware(self.factory.post("/")).cookies)
+
+
+class PartialCacheTests(TestCase):
+    """Tests for the HTMX partial response cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username="partials")
+        self.calls = 0
+
+    def cached_view(self, **options):
+        @cache_partial("test", **options)
+        def view(request):
+            self.calls += 1
+            if request.GET.get("form"):
+                get_token(request)
+            variant = "partial" if request.headers.get("HX-Request") else "page"
+            return HttpResponse(f"{variant} for {request.user.username}")
+
+        return view
+
+    def get(self, view, user=None, path="/partial/", **headers):
+        request = self.factory.get(path, headers=headers)
+        request.user = user or self.user
+        return view(request)
+
+    def test_variants_cached_separately(self):
+        """Test that partial and full-page responses are cached apart"""
+        view = self.cached_view()
+        for _ in range(2):
+            partial = self.get(view, HX_Request="true")
+            page = self.get(view)
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(partial.content, b"partial for partials")
+        self.assertEqual(page.content, b"page for partials")
+        self.assertIn("HX-Request", partial["Vary"])
+
+    def test_per_user_partials_invalidated(self):
+        """Test that per-user partials are private and invalidated by a bump"""
+        view = self.cached_view(per_user=True)
+        other = User.objects.create_user(username="other")
+        self.get(view)
+        self.assertEqual(self.get(view, user=other).content, b"page for other")
+        self.assertEqual(self.calls, 2)
+        self.assertIn("private", self.get(view)["Cache-Control"])
+        self.assertEqual(self.calls, 2)
+
+        bump_user_partials(self.user.pk)
+        self.get(view)
+        self.assertEqual(self.calls, 3)
+
+    def test_csrf_tokens_not_shared(self):
+        """Test that shared partials embedding a CSRF token aren't cached"""
+        view = self.cached_view()
+        self.get(view, path="/partial/?form=1")
+        self.get(view, path="/partial/?form=1")
+        self.assertEqual(self.calls, 2)
+
+
+class OpenApiSchemaTests(TestCase):
+    """Tests for the precomputed OpenAPI schema"""
+
+    def test_build_command_writes_schema(self):
+        """Test that build_openapi_schema writes the schema for collectstatic"""
+        from pathlib import Path
+
+        from django.core.management import call_command
+
+        with tempfile.TemporaryDirectory() as directory:
+            with self.settings(OPENAPI_BUILD_DIR=Path(directory)):
+                call_command("build_openapi_schema", stdout=mock.Mock())
+            with open(os.path.join(directory, "openapi", "schema.json")) as f:
+                schema = json.load(f)
+        self.assertEqual(schema["info"]["title"], "DHET API")
+        self.assertIn("/api/occupations/", schema["paths"])
+
+    def test_docs_use_fingerprinted_schema(self):
+        """Test that the docs load the collected schema when there is one"""
+        response = self.client.get(reverse("scalar"))
+        self.assertContains(response, 'data-url="/api/schema/"')
+
+        hashed = "/staticfiles/openapi/schema.0123456789ab.json"
+        with mock.patch("scalar.schema.staticfiles_storage.url", return_value=hashed):
+            response = self.client.get(reverse("scalar"))
+        self.assertContains(response, f'data-url="{hashed}"')
+
+    def test_live_schema_generated_once(self):
+        """Test that the live schema view generates the schema once per process"""
+        from drf_spectacular.generators import SchemaGenerator
+
+        from scalar.schema import CachedSchemaView
+
+        CachedSchemaView._schemas.clear()
+        with mock.patch.object(
+            SchemaGenerator,
+            "get_schema",
+            autospec=True,
+            side_effect=SchemaGenerator.get_schema,
+        ) as get_schema:
+            for _ in range(2):
+                response = self.client.get(reverse("schema"), {"format": "json"})
+                self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_schema.call_count, 1)
+        self.assertIn("/api/occupations/", json.loads(response.content)["paths"])
+
+
+class ImportProfileTests(SimpleTestCase):
+    """Tests for the import-time profiler and lazy imports"""
+
+    def test_parse_importtime(self):
+        """Test that imports are attributed to the module that imported them"""
+        from .management.commands.profile_imports import (
+            package_imports,
+            parse_importtime,
+        )
+
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       900 |        900 |       botocore\n"
+            "import time:       100 |       1000 |     boto3\n"
+            "import time:        50 |       1050 |   apps.storage.utils\n"
+            "import time:        20 |       1070 | apps.storage.views\n"
+            "import time:        30 |         30 | json\n"
+        )
+        imports = parse_importtime(output)
+        self.assertEqual(
+            imports,
+            [
+                ("botocore", 900, 900, "boto3"),
+                ("boto3", 100, 1000, "apps.storage.utils"),
+                ("apps.storage.utils", 50, 1050, "apps.storage.views"),
+                ("apps.storage.views", 20, 1070, None),
+                ("json", 30, 30, None),
+            ],
+        )
+        self.assertEqual(
+            [row[0] for row in package_imports(imports)],
+            ["botocore", "boto3", "apps.storage.views", "json"],
+        )
+
+    def test_urlconf_does_not_import_boto3(self):
+        """Test that loading the URLconf leaves boto3 unimported"""
+        import subprocess
+        import sys
+
+        code = (
+            "import sys, django; django.setup(); import dhet_app.urls; "
+            "print('boto3' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=False,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "dhet_app.settings"},
+        )
+        self.assertEqual(result.stdout.strip(), "False", result.stderr)
@@ -1,9 +1,12 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, HttpResponse
 from django.db.models import Q
 from django.views.decorators.csrf import ensure_csrf_cookie
-from rolepermissions.checkers import has_role
+from apps.accounts.roles import has_role
 import json
 
 from cookie_consent.util import (
@@ -12,10 +15,12 @@ from cookie_consent.util import (
     set_cookie_dict_to_response,
     delete_cookies,
 )
-from .models import UserCookieConsent
+from .models import BackgroundJob, UserCookieConsent
 from cookie_consent.conf import settings
 
 from .context_processors import navbar_context
+from .db.replica import use_replica
+from apps.content.conditional import conditional_page
 from apps.content.models import Occupation, Industry
 
 
@@ -131,26 +136,51 @@ def save_cookie_preferences(request):
     return HttpResponse(status=405)
 
 
+async def _alist(queryset):
+    return [obj async for obj in queryset]
+
+
+async def _candidate(user):
+    """The user's candidate profile, or None (async `user.candidate`)."""
+    from apps.candidates.models import CandidateProfile
+
+    return await CandidateProfile.objects.filter(user=user).afirst()
+
+
 @login_required
-def occupation_list(request):
+@conditional_page
+@use_replica
+async def occupation_list(request):
     """
     List occupations with search and filtering.
+    Independent lookups run concurrently on the async ORM.
     """
-    # Base queryset
-    occupations = Occupation.objects.select_related("industry").all()
+    from apps.candidates.models import OccupationTarget
+    from apps.core.pagination import apaginate
 
-    # Identify interested industries for candidates based on their targets
-    interested_industry_ids = []
-    if hasattr(request.user, "candidate"):
-        from apps.candidates.models import OccupationTarget
+    user = await request.auser()
+    candidate = await _candidate(user)
 
-        interested_industry_ids = (
-            OccupationTarget.objects.filter(candidate=request.user.candidate)
+    # Identify interested industries for candidates based on their targets
+    async def interested_industries():
+        if candidate is None:
+            return []
+        targets = (
+            OccupationTarget.objects.filter(candidate=candidate)
             .values_list("occupation__industry_id", flat=True)
             .distinct()
         )
-        # Convert CUIDs to strings for template comparison if necessary,
-        # but here we use them for filtering.
+        return [industry_id async for industry_id in targets]
+
+    interested_industry_ids, is_elevated, industries, context = await asyncio.gather(
+        interested_industries(),
+        sync_to_async(has_role)(user, ["content_manager", "admin", "super_admin"]),
+        _alist(Industry.objects.all()),
+        sync_to_async(navbar_context)(request),
+    )
+
+    # Base queryset
+    occupations = Occupation.objects.select_related("industry").all()
 
     # Search
     query = request.GET.get("q")
@@ -165,16 +195,7 @@ def occupation_list(request):
     industry_id = request.GET.get("industry")
 
     # If no industry selected and user is a candidate (not elevated), default to 'interested'
-    from rolepermissions.checkers import has_role
-
-    is_elevated = has_role(request.user, ["content_manager", "admin", "super_admin"])
-
-    if (
-        not industry_id
-        and not is_elevated
-        and hasattr(request.user, "candidate")
-        and len(interested_industry_ids) > 0
-    ):
+    if not industry_id and not is_elevated and interested_industry_ids:
         industry_id = "interested"
 
     if industry_id == "interested":
@@ -183,21 +204,11 @@ def occupation_list(request):
     elif industry_id:
         occupations = occupations.filter(industry_id=industry_id)
 
-    # Pagination
-    from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-
-    paginator = Paginator(occupations, 10)  # Show 10 occupations per page
-    page_number = request.GET.get("page")
-    try:
-        occupations = paginator.page(page_number)
-    except PageNotAnInteger:
-        occupations = paginator.page(1)
-    except EmptyPage:
-        occupations = paginator.page(paginator.num_pages)
+    # Pagination: 10 occupations per page
+    occupations = await apaginate(occupations, 10, request.GET.get("page"))
 
     # If candidate, attach cached scores from recommended_occupations
-    if hasattr(request.user, "candidate"):
-        candidate = request.user.candidate
+    if candidate is not None:
         # Build a lookup dict from cached proficiency data
         cached_scores = {}
         for item in candidate.recommended_occupations:
@@ -206,18 +217,16 @@ def occupation_list(request):
         for occ in occupations:
             occ.proficiency_score = cached_scores.get(occ.ofo_code, 0)
 
-    industries = Industry.objects.all()
     industry_options = []
     if is_elevated:
         industry_options.append(("", "All Industries"))
 
-    if len(interested_industry_ids) > 0:
+    if interested_industry_ids:
         industry_options.append(("interested", "My Interested Industries"))
 
     for industry in industries:
         industry_options.append((str(industry.id), industry.name))
 
-    context = navbar_context(request)
     context.update(
         {
             "occupations": occupations,
@@ -225,41 +234,63 @@ def occupation_list(request):
             "industry_options": industry_options,
             "search_query": query,
             "selected_industry": industry_id,
-            "has_interests": len(interested_industry_ids) > 0,
+            "has_interests": bool(interested_industry_ids),
+            # Background deletion started from this page
+            "job_id": request.GET.get("job"),
         }
     )
 
-    return render(request, "core/occupation_list.html", context)
+    return await sync_to_async(render)(request, "core/occupation_list.html", context)
 
 
 @login_required
-def occupation_detail(request, occupation_id):
+@conditional_page
+@use_replica
+async def occupation_detail(request, occupation_id):
     """
     Detailed view of an occupation.
     Shows description, tasks, and for candidates, action items.
     """
-    from django.shortcuts import get_object_or_404
+    from django.shortcuts import aget_object_or_404
+
+    from apps.candidates.models import OccupationTarget
+    from apps.content.services import get_related_occupations
+    from apps.content.versioning import FRAGMENT_CACHE_TIMEOUT, get_occupation_version
 
     # We use select_related to get industry data efficiently
-    occupation = get_object_or_404(
-        Occupation.objects.select_related("industry"), pk=occupation_id
+    occupation, candidate = await asyncio.gather(
+        aget_object_or_404(
+            Occupation.objects.select_related("industry"), pk=occupation_id
+        ),
+        _candidate(await request.auser()),
     )
 
-    context = navbar_context(request)
+    async def is_target():
+        if candidate is None:
+            return False
+        return await OccupationTarget.objects.filter(
+            candidate=candidate, occupation=occupation
+        ).aexists()
+
+    context, related_occupations, occupation_version, target = await asyncio.gather(
+        sync_to_async(navbar_context)(request),
+        sync_to_async(get_related_occupations)(occupation),
+        sync_to_async(get_occupation_version)(occupation.id),
+        is_target(),
+    )
     context.update(
         {
             "occupation": occupation,
+            "related_occupations": related_occupations,
+            # Description and tasks are cached per occupation version
+            "occupation_version": occupation_version,
+            "fragment_cache_timeout": FRAGMENT_CACHE_TIMEOUT,
         }
     )
 
     # Candidate specific logic: Check if it's a target, get score, etc.
-    if hasattr(request.user, "candidate"):
-        candidate = request.user.candidate
-        from apps.candidates.models import OccupationTarget
-
-        context["is_target"] = OccupationTarget.objects.filter(
-            candidate=candidate, occupation=occupation
-        ).exists()
+    if candidate is not None:
+        context["is_target"] = target
 
         # Get score if available
         if candidate.recommended_occupations:
@@ -274,4 +305,20 @@ def occupation_detail(request, occupation_id):
             if progress_data:
                 context["assessment_progress_data"] = progress_data
 
-    return render(request, "core/occupation_detail.html", context)
+    return await sync_to_async(render)(
+        request, "core/occupation_detail.html", context
+    )
+
+
+@login_required
+def job_status(request, job_id):
+    """
+    HTMX partial showing a background job's progress.
+    Only the user who started the job or staff may view it.
+    """
+    from django.shortcuts import get_object_or_404
+
+    job = get_object_or_404(BackgroundJob, pk=job_id)
+    if job.created_by_id != request.user.id and not request.user.is_staff:
+        return HttpResponse(status=403)
+    return render(request, "core/partials/job_status.html", {"job": job})
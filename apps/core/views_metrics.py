@@ -0,0 +1,76 @@
+import hmac
+import os
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count, Min
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils import timezone
+
+from .metrics import render_metrics
+from .models import BackgroundJob
+
+QUEUE_STATUSES = (BackgroundJob.Status.PENDING, BackgroundJob.Status.RUNNING)
+
+
+def _authorized(request):
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        header = request.META.get("HTTP_AUTHORIZATION", "")
+        return hmac.compare_digest(header.encode(), f"Bearer {token}".encode())
+    return request.user.is_authenticated and request.user.is_staff
+
+
+def job_queue_gauges():
+    """Queue depth and oldest pending job age, read at scrape time."""
+    counts = dict(
+        BackgroundJob.objects.filter(status__in=QUEUE_STATUSES)
+        .values("status")
+        .annotate(total=Count("id"))
+        .values_list("status", "total")
+    )
+    gauges = [
+        ("background_jobs", {"status": status}, counts.get(status, 0))
+        for status in QUEUE_STATUSES
+    ]
+    oldest = BackgroundJob.objects.filter(
+        status=BackgroundJob.Status.PENDING
+    ).aggregate(oldest=Min("created_at"))["oldest"]
+    age = (timezone.now() - oldest).total_seconds() if oldest else 0.0
+    gauges.append(("background_job_oldest_pending_seconds", {}, age))
+    return gauges
+
+
+def db_pool_gauges():
+    """
+    Pool size, idle connections and waiting requests of the scraped worker;
+    every worker has its own pool, so these are labelled with its pid.
+    """
+    gauges = []
+    for connection in connections.all():
+        pool = getattr(connection, "pool", None)
+        if pool is None:
+            continue
+        stats = pool.get_stats()
+        labels = {"alias": connection.alias, "pid": os.getpid()}
+        size = stats.get("pool_size", 0)
+        available = stats.get("pool_available", 0)
+        gauges += [
+            ("db_pool_connections", {**labels, "state": "idle"}, available),
+            ("db_pool_connections", {**labels, "state": "in_use"}, size - available),
+            ("db_pool_requests_waiting", labels, stats.get("requests_waiting", 0)),
+        ]
+    return gauges
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint. Requires `Authorization: Bearer <METRICS_TOKEN>`
+    when METRICS_TOKEN is set, otherwise a staff session.
+    """
+    if not _authorized(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render_metrics(job_queue_gauges() + db_pool_gauges()),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -1,12 +1,12 @@
 import logging
-import boto3
-from botocore.exceptions import ClientError
+
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
 
 def get_s3_client():
+    # boto3 takes ~100ms to import; only load it when a URL is signed
     from storages.backends.s3 import S3Storage
 
     storage = S3Storage()
@@ -17,6 +17,8 @@ def generate_presigned_download_url(file_path, expiration=3600):
     """
     Generate a presigned URL to share a private file.
     """
+    from botocore.exceptions import ClientError
+
     s3_client = get_s3_client()
     try:
         response = s3_client.generate_presigned_url(
@@ -34,6 +36,8 @@ def generate_presigned_upload_url(object_name, expiration=3600, file_type=None):
     """
     Generate a presigned URL to upload a file directly to S3/Spaces from the client.
     """
+    from botocore.exceptions import ClientError
+
     s3_client = get_s3_client()
 
     params = {
@@ -60,6 +64,8 @@ def generate_presigned_post(object_name, expiration=3600):
     Generate a presigned POST dictionary (for form uploads).
     Returns: {'url': '...', 'fields': {...}}
     """
+    from botocore.exceptions import ClientError
+
     s3_client = get_s3_client()
     try:
         response = s3_client.generate_presigned_post(
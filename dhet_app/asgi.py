@@ -2,6 +2,8 @@
 ASGI config for dhet_app project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Served by Gunicorn's Uvicorn workers with SERVER_INTERFACE=asgi (see
+gunicorn.conf.py).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -3,7 +3,9 @@ from pathlib import Path
 import dj_database_url
 from decouple import Csv, config
 
+from apps.core.cache import cache_config
 from apps.core.logging_config import get_logging_config
+from apps.core.sessions import SESSION_ENGINES
 
 # ------------- Mode Configuration -------------
 # MODE: development, testing, production
@@ -51,14 +53,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "apps.core.middleware.HealthCheckMiddleware",  # /health/ and /ready/ probes
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "apps.core.middleware.StaticFilesMiddleware",  # WhiteNoise, async-capable
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "apps.accounts.middleware.RoleCacheMiddleware",  # Cache role lookups per session
     "simple_history.middleware.HistoryRequestMiddleware",
     "apps.core.middleware.RequestTracingMiddleware",  # Request tracing with logging
+    "apps.core.middleware.ReplicaPinMiddleware",  # Read-your-writes for the replica
     "apps.core.middleware.RestrictedAdminMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -74,7 +79,8 @@ SITE_DOMAIN = config("SITE_DOMAIN", default="localhost:8000")
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates reporting render time to RequestTracingMiddleware
+        "BACKEND": "apps.core.instrumentation.InstrumentedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -91,10 +97,106 @@ TEMPLATES = [
 
 DATABASES = {"default": dj_database_url.parse(config("DATABASE_URL", cast=str))}
 
+# Optional read replica: views marked with apps.core.db.replica.use_replica
+# read REPLICA_READ_APPS models from it; a browser that just sent a POST (or
+# other write) reads from the primary for REPLICA_STICKY_SECONDS instead
+DATABASE_REPLICA_URL = config("DATABASE_REPLICA_URL", default="")
+if DATABASE_REPLICA_URL:
+    DATABASES["replica"] = dj_database_url.parse(DATABASE_REPLICA_URL)
+    # Tests run against a single database, as replication would be instant
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+    DATABASE_ROUTERS = ["apps.core.db.replica.ReplicaRouter"]
+REPLICA_READ_APPS = config("REPLICA_READ_APPS", default="content", cast=Csv())
+REPLICA_STICKY_SECONDS = config("REPLICA_STICKY_SECONDS", default=10, cast=int)
+
+# Connection reuse: with DB_POOL (PostgreSQL only) each worker keeps a psycopg
+# pool; otherwise connections persist for DB_CONN_MAX_AGE seconds. Either way
+# connections are health-checked before reuse.
+DB_POOL = config("DB_POOL", default=False, cast=bool)
+for database in DATABASES.values():
+    database["CONN_HEALTH_CHECKS"] = True
+    if database["ENGINE"] == "django.db.backends.postgresql":
+        # Reports connection checkouts and pool waits to the request metrics
+        database["ENGINE"] = "apps.core.db.postgresql"
+        if DB_POOL:
+            database.setdefault("OPTIONS", {})["pool"] = {
+                "min_size": config("DB_POOL_MIN_SIZE", default=2, cast=int),
+                "max_size": config("DB_POOL_MAX_SIZE", default=10, cast=int),
+                "timeout": config("DB_POOL_TIMEOUT", default=10, cast=float),
+            }
+    if not DB_POOL:
+        database["CONN_MAX_AGE"] = config("DB_CONN_MAX_AGE", default=60, cast=int)
+
+# ------------- Cache -------------
+# CACHE_URL picks the shared tier (see apps.core.cache); per-process copies
+# are kept for up to CACHE_L1_TIMEOUT seconds (0 disables the local tier).
+# Version stamps, sessions and the health probe skip the local tier, so
+# writes, role changes and logouts apply on every worker at once (a stale
+# stamp would serve stale fragments, partials and 304s). Bump CACHE_VERSION to
+# invalidate every key.
+CACHE_URL = config("CACHE_URL", default="locmem://")
+# locmem is per process: workers don't see each other's writes
+SHARED_CACHE = not CACHE_URL.startswith("locmem:")
+CACHE_L1_EXCLUDE = [
+    "content:catalog_version",
+    "content:occupation_version:",
+    "accounts:role_version:",
+    "core:user_partials_version:",
+    "core:health_probe",
+    "django.contrib.sessions.",
+]
+CACHES = {
+    "default": cache_config(
+        CACHE_URL,
+        l1_timeout=config("CACHE_L1_TIMEOUT", default=5, cast=int),
+        l1_max_entries=config("CACHE_L1_MAX_ENTRIES", default=1000, cast=int),
+        l1_exclude=CACHE_L1_EXCLUDE,
+        KEY_PREFIX=config("CACHE_KEY_PREFIX", default="dhet"),
+        VERSION=config("CACHE_VERSION", default=1, cast=int),
+    )
+}
+
+# Send per-request DB, cache and template timings in a Server-Timing header
+SERVER_TIMING_ENABLED = config("SERVER_TIMING_ENABLED", default=True, cast=bool)
+
+# N+1 detection: warn when one SQL template runs this many times in a request
+# (0 disables), checking a sampled share of requests
+NPLUSONE_THRESHOLD = config("NPLUSONE_THRESHOLD", default=10, cast=int)
+NPLUSONE_SAMPLE_RATE = config("NPLUSONE_SAMPLE_RATE", default=1.0, cast=float)
+NPLUSONE_RAISE = False
+
+# /metrics: workers share counters through snapshots in METRICS_DIR (unset:
+# per-process only); scrapers authenticate with METRICS_TOKEN (unset: staff)
+METRICS_DIR = config("METRICS_DIR", default="")
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+# How long /ready/ reuses its database, cache and migration check results
+HEALTH_CHECK_CACHE_SECONDS = config("HEALTH_CHECK_CACHE_SECONDS", default=5, cast=int)
+
+# Minimum age of an in-process autocomplete index before a catalog change
+# rebuilds it
+AUTOCOMPLETE_REBUILD_SECONDS = config(
+    "AUTOCOMPLETE_REBUILD_SECONDS", default=30, cast=int
+)
+
+# ------------- Sessions -------------
+# cached_db, db, cache or signed_cookies (see apps.core.sessions); all of
+# them skip saving sessions whose values didn't change. cached_db is only the
+# default with a shared cache: with a per-process one, a logout on one worker
+# would leave the session cached on the others.
+SESSION_STRATEGY = config(
+    "SESSION_STRATEGY", default="cached_db" if SHARED_CACHE else "db"
+)
+SESSION_ENGINE = SESSION_ENGINES[SESSION_STRATEGY]
+
 # ------------- Static & Media Files -------------
 STATIC_URL = "/staticfiles/"
 STATICFILES_DIRS = [BASE_DIR / "theme" / "dist", BASE_DIR / "static"]
 STATIC_ROOT = BASE_DIR / "staticfiles"
+# Generated by build_openapi_schema ahead of collectstatic (see scalar.schema)
+OPENAPI_BUILD_DIR = BASE_DIR / "build" / "static"
+if OPENAPI_BUILD_DIR.is_dir():
+    STATICFILES_DIRS.append(OPENAPI_BUILD_DIR)
 
 # Generic S3 / Object Storage credentials
 ACCESS_KEY_ID = config("ACCESS_KEY_ID", default=None)
@@ -198,6 +300,11 @@ SPECTACULAR_SETTINGS = {
 
 # ------------- Application Configuration -------------
 ROLEPERMISSIONS_MODULE = "dhet_app.roles"
+# Keep resolved role names in the session (see apps.accounts.roles). Role
+# changes reach other workers through the cache, so this needs a shared one.
+ROLE_CACHE_IN_SESSION = config(
+    "ROLE_CACHE_IN_SESSION", default=SHARED_CACHE, cast=bool
+)
 
 # Cookie Consent
 COOKIE_CONSENT_ENABLED = config("COOKIE_CONSENT_ENABLED", default=True, cast=bool)
@@ -207,6 +314,13 @@ COOKIE_CONSENT_SUCCESS_URL = "/"
 COOKIE_CONSENT_NAME = "cookie_consent_status"
 COOKIE_CONSENT_HTTPONLY = False  # Allow JS to check if cookie is set
 
+# Background Jobs: thread, inline or worker (see apps.core.jobs)
+BACKGROUND_JOBS_MODE = config("BACKGROUND_JOBS_MODE", default="thread")
+# Running jobs with no progress for this long are requeued or failed
+BACKGROUND_JOBS_STALE_SECONDS = config(
+    "BACKGROUND_JOBS_STALE_SECONDS", default=900, cast=int
+)
+
 # Security
 CSRF_COOKIE_HTTPONLY = False  # Allow JS to read CSRF token
 
@@ -239,6 +353,10 @@ elif MODE == "testing":
     PASSWORD_HASHERS = [
         "django.contrib.auth.hashers.MD5PasswordHasher",
     ]
+    # Run background jobs synchronously when the enqueuing transaction commits
+    BACKGROUND_JOBS_MODE = "inline"
+    # Fail tests whose requests repeat a query NPLUSONE_THRESHOLD times
+    NPLUSONE_RAISE = config("NPLUSONE_RAISE", default=True, cast=bool)
 
 elif MODE == "production":
     # Production-specific settings
@@ -250,6 +368,9 @@ elif MODE == "production":
     SECURE_CONTENT_TYPE_NOSNIFF = True
     X_FRAME_OPTIONS = "DENY"
 
+    # Only check a share of requests for N+1 patterns
+    NPLUSONE_SAMPLE_RATE = config("NPLUSONE_SAMPLE_RATE", default=0.1, cast=float)
+
     # HSTS Settings (uncomment when ready)
     # SECURE_HSTS_SECONDS = 31536000  # 1 year
     # SECURE_HSTS_INCLUDE_SUBDOMAINS = True
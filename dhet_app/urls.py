@@ -3,15 +3,22 @@ from django.urls import path, include
 from django.conf import settings
 from rest_framework.routers import DefaultRouter
 from scalar import urlpatterns_scalar
-from apps.core import views as core_views
+from apps.core import views as core_views, views_metrics
 from apps.accounts import viewsets, views as account_views
 from apps.candidates import views as candidate_views
+from apps.content import viewsets as content_viewsets
 
 from allauth.account.views import LoginView, LogoutView
 
 # API router
 router = DefaultRouter()
 router.register(r"users", viewsets.UserViewSet)
+# Catalog (read-only); basenames avoid clashing with the UI route names
+router.register(r"industries", content_viewsets.IndustryViewSet, "api-industry")
+router.register(r"skills", content_viewsets.SkillViewSet, "api-skill")
+router.register(r"ofo-groups", content_viewsets.OfoGroupViewSet, "api-ofo-group")
+router.register(r"occupations", content_viewsets.OccupationViewSet, "api-occupation")
+router.register(r"tasks", content_viewsets.OccupationTaskViewSet, "api-task")
 
 # Admin Configuration
 admin.site.site_header = "DHET Administration"
@@ -25,6 +32,7 @@ urlpatterns = [
     # Custom admin profile URL must be before admin.site.urls
     path("admin/profile/", account_views.profile, name="admin-profile"),
     path("admin/", admin.site.urls),
+    path("metrics", views_metrics.metrics, name="metrics"),
     path("api/storage/", include("apps.storage.urls")),
     path("api/", include(router.urls)),  # DRF routers (no namespace)
     path("accounts/", include("allauth.urls")),  # login / signup / reset
@@ -40,6 +48,7 @@ urlpatterns = [
     path("users/<str:pk>/edit/", account_views.user_edit, name="user_edit"),
     path("occupations/", core_views.occupation_list, name="occupations"),
     path("", include("apps.content.urls")),  # content management views
+    path("jobs/<str:job_id>/status/", core_views.job_status, name="job-status"),
     path(
         "occupations/<str:occupation_id>/",
         core_views.occupation_detail,
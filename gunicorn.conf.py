@@ -0,0 +1,77 @@
+"""
+Gunicorn configuration, picked up automatically from the working directory.
+
+Usage:
+    gunicorn                          # WSGI, threaded workers
+    SERVER_INTERFACE=asgi gunicorn    # ASGI via Uvicorn workers
+
+Defaults follow MODE; override them with the environment variables (or .env
+entries) read below, e.g. WEB_CONCURRENCY=8 or GUNICORN_TIMEOUT=60.
+"""
+
+import multiprocessing
+import os
+import shutil
+
+from decouple import config as env
+
+MODE = env("MODE", default="development")
+SERVER_INTERFACE = env("SERVER_INTERFACE", default="wsgi")
+
+bind = env("GUNICORN_BIND", default="0.0.0.0:8000")
+
+# ------------- Workers -------------
+# (2 x cores) + 1 is Gunicorn's rule of thumb; development keeps it small
+_default_workers = 2 if MODE == "development" else multiprocessing.cpu_count() * 2 + 1
+workers = env("WEB_CONCURRENCY", default=_default_workers, cast=int)
+
+if SERVER_INTERFACE == "asgi":
+    wsgi_app = "dhet_app.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "dhet_app.wsgi:application"
+    worker_class = "gthread"
+    threads = env("GUNICORN_THREADS", default=4, cast=int)
+
+# Recycle workers to bound memory growth; jitter avoids restarting together
+max_requests = env("GUNICORN_MAX_REQUESTS", default=1000, cast=int)
+max_requests_jitter = env("GUNICORN_MAX_REQUESTS_JITTER", default=100, cast=int)
+
+# ------------- Timeouts -------------
+timeout = env("GUNICORN_TIMEOUT", default=30, cast=int)
+graceful_timeout = env("GUNICORN_GRACEFUL_TIMEOUT", default=30, cast=int)
+keepalive = env("GUNICORN_KEEPALIVE", default=5, cast=int)
+
+# Heartbeat files on tmpfs, so a slow container disk can't stall workers
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+# ------------- Loading -------------
+# Reload on code changes in development; elsewhere import the app once in the
+# master so workers fork with it loaded and share its memory
+reload = MODE == "development"
+preload_app = env("GUNICORN_PRELOAD", default=not reload, cast=bool)
+
+# RequestTracingMiddleware already logs each request
+accesslog = env("GUNICORN_ACCESSLOG", default=None)
+errorlog = "-"
+loglevel = "debug" if MODE == "development" else "info"
+
+
+def on_starting(server):
+    # Drop metric snapshots left by the previous server's workers
+    metrics_dir = env("METRICS_DIR", default="")
+    if metrics_dir and os.path.isdir(metrics_dir):
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+def post_fork(server, worker):
+    # Connections and pools opened while preloading must not be shared
+    # between workers; each worker opens its own on first use
+    if server.cfg.preload_app:
+        from django.db import connections
+
+        for connection in connections.all():
+            if hasattr(connection, "close_pool"):
+                connection.close_pool()
+        connections.close_all()
@@ -1,11 +1,12 @@
 from django.http import HttpResponse
 from django.urls import path
-from drf_spectacular.views import SpectacularAPIView
+
+from .schema import CachedSchemaView, schema_url
 
 
 def scalar_viewer(request):
     """Render Scalar API Reference viewer."""
-    openapi_url = "/api/schema/"
+    openapi_url = schema_url()
     title = "Scalar API Reference"
     scalar_js_url = "https://cdn.jsdelivr.net/npm/@scalar/api-reference"
     scalar_proxy_url = ""
@@ -44,6 +45,6 @@ def scalar_viewer(request):
 
 
 urlpatterns_scalar = [
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/schema/", CachedSchemaView.as_view(), name="schema"),
     path("api/docs/", scalar_viewer, name="scalar"),
 ]
@@ -0,0 +1,79 @@
+"""
+Precomputed OpenAPI schema.
+
+Generating the schema introspects every viewset and serializer, so it is done
+once instead of per request:
+
+- `build_openapi_schema` writes it to OPENAPI_BUILD_DIR before collectstatic,
+  which fingerprints and compresses it like any static file. WhiteNoise then
+  serves it with a far-future, immutable Cache-Control header.
+- The Scalar viewer points at that artifact when it is in the static files
+  manifest, and at the live /api/schema/ view otherwise (development, or a
+  deploy without the build step).
+- The live view keeps the generated schema for the life of the process. The
+  development server restarts on code changes, which regenerates it.
+"""
+
+import threading
+from typing import ClassVar
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.urls import reverse
+from drf_spectacular.renderers import OpenApiJsonRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework.response import Response
+
+SCHEMA_STATIC_PATH = "openapi/schema.json"
+
+
+def generate_schema():
+    """The public OpenAPI schema as JSON bytes."""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return OpenApiJsonRenderer().render(schema, renderer_context={})
+
+
+def schema_url():
+    """URL of the fingerprinted schema artifact, or of the live schema view."""
+    if not settings.DEBUG:
+        try:
+            return staticfiles_storage.url(SCHEMA_STATIC_PATH)
+        except ValueError:
+            # Not in the manifest: build_openapi_schema didn't run
+            pass
+    return reverse("schema")
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """SpectacularAPIView that generates each schema variant once per process."""
+
+    # Shared by every thread of the process; filled under _lock so concurrent
+    # first requests generate each variant once
+    _schemas: ClassVar[dict] = {}
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def _get_schema_response(self, request):
+        version = (
+            self.api_version
+            or request.version
+            or self._get_version_parameter(request)
+        )
+        key = (version, request.GET.get("lang"))
+        with self._lock:
+            if key not in self._schemas:
+                generator = self.generator_class(
+                    urlconf=self.urlconf, api_version=version, patterns=self.patterns
+                )
+                self._schemas[key] = generator.get_schema(
+                    request=request, public=self.serve_public
+                )
+        return Response(
+            data=self._schemas[key],
+            headers={
+                "Content-Disposition": (
+                    f'inline; filename="{self._get_filename(request, version)}"'
+                )
+            },
+        )